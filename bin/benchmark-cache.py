@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+#
+# bin/benchmark-cache.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+"""
+Measures the time to validate a feed without a cache, with an empty (cold) cache and with a cache already holding
+all lines of the feed (warm).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from geofeed_validator import GeoFeedValidator, warmup
+from geofeed_validator.cache import ValidationCache
+
+
+def get_feed(lines):
+    return "".join(
+        f"45.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}/32,AT,AT-{index % 9 + 1},Vienna,\n"
+        if index % 2
+        else f"2a00:{index // 65536 % 65536:x}:{index % 65536:x}::/48,DE,DE-BY,Munich,\n"
+        for index in range(lines)
+    )
+
+
+def validate(path, cache_path):
+    if cache_path is None:
+        GeoFeedValidator.from_path(path).validate()
+        return
+    with ValidationCache(cache_path) as cache:
+        GeoFeedValidator.from_path(path, cache=cache).validate()
+
+
+def measure(path, mode, repeat):
+    """
+    :param mode: "none" to validate without a cache, "cold" with an empty cache, "warm" with a cache holding all
+        lines of the feed
+    :type mode: str
+    :returns: Best time in seconds
+    :rtype: float
+    """
+    cache_path = None if mode == "none" else path + ".cache"
+    if mode == "warm":
+        validate(path, cache_path)
+
+    times = []
+    for _ in range(repeat):
+        if mode == "cold" and os.path.exists(cache_path):
+            os.unlink(cache_path)
+        start = time.perf_counter()
+        validate(path, cache_path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(prog=argv[0], description=__doc__.strip())
+    parser.add_argument("--lines", help="Lines of the generated feed (default: 100000)", type=int, default=100000)
+    parser.add_argument("--feed", help="Path of a feed file to use instead of a generated feed", default=None)
+    parser.add_argument("--repeat", help="Measurements, the best is reported (default: 3)", type=int, default=3)
+    args = parser.parse_args(argv[1:])
+
+    warmup()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "feed.csv")
+        if args.feed:
+            with open(args.feed, "rb") as source, open(path, "wb") as target:
+                target.write(source.read())
+        else:
+            with open(path, "w") as fp:
+                fp.write(get_feed(args.lines))
+
+        sys.stdout.write(f"Time to validate, best of {args.repeat}:\n")
+        for mode, name in (("none", "no cache"), ("cold", "cold cache"), ("warm", "warm cache")):
+            sys.stdout.write(f"  {name:<12} {measure(path, mode, args.repeat):7.2f} s\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#
+# bin/benchmark-engine.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+"""
+Measures the time to validate feeds of IPv4 networks, of IPv6 networks and of both with the "python" and the
+"numpy" engine.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+from geofeed_validator import GeoFeedValidator, warmup
+from geofeed_validator.vectorized import HAS_NUMPY
+
+
+def get_line(version, index):
+    if version == 4:
+        return f"45.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}/32,AT,AT-{index % 9 + 1},Vienna,\n"
+    return f"2a00:{index // 65536 % 65536:x}:{index % 65536:x}::/48,DE,DE-BY,Munich,\n"
+
+
+def get_feed(versions, lines):
+    return "".join(get_line(versions[index % len(versions)], index) for index in range(lines))
+
+
+def measure(path, engine, repeat):
+    """
+    :returns: Best time in seconds
+    :rtype: float
+    """
+    times = []
+    for _ in range(repeat):
+        # Results hold reference cycles: free the previous one before measuring, not while measuring.
+        gc.collect()
+        start = time.perf_counter()
+        GeoFeedValidator.from_path(path, engine=engine).validate()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(prog=argv[0], description=__doc__.strip())
+    parser.add_argument("--lines", help="Lines of each generated feed (default: 100000)", type=int, default=100000)
+    parser.add_argument("--repeat", help="Measurements, the best is reported (default: 3)", type=int, default=3)
+    args = parser.parse_args(argv[1:])
+
+    if not HAS_NUMPY:
+        parser.error("NumPy is not installed")
+
+    warmup(engine="numpy")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "feed.csv")
+        sys.stdout.write(f"Time to validate, best of {args.repeat}:\n")
+        sys.stdout.write(f"  {'feed':<12} {'python':>9} {'numpy':>9}\n")
+        for name, versions in (("IPv4", (4,)), ("IPv6", (6,)), ("IPv4 + IPv6", (4, 6))):
+            with open(path, "w") as fp:
+                fp.write(get_feed(versions, args.lines))
+            times = [measure(path, engine, args.repeat) for engine in ("python", "numpy")]
+            sys.stdout.write(f"  {name:<12} {times[0]:7.2f} s {times[1]:7.2f} s\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
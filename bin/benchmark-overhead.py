@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+#
+# bin/benchmark-overhead.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+"""
+Measures the time per call of validating a tiny feed, once with a new GeoFeedValidator per feed and once with a
+ReusableValidator, and the overhead per call that is not spent on the records of the feed.
+"""
+
+import argparse
+import sys
+import timeit
+
+from geofeed_validator import GeoFeedValidator, ReusableValidator, warmup
+
+
+def get_feed(lines):
+    return "".join(f"45.{index // 256 % 256}.{index % 256}.0/24,AT,AT-9,Vienna,1010\n" for index in range(lines))
+
+
+def measure(function, number, repeat):
+    """
+    :returns: Best time per call in microseconds
+    :rtype: float
+    """
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(prog=argv[0], description=__doc__.strip())
+    parser.add_argument("--lines", help="Lines of the feed (default: 10)", type=int, default=10)
+    parser.add_argument("--validator", help="Validator to use (default: final)", default="final")
+    parser.add_argument("--number", help="Calls per measurement (default: 2000)", type=int, default=2000)
+    parser.add_argument("--repeat", help="Measurements, the best is reported (default: 5)", type=int, default=5)
+    args = parser.parse_args(argv[1:])
+
+    # Loading the ISO3166 data is a one-time cost, not part of the overhead per call.
+    warmup()
+    feed = get_feed(args.lines)
+    reusable = ReusableValidator(args.validator)
+
+    sys.stdout.write(f"Time per call, best of {args.repeat} x {args.number} calls:\n")
+    for name, function in (
+        (f"GeoFeedValidator, {args.lines} lines", lambda: GeoFeedValidator(feed, args.validator).validate()),
+        (f"ReusableValidator, {args.lines} lines", lambda: reusable.validate(feed)),
+        ("GeoFeedValidator, empty feed", lambda: GeoFeedValidator("", args.validator).validate()),
+        ("ReusableValidator, empty feed", lambda: reusable.validate("")),
+    ):
+        sys.stdout.write(f"  {name:<36} {measure(function, args.number, args.repeat):9.1f} us\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
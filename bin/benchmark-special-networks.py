@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+#
+# bin/benchmark-special-networks.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+"""
+Measures the time per network of classifying IPv4 /24 and IPv6 /48 networks against the special-purpose networks,
+once with the is_link_local, is_loopback, is_multicast, is_reserved and is_private checks of the ipaddress module
+NetworkField used before and once with special_networks.classify_network().
+"""
+
+import argparse
+import sys
+import timeit
+from ipaddress import IPv4Network, IPv6Network
+
+from geofeed_validator.prefix import IPPrefix
+from geofeed_validator.special_networks import classify_network, warmup
+
+CHECKS = ("is_link_local", "is_loopback", "is_multicast", "is_reserved", "is_private")
+
+
+def get_networks(version, count):
+    if version == 4:
+        return [IPv4Network((0x2D000000 + (index << 8), 24)) for index in range(count)]
+    return [IPv6Network((0x2A000000 << 96 | index << 80, 48)) for index in range(count)]
+
+
+def classify_ipaddress(networks):
+    for network in networks:
+        for check in CHECKS:
+            if getattr(network, check):
+                break
+
+
+def classify_table(networks):
+    for network in networks:
+        classify_network(network)
+
+
+def measure(function, networks, repeat):
+    """
+    :returns: Best time per network in microseconds
+    :rtype: float
+    """
+    return min(timeit.repeat(lambda: function(networks), number=1, repeat=repeat)) / len(networks) * 1e6
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(prog=argv[0], description=__doc__.strip())
+    parser.add_argument("--networks", help="Networks per IP version (default: 20000)", type=int, default=20000)
+    parser.add_argument("--repeat", help="Measurements, the best is reported (default: 5)", type=int, default=5)
+    args = parser.parse_args(argv[1:])
+
+    # The tables are built once on first use, not part of the time per network.
+    warmup()
+
+    sys.stdout.write(f"Time per network, best of {args.repeat} x {args.networks} networks:\n")
+    for version, name in ((4, "IPv4 /24s"), (6, "IPv6 /48s")):
+        networks = get_networks(version, args.networks)
+        prefixes = [IPPrefix(version, int(n.network_address), n.prefixlen) for n in networks]
+        for label, function, values in (
+            ("ipaddress checks", classify_ipaddress, networks),
+            ("classify_network(), networks", classify_table, networks),
+            ("classify_network(), IPPrefix", classify_table, prefixes),
+        ):
+            sys.stdout.write(f"  {name}, {label:<30} {measure(function, values, args.repeat):7.2f} us\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,27 +30,36 @@ import os
 import sys
 import traceback
 from collections.abc import Iterator
-from contextlib import contextmanager
-from io import TextIOWrapper
-from urllib.request import _UrlopenRet, urlopen
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING
 
-from geofeed_validator import GeoFeedValidator, Registry, __version__
+from geofeed_validator import BaseValidator, GeoFeedValidator, Registry, __version__
+from geofeed_validator.incremental import FeedIndex
+from geofeed_validator.utils import MappedFeed
+
+if TYPE_CHECKING:
+    from urllib.request import _UrlopenRet
 
 QUIET = False
 
 
 @contextmanager
-def _open_file(path: str) -> Iterator[TextIOWrapper]:
+def _open_file(path: str) -> Iterator[MappedFeed]:
     try:
-        with open(path) as file:
-            yield file
+        file = MappedFeed(path)
     except OSError as e:
         sys.stderr.write(f"*** ERROR: Could not read {path}: {e}\n")
         sys.exit(2)
 
+    with file:
+        yield file
+
 
 @contextmanager
-def _open_url(url: str) -> Iterator[_UrlopenRet]:
+def _open_url(url: str) -> Iterator["_UrlopenRet"]:
+    # Imported on demand, urllib.request (with http.client and ssl) takes longer to import than the whole package.
+    from urllib.request import urlopen
+
     try:
         write_console("*** Fetching %s: ", url)
         with urlopen(url, timeout=3) as fp:
@@ -62,6 +71,18 @@ def _open_url(url: str) -> Iterator[_UrlopenRet]:
         sys.exit(2)
 
 
+def _positive_int(value: str) -> int:
+    if not value.isdigit() or int(value) < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {value!r}")
+    return int(value)
+
+
+def _non_negative_int(value: str) -> int:
+    if not value.isdigit():
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer, not {value!r}")
+    return int(value)
+
+
 def write_console(fmt, *args, **kwargs):
     if QUIET:
         return
@@ -76,14 +97,35 @@ def write_console_line(fmt, *args, **kwargs):
     write_console(fmt + "\n", *args, **kwargs)
 
 
-def validate(fp, verbose=False, validator_name=None, allow_warnings=False):
+def validate(
+    fp,
+    verbose=False,
+    validator_name=None,
+    allow_warnings=False,
+    processes=1,
+    max_errors=None,
+    max_warnings=None,
+    cache=None,
+    engine="python",
+):
     try:
         validator_class = Registry.find(validator_name)
     except KeyError:
         sys.stderr.write(f"Validator {validator_name} not found.")
         return 4
 
-    val = GeoFeedValidator(fp, validator=validator_class, store_raw_records=True)
+    # Only records with problems are listed unless running verbosely, there is no need to keep the others.
+    val = GeoFeedValidator(
+        fp,
+        validator=validator_class,
+        store_raw_records=True,
+        processes=processes,
+        problems_only=not verbose,
+        max_errors=max_errors,
+        max_warnings=max_warnings,
+        cache=cache,
+        engine=engine,
+    )
     write_console("Validating feed: ")
     result = val.validate()
     write_console_line("DONE.")
@@ -113,8 +155,8 @@ def validate(fp, verbose=False, validator_name=None, allow_warnings=False):
         "%s%ss: %d TOTAL, %d VALID, %d ERROR, %d WARNING",
         val.record_name[0].upper(),
         val.record_name[1:],
-        len(result.records),
-        len(result.records) - records_with_errors,
+        result.record_count,
+        result.record_count - records_with_errors,
         records_with_errors,
         records_with_warnings,
     )
@@ -126,6 +168,9 @@ def validate(fp, verbose=False, validator_name=None, allow_warnings=False):
         "s" if result.warning_count != 1 else "",
     )
 
+    if result.truncated:
+        write_console_line("*** Validation stopped early, remaining %ss not checked ***", val.record_name)
+
     if val.is_valid(allow_warnings=allow_warnings):
         write_console_line("*** Feed VALID ***")
         return 0
@@ -133,6 +178,55 @@ def validate(fp, verbose=False, validator_name=None, allow_warnings=False):
     return 3
 
 
+def revalidate(fp, index_path, validator_name=None, allow_warnings=False):
+    try:
+        validator_class = Registry.find(validator_name)
+    except KeyError:
+        sys.stderr.write(f"Validator {validator_name} not found.")
+        return 4
+
+    index = None
+    if os.path.exists(index_path):
+        try:
+            index = FeedIndex.load(index_path)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"*** ERROR: Could not read index {index_path}: {e}\n")
+            return 2
+
+    val = GeoFeedValidator(fp, validator=validator_class)
+    write_console("Validating feed changes: ")
+    try:
+        diff = val.revalidate(index)
+    except ValueError as e:
+        write_console_line("FAILED.")
+        sys.stderr.write(f"*** ERROR: {e}\n")
+        return 2
+    write_console_line("DONE.")
+
+    write_console_line("Lines: %d INSERTED, %d REMOVED", len(diff.inserted), len(diff.removed))
+    for sign, problems in (("+", diff.introduced), ("-", diff.resolved)):
+        for problem in problems:
+            write_console_line("%s [%s %d] %s", sign, validator_class.RECORD_NAME, problem.record_no, problem.raw)
+            write_console_line("  %s %s - %s", "E" if problem.is_error else "W", problem.field_name, problem.message)
+
+    index = diff.index
+    write_console_line("Problems: %d INTRODUCED, %d RESOLVED", len(diff.introduced), len(diff.resolved))
+    write_console_line(
+        "Counts: %d ERROR%s, %d WARNING%s",
+        index.error_count,
+        "s" if index.error_count != 1 else "",
+        index.warning_count,
+        "s" if index.warning_count != 1 else "",
+    )
+    index.save(index_path)
+
+    if index.error_count == 0 and (allow_warnings or index.warning_count == 0):
+        write_console_line("*** Feed VALID ***")
+        return 0
+    write_console_line("*** Feed INVALID ***")
+    return 3
+
+
 def main(argv=sys.argv):
     global QUIET
 
@@ -144,11 +238,53 @@ def main(argv=sys.argv):
     )
     parser.add_argument("-q", "--quiet", help="Suppress all output", action="store_true", default=False)
     parser.add_argument("-w", "--warnings", help="Treat warnings as errors", action="store_true", default=False)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of processes to validate a local feed file with, 0 for one per CPU",
+        type=_non_negative_int,
+        default=1,
+    )
+    parser.add_argument(
+        "-x",
+        "--fail-fast",
+        help="Stop at the first error, or warning if warnings are treated as errors",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument("--max-errors", help="Stop after this many errors", type=_positive_int, default=None)
+    parser.add_argument("--max-warnings", help="Stop after this many warnings", type=_positive_int, default=None)
+    parser.add_argument(
+        "--cache", help="Path of a cache file, to skip checking lines seen in earlier runs again", default=None
+    )
+    parser.add_argument(
+        "--engine",
+        help="Validation engine, numpy checks the IPv4 networks of the feed as arrays and needs NumPy",
+        choices=BaseValidator.ENGINES,
+        default="python",
+    )
+    parser.add_argument(
+        "--diff",
+        metavar="INDEX",
+        help="Path of an index file of the previous version of the feed, to only report the problems introduced and "
+        "resolved since. Created if missing, updated to this version.",
+        default=None,
+    )
     parser.add_argument("source", type=str, help="URL or path to feed file")
 
     args = parser.parse_args(argv[1:])
+    if args.cache and args.jobs != 1:
+        parser.error("--cache cannot be combined with --jobs")
+    if args.engine != "python" and (args.cache or args.jobs != 1):
+        parser.error(f"--engine {args.engine} cannot be combined with --cache or --jobs")
+    if args.diff and (args.cache or args.jobs != 1 or args.max_errors or args.max_warnings or args.fail_fast):
+        parser.error("--diff cannot be combined with --cache, --jobs, --fail-fast, --max-errors or --max-warnings")
 
     QUIET = args.quiet
+    if args.fail_fast:
+        args.max_errors = 1
+        if args.warnings:
+            args.max_warnings = 1
     if args.version:
         QUIET = False
 
@@ -156,10 +292,26 @@ def main(argv=sys.argv):
     if args.version:
         return 0
 
-    opener = _open_file if os.path.exists(args.source) else _open_url
-    with opener(args.source) as fp:
+    is_local = os.path.exists(args.source)
+    opener = _open_file if is_local else _open_url
+    if args.cache:
+        from geofeed_validator.cache import ValidationCache
+
+    with opener(args.source) as fp, ValidationCache(args.cache) if args.cache else nullcontext() as cache:
         try:
-            return validate(fp, verbose=args.verbose, validator_name=args.type, allow_warnings=not args.warnings)
+            if args.diff:
+                return revalidate(fp, args.diff, validator_name=args.type, allow_warnings=not args.warnings)
+            return validate(
+                fp,
+                verbose=args.verbose,
+                validator_name=args.type,
+                allow_warnings=not args.warnings,
+                processes=(args.jobs or None) if is_local else 1,
+                max_errors=args.max_errors,
+                max_warnings=args.max_warnings,
+                cache=cache,
+                engine=args.engine,
+            )
         except Exception:
             sys.stderr.write("\n\n*** GeoFeedValidator has encountered an internal error.\n")
             sys.stderr.write("*** This is most likely related to a bug.\n")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+#
+# bin/update-iso3166-snapshot.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+"""
+Regenerates the ISO3166 snapshot bundled with geofeed_validator from the installed pycountry, to be run whenever
+pycountry is updated.
+"""
+
+import argparse
+import sys
+
+from geofeed_validator.iso3166 import SNAPSHOT_PATH, read_pycountry, read_snapshot, write_snapshot
+
+
+def main(argv=sys.argv):
+    parser = argparse.ArgumentParser(prog=argv[0], description=__doc__.strip())
+    parser.add_argument(
+        "--check",
+        help="Only check whether the snapshot is in sync with the installed pycountry, exit with status 1 if not",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument("path", nargs="?", help="Path of the snapshot", default=SNAPSHOT_PATH)
+    args = parser.parse_args(argv[1:])
+
+    data = read_pycountry()
+    if args.check:
+        try:
+            snapshot = read_snapshot(args.path)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"*** ERROR: Could not read snapshot: {e}\n")
+            return 1
+        if snapshot != data:
+            sys.stderr.write(f"*** Snapshot of pycountry {snapshot[0]} not in sync with pycountry {data[0]}.\n")
+            return 1
+        sys.stdout.write(f"*** Snapshot in sync with pycountry {data[0]}.\n")
+        return 0
+
+    write_snapshot(args.path, data)
+    sys.stdout.write(
+        f"*** Wrote snapshot of pycountry {data[0]}, {len(data[1])} countries and {len(data[2])} subdivisions, "
+        f"to {args.path}.\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
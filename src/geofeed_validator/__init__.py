@@ -24,13 +24,40 @@
 #
 
 
-import inspect
 import io
+import os
+import time
 
-from geofeed_validator.utils import is_file_like_object
+from geofeed_validator import special_networks
+from geofeed_validator.incremental import EditableFeed, FeedIndex
+from geofeed_validator.iso3166 import countries_by_subdivision_code
+from geofeed_validator.parallel import iter_file_results
+from geofeed_validator.result import ValidationResult
+from geofeed_validator.utils import MappedFeed, is_file_like_object
 from geofeed_validator.validator.base import BaseValidator, Registry
+from geofeed_validator.vectorized import HAS_NUMPY
 
-__version__ = "0.6.1"
+__version__ = "0.7.1"
+
+#: Time in seconds importing this package may take on a warm file system cache, checked by the tests if the
+#: GEOFEED_VALIDATOR_BENCHMARKS environment variable is set. The ISO3166 data, NumPy and multiprocessing are only
+#: loaded once needed, see warmup().
+IMPORT_TIME_BUDGET = 0.1
+
+
+def warmup(engine="python"):
+    """
+    Loads what validation otherwise loads on first use: the ISO3166 data (which takes the longest), the tables of
+    the special-purpose networks and, for the "numpy" engine, NumPy. For long-running services, so the first feed
+    they validate does not take longer than the others.
+
+    :param engine: Validation engine to load, see GeoFeedValidator
+    :type engine: str
+    """
+    countries_by_subdivision_code()
+    special_networks.warmup()
+    if engine == "numpy" and HAS_NUMPY:
+        import numpy  # noqa: F401
 
 
 class GeoFeedValidator:
@@ -40,12 +67,46 @@ class GeoFeedValidator:
 
     DEFAULT_VALIDATOR = "final"
 
-    def __init__(self, feed, validator=None, store_raw_records=False):
+    def __init__(
+        self,
+        feed,
+        validator=None,
+        store_raw_records=False,
+        processes=1,
+        columnar=False,
+        problems_only=False,
+        max_errors=None,
+        max_warnings=None,
+        cache=None,
+        engine="python",
+    ):
         """
         Constructs the validator.
 
         :param feed: String or file-like object representing the feed.
         :type feed: str or file
+        :param processes: Number of processes to validate the feed with, None for one per CPU. Validating with
+            more than one process requires feed to be a file opened from a path.
+        :type processes: int or None
+        :param columnar: Whether to store the result in a ColumnarValidationResult, which needs a fraction of the
+            memory for large feeds. Cannot be combined with problems_only.
+        :type columnar: bool
+        :param problems_only: Whether to retain only records with errors or warnings in the result, which then
+            needs memory in proportion to the number of problems instead of the size of the feed
+        :type problems_only: bool
+        :param max_errors: Stop validating once this many errors have been found, 1 to fail fast
+        :type max_errors: int or None
+        :param max_warnings: Stop validating once this many warnings have been found
+        :type max_warnings: int or None
+        :raises ValueError: If an argument is invalid or not supported in combination with the others
+        :param cache: Cache of the field checks of feed lines, to skip checking lines seen in earlier runs again.
+            Not supported when validating with multiple processes.
+        :type cache: geofeed_validator.cache.ValidationCache or None
+        :param engine: Validation engine, "python" or "numpy". The "numpy" engine checks the networks of the feed
+            as arrays, which is faster for large feeds. It needs NumPy, without it the "python" engine is
+            used.
+            Not supported with a cache or when validating with multiple processes.
+        :type engine: str
         """
 
         self._feed = None
@@ -54,37 +115,227 @@ class GeoFeedValidator:
         #: :type: BaseValidator
         self._validator_instance = None
         self._result = None
+        self._results = None
+        self._partial_result = None
         self._store_raw_records = store_raw_records
+        self._processes = processes
+        self._columnar = columnar
+        self._problems_only = problems_only
+        self._max_errors = max_errors
+        self._max_warnings = max_warnings
+        self._cache = cache
+        if processes is not None and (not isinstance(processes, int) or processes < 1):
+            raise ValueError(f"processes must be a positive integer or None, not {processes!r}.")
+        self._owns_feed = False
 
-        if inspect.isclass(self._validator_name) and issubclass(self._validator_name, BaseValidator):
+        if isinstance(self._validator_name, type) and issubclass(self._validator_name, BaseValidator):
             self._validator = self._validator_name
             self._validator_name = self._validator.NAME
         elif isinstance(self._validator_name, str):
             self._validator = Registry.find(self._validator_name)
         else:
             raise ValueError(f"Validator {validator!r} is invalid.")
+        self._engine = self._validator._check_options(columnar, problems_only, max_errors, max_warnings, cache, engine)
 
         if isinstance(feed, str):
-            self._feed = io.StringIO(feed)
+            # Universal newlines, like feed files opened in text mode
+            self._feed = io.StringIO(feed, newline=None)
         elif is_file_like_object(feed):
             self._feed = feed
         else:
             raise ValueError("feed argument must either be a string or a file-like object.")
 
-    def validate(self):
+        feed_path = getattr(self._feed, "name", None)
+        if processes != 1 and not (isinstance(feed_path, str) and os.path.isfile(feed_path)):
+            raise ValueError("Validating with multiple processes requires a feed file opened from a path.")
+        if processes != 1 and cache is not None:
+            raise ValueError("A cache is not supported when validating with multiple processes.")
+        if engine != "python" and processes != 1:
+            raise ValueError(f"The {engine!r} engine is not supported with multiple processes.")
+
+    @classmethod
+    def from_path(
+        cls,
+        path,
+        validator=None,
+        store_raw_records=False,
+        processes=1,
+        encoding=None,
+        columnar=False,
+        problems_only=False,
+        max_errors=None,
+        max_warnings=None,
+        cache=None,
+        engine="python",
+    ):
+        """
+        Constructs the validator for a local feed file, which is memory-mapped instead of being read into memory.
+
+        The mapping is closed once the feed has been validated.
+
+        :param path: Path of the feed file
+        :type path: str
+        :param encoding: Encoding of the feed file, defaults to UTF-8
+        :type encoding: str or None
+        :returns: Validator for the feed file
+        :rtype: GeoFeedValidator
+        """
+        feed = MappedFeed(path, encoding=encoding)
+        try:
+            validator = cls(
+                feed,
+                validator=validator,
+                store_raw_records=store_raw_records,
+                processes=processes,
+                columnar=columnar,
+                problems_only=problems_only,
+                max_errors=max_errors,
+                max_warnings=max_warnings,
+                cache=cache,
+                engine=engine,
+            )
+        except Exception:
+            feed.close()
+            raise
+
+        validator._owns_feed = True
+        return validator
+
+    def validate(self, time_budget=None):
         """
         Validates feed.
 
+        With a time budget, validation is paused once the budget has run out and the partial result is returned,
+        see ValidationResult.paused. The elapsed time is checked after each record and each finding of the
+        whole-feed checks. A later call resumes validation where it was paused.
+
+        :param time_budget: Time to spend validating in seconds, None for no limit
+        :type time_budget: float or None
         :returns: ValidatonResult object
         :rtype: ValidationResult
         """
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        for _ in self.iter_results():
+            if deadline is not None and self._result is None and time.monotonic() >= deadline:
+                self._partial_result.pause(self._get_offset())
+                return self._partial_result
+        return self._result
+
+    def revalidate(self, previous=None):
+        """
+        Validates feed incrementally as a new version of a previously validated feed, see FeedIndex.update().
+
+        Only lines not found in the previous version are validated, the cross-record checks are updated for the
+        networks of the lines inserted and removed. The returned FeedDiff lists the problems introduced and
+        resolved, its index is to be passed to the next call.
+
+        :param previous: Index of the previous version, which is updated in place, or its complete result with raw
+            records stored. None to start from an empty index, which reports all problems as introduced.
+        :type previous: FeedIndex or ValidationResult or None
+        :returns: Differences between the versions
+        :rtype: geofeed_validator.incremental.FeedDiff
+        """
+        if previous is None:
+            index = FeedIndex(self._validator)
+        elif isinstance(previous, FeedIndex):
+            if previous.validator is not self._validator:
+                raise ValueError(
+                    f"Index of validator {previous.validator.NAME!r} cannot be used with {self._validator_name!r}."
+                )
+            index = previous
+        else:
+            index = FeedIndex.from_result(previous, self._validator)
+
+        try:
+            return index.update(self._feed)
+        finally:
+            if self._owns_feed:
+                self._feed.close()
+
+    def edit(self):
+        """
+        Reads feed into an EditableFeed, which revalidates the feed incrementally as its lines are inserted,
+        replaced and removed.
+
+        :returns: Editable feed
+        :rtype: geofeed_validator.incremental.EditableFeed
+        """
+        try:
+            return EditableFeed(self._validator, self._feed)
+        finally:
+            if self._owns_feed:
+                self._feed.close()
+
+    def _get_offset(self):
+        # Feeds validated by multiple processes are not read in order.
+        if self._processes != 1:
+            return None
+        try:
+            return self._feed.tell()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def iter_results(self):
+        """
+        Validates feed, yielding results while validation is still running.
+
+        Yields a RecordValidationResult per record as soon as it has been checked, RecordUpdate events for
+        findings added to already yielded records and finally the ValidationResult, which is also returned
+        by subsequent validate() calls.
+
+        :returns: Iterator over RecordValidationResult, RecordUpdate and ValidationResult objects
+        :rtype: iterator
+        """
+        if self._result is not None:
+            yield self._result
+            return
 
         # Create validator instance...
         if self._validator_instance is None:
-            self._validator_instance = self._validator(self._feed, store_raw_records=self._store_raw_records)
-        if self._result is None:
-            self._result = self._validator_instance.validate()
-        return self._result
+            self._validator_instance = self._validator(
+                self._feed,
+                store_raw_records=self._store_raw_records,
+                columnar=self._columnar,
+                problems_only=self._problems_only,
+                max_errors=self._max_errors,
+                max_warnings=self._max_warnings,
+                cache=self._cache,
+                engine=self._engine,
+            )
+        # ...and keep its result stream, so an abandoned iteration can be picked up again.
+        if self._results is None:
+            self._partial_result = self._validator_instance._create_result()
+        if self._results is None and self._processes != 1:
+            self._results = iter_file_results(
+                self._validator,
+                self._feed.name,
+                store_raw_records=self._store_raw_records,
+                processes=self._processes,
+                encoding=getattr(self._feed, "encoding", None),
+                columnar=self._columnar,
+                problems_only=self._problems_only,
+                max_errors=self._max_errors,
+                max_warnings=self._max_warnings,
+                result=self._partial_result,
+            )
+        elif self._results is None:
+            self._results = self._validator_instance.iter_results(result=self._partial_result)
+
+        self._partial_result.resume()
+        for item in self._results:
+            if isinstance(item, ValidationResult):
+                self._result = item
+                if self._owns_feed:
+                    self._feed.close()
+            yield item
+
+    @property
+    def engine(self):
+        """
+        :returns: Validation engine in use, "python" if the "numpy" engine was requested without NumPy installed
+        :rtype: str
+        """
+        return self._engine
 
     @property
     def record_name(self):
@@ -99,3 +350,81 @@ class GeoFeedValidator:
     def is_valid(self, allow_warnings=False):
         result = self.validate()
         return result.is_valid(allow_warnings=allow_warnings)
+
+
+class ReusableValidator:
+    """
+    Validator for many feeds, validating one feed per validate() call with the same options.
+
+    The validator class and options are resolved once, and all feeds are validated using the fields shared by
+    the validator class, see BaseValidator._get_setup(). Meant for services validating many small feeds, whose
+    validation would otherwise be dominated by setting up a GeoFeedValidator per feed.
+    """
+
+    def __init__(
+        self,
+        validator=None,
+        store_raw_records=False,
+        columnar=False,
+        problems_only=False,
+        max_errors=None,
+        max_warnings=None,
+        cache=None,
+        engine="python",
+    ):
+        """
+        Constructs the validator, see GeoFeedValidator for the arguments.
+        """
+        validator = validator if validator else GeoFeedValidator.DEFAULT_VALIDATOR
+        if isinstance(validator, type) and issubclass(validator, BaseValidator):
+            self._validator = validator
+        elif isinstance(validator, str):
+            self._validator = Registry.find(validator)
+        else:
+            raise ValueError(f"Validator {validator!r} is invalid.")
+
+        self._validator._check_options(columnar, problems_only, max_errors, max_warnings, cache, engine)
+        self._options = {
+            "store_raw_records": store_raw_records,
+            "columnar": columnar,
+            "problems_only": problems_only,
+            "max_errors": max_errors,
+            "max_warnings": max_warnings,
+            "cache": cache,
+            "engine": engine,
+        }
+        # Fails early on validator classes that cannot be constructed, instead of on the first feed.
+        self._validator("", **self._options)
+
+    @property
+    def validator(self):
+        """
+        :returns: Validator class feeds are validated with
+        :rtype: type
+        """
+        return self._validator
+
+    def iter_results(self, feed):
+        """
+        Validates a feed, yielding results while validation is still running, see GeoFeedValidator.iter_results().
+
+        :param feed: String or file-like object representing the feed.
+        :type feed: str or file
+        :returns: Iterator over RecordValidationResult, RecordUpdate and ValidationResult objects
+        :rtype: iterator
+        """
+        return self._validator(feed, **self._options).iter_results()
+
+    def validate(self, feed):
+        """
+        Validates a feed.
+
+        :param feed: String or file-like object representing the feed.
+        :type feed: str or file
+        :returns: ValidationResult object
+        :rtype: ValidationResult
+        """
+        return self._validator(feed, **self._options).validate()
+
+    def is_valid(self, feed, allow_warnings=False):
+        return self.validate(feed).is_valid(allow_warnings=allow_warnings)
@@ -0,0 +1,227 @@
+# geofeed_validator/cache.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+import hashlib
+import json
+import sqlite3
+import sys
+
+import geofeed_validator
+from geofeed_validator.utils import get_data_version
+
+#: Maximum number of cached lines, the least recently used ones are evicted beyond that
+DEFAULT_MAX_ENTRIES = 5_000_000
+
+#: Generations after which the use of an entry is recorded again, so unchanged feeds do not rewrite all entries
+REFRESH_INTERVAL = 16
+
+#: Share of max_entries kept when evicting, so evicting (which has to sort all entries) is rare
+EVICTION_TARGET = 0.9
+
+# Bound parameters per query, well below the limits of older SQLite versions.
+_MAX_PARAMETERS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (key BLOB PRIMARY KEY, outcome TEXT NOT NULL, generation INTEGER NOT NULL)
+    WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def _encode(outcome):
+    # Most lines have no findings, their outcome is empty and needs no JSON.
+    return json.dumps(outcome, separators=(",", ":")) if outcome else ""
+
+
+def _decode(text):
+    return json.loads(text) if text else []
+
+
+class ValidationCache:
+    """
+    Persistent cache of the field results of feed lines, stored in a SQLite database.
+
+    Lines are looked up by a hash of the validator name, the versions of this library, of the ISO3166 data and of Python
+    and the line itself. Only the results of the field checks are cached, the common checks always run. Lines without
+    findings, the majority, are stored with an empty outcome. New entries and the use of existing ones are written in
+    one transaction by flush(), which validators call once the feed has been read. Each flush starts a new generation,
+    once there are more than max_entries entries the ones used in the oldest generations are evicted, down to
+    EVICTION_TARGET of max_entries. Uses are only recorded for entries last recorded REFRESH_INTERVAL or more
+    generations ago, so eviction is approximately LRU.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        :param path: Path of the database file, created if missing
+        :type path: str
+        :param max_entries: Maximum number of cached lines
+        :type max_entries: int
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive, not {max_entries!r}.")
+
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        meta = dict(self._connection.execute("SELECT name, value FROM meta"))
+        self._generation = meta["generation"] + 1 if "generation" in meta else 0
+        # Kept up to date by flush(), so it does not have to count all entries.
+        self._count = meta.get("count")
+        if self._count is None:
+            (self._count,) = self._connection.execute("SELECT COUNT(*) FROM outcomes").fetchone()
+        self._max_entries = max_entries
+        # The outcomes also depend on the ISO3166 data in use and on the interpreter, whose ipaddress module
+        # classifies the networks.
+        python_version = "{}.{}".format(*sys.version_info[:2])
+        self._prefix = f"{geofeed_validator.__version__}\0{get_data_version()}\0{python_version}\0".encode()
+        # Hash states of the prefix and validator name by validator name, copied for each line
+        self._hashes = {}
+
+        self._pending = {}
+        self._used = set()
+        self._prefetched = {}
+
+        #: Number of lines found in the cache
+        self.hits = 0
+        #: Number of lines not found in the cache
+        self.misses = 0
+        #: Number of entries evicted
+        self.evictions = 0
+
+    def get_key(self, validator_name, line):
+        """
+        :param validator_name: NAME of the validator
+        :type validator_name: str
+        :param line: Raw line
+        :type line: str
+        :returns: Cache key of the line
+        :rtype: bytes
+        """
+        base = self._hashes.get(validator_name)
+        if base is None:
+            base = self._hashes[validator_name] = hashlib.blake2b(
+                self._prefix + validator_name.encode() + b"\0", digest_size=16
+            )
+        line_hash = base.copy()
+        line_hash.update(line.encode("utf-8", "surrogatepass"))
+        return line_hash.digest()
+
+    def prefetch(self, keys):
+        """
+        Looks up several keys at once, which is considerably faster than looking them up one by one. The outcomes
+        are kept until the next call, for get() to return.
+
+        :param keys: Cache keys, as returned by get_key()
+        :type keys: list of bytes
+        """
+        keys = list(set(keys))
+        self._prefetched = dict.fromkeys(keys)
+        for start in range(0, len(keys), _MAX_PARAMETERS):
+            batch = keys[start : start + _MAX_PARAMETERS]
+            rows = self._connection.execute(
+                f"SELECT key, outcome, generation FROM outcomes WHERE key IN ({','.join('?' * len(batch))})", batch
+            )
+            self._prefetched.update((key, (outcome, generation)) for key, outcome, generation in rows)
+
+    def get(self, key):
+        """
+        :param key: Cache key, as returned by get_key()
+        :type key: bytes
+        :returns: Outcome of the field checks if cached, None otherwise
+        :rtype: list or None
+        """
+        outcome = self._pending.get(key)
+        if outcome is None:
+            if key in self._prefetched:
+                row = self._prefetched[key]
+            else:
+                row = self._connection.execute(
+                    "SELECT outcome, generation FROM outcomes WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            outcome = _decode(row[0])
+            if row[1] <= self._generation - REFRESH_INTERVAL:
+                self._used.add(key)
+
+        self.hits += 1
+        return outcome
+
+    def put(self, key, outcome):
+        """
+        :param key: Cache key, as returned by get_key()
+        :type key: bytes
+        :param outcome: Outcome of the field checks
+        :type outcome: list
+        """
+        self._pending[key] = outcome
+
+    def flush(self):
+        """
+        Writes new entries, records the use of existing entries and evicts the least recently used entries once
+        there are more than max_entries.
+        """
+        generation = self._generation
+        # Writing in key order keeps the pages touched in order.
+        with self._connection:
+            # Entries already written, e.g. by another process sharing the file, are identical.
+            inserted = self._connection.executemany(
+                "INSERT OR IGNORE INTO outcomes VALUES (?, ?, ?)",
+                ((key, _encode(self._pending[key]), generation) for key in sorted(self._pending)),
+            ).rowcount
+            self._connection.executemany(
+                "UPDATE outcomes SET generation = ? WHERE key = ?", ((generation, key) for key in sorted(self._used))
+            )
+
+            count = self._count + max(inserted, 0)
+            if count > self._max_entries:
+                evict = count - int(self._max_entries * EVICTION_TARGET)
+                count -= self._connection.execute(
+                    "DELETE FROM outcomes WHERE key IN (SELECT key FROM outcomes ORDER BY generation LIMIT ?)",
+                    (evict,),
+                ).rowcount
+                self.evictions += evict
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (("generation", generation), ("count", count))
+            )
+        self._count = count
+
+        self._pending = {}
+        self._used = set()
+        self._prefetched = {}
+        self._generation += 1
+
+    def __len__(self):
+        return self._count + len(self._pending)
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
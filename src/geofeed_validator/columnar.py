@@ -0,0 +1,399 @@
+# geofeed_validator/columnar.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+import re
+from array import array
+from collections.abc import Sequence
+
+from geofeed_validator.fields import Field
+from geofeed_validator.iso3166 import to_pycountry
+from geofeed_validator.result import (
+    _EMPTY,
+    _UNRESOLVED,
+    FieldResult,
+    RecordValidationResult,
+    ValidationResult,
+    get_outcome,
+)
+
+# Record flags
+_IGNORED = 1
+_HAS_ERRORS = 2
+_HAS_WARNINGS = 4
+
+# Finding kinds
+_ERROR = 0
+_WARNING = 1
+
+#: Line numbers referenced by messages, which are stored as arguments of the message template
+_ARGUMENT = re.compile(r"(?<=#)\d+")
+
+
+class ColumnarValidationResult(ValidationResult):
+    """
+    Validation result storing records column by column instead of as one object per record.
+
+    Each field has a column of canonical value strings, raw values are only kept where they differ from those.
+    Errors and warnings are stored as findings in parallel arrays of record number, field position and message
+    code. Messages are interned as templates in a table shared by all records, line numbers referenced by a
+    message (e.g. "Duplicate of line #123") are kept as arguments of the finding. Record flags are kept in a
+    byte per record.
+
+    records provides the usual object API as views created on access. Values are parsed again from their value
+    strings when accessed, field results of views are snapshots: findings have to be added using
+    add_field_errors() and add_field_warnings() of the record.
+    """
+
+    def __init__(self, fields, store_raw_records=False, problems_only=False, field_index=None):
+        if problems_only:
+            raise ValueError("Columnar results always store all records, problems_only is not supported.")
+
+        super().__init__(fields, store_raw_records, field_index=field_index)
+        self._flags = bytearray()
+        self._raw_records = []
+        self._value_strings = [[] for _ in fields]
+        self._raw_overrides = {}
+        self._extras = {}
+
+        #: Fields findings were added for which the validator does not define, positioned after fields
+        self._other_fields = []
+
+        self._messages = []
+        self._message_codes = {}
+        self._finding_records = array("L")
+        self._finding_fields = array("H")
+        self._finding_codes = array("L")
+        self._finding_kinds = bytearray()
+        self._finding_arguments = []
+        self._findings_by_record = {}
+
+        # Most recently added record, which keeps its parsed values for the common checks
+        self._live = None
+
+    def add_record(self, record, raw_data, outcome=None, cleaned=None):
+        """
+        :param record: Record data as dict
+        :type record: dict of (Field, value)
+        :param outcome: Outcome of the field checks of an identical record, see RecordValidationResult.validate()
+        :type outcome: list or None
+        :param cleaned: Results of Field.clean() computed elsewhere, see RecordValidationResult.validate()
+        :type cleaned: dict of (int, tuple) or None
+        :returns: Validation result of the record
+        :rtype: ColumnarRecordResult
+        """
+        record_validation = RecordValidationResult(len(self._flags), self._fields, record, raw_data, self._field_index)
+        record_validation.validate(outcome, cleaned)
+        return self.add_record_result(record_validation)
+
+    def add_record_result(self, record_validation):
+        """
+        Stores a record that has already been validated, e.g. in another process, numbering it by its position in
+        this result.
+
+        :param record_validation: Validated record
+        :type record_validation: RecordValidationResult
+        :returns: View of the stored record
+        :rtype: ColumnarRecordResult
+        """
+        record_no = len(self._flags)
+        self._flags.append(_IGNORED if record_validation.was_ignored else 0)
+        if self._store_raw_records:
+            self._raw_records.append(record_validation.raw)
+        if record_validation.extra:
+            self._extras[record_no] = (record_validation.extra, record_validation.extra_offset)
+
+        field_results = record_validation._field_results
+        values = [None] * len(self._fields)
+        for index, column in enumerate(self._value_strings):
+            field_result = field_results[index] if index < len(field_results) else None
+            if field_result is None:
+                column.append(None)
+                continue
+
+            column.append(field_result.value_string)
+            if field_result.raw != field_result.value_string:
+                self._raw_overrides[record_no, index] = field_result.raw
+            values[index] = field_result._get_value()
+            self._add_findings(record_no, index, _ERROR, field_result.errors)
+            self._add_findings(record_no, index, _WARNING, field_result.warnings)
+
+        for field_result in field_results[len(self._fields) :]:
+            index = self._get_position(field_result.field, create=True)
+            self._add_findings(record_no, index, _ERROR, field_result.errors)
+            self._add_findings(record_no, index, _WARNING, field_result.warnings)
+
+        # Only the most recent record keeps its parsed values.
+        if self._live is not None:
+            self._live._values = None
+        self._live = ColumnarRecordResult(self, record_no, values)
+        return self._live
+
+    def _get_position(self, field_name_or_class, create=False):
+        if isinstance(field_name_or_class, Field):
+            field_name = field_name_or_class.name
+        elif isinstance(field_name_or_class, type) and issubclass(field_name_or_class, Field):
+            field_name = field_name_or_class.NAME
+        else:
+            field_name = field_name_or_class
+
+        index = self._field_index.get(field_name)
+        if index is not None:
+            return index
+
+        for index, field in enumerate(self._other_fields, len(self._fields)):
+            if field.name == field_name:
+                return index
+
+        if not create:
+            return None
+        self._other_fields.append(field_name_or_class)
+        return len(self._fields) + len(self._other_fields) - 1
+
+    def _get_field(self, index):
+        if index < len(self._fields):
+            return self._fields[index]
+        return self._other_fields[index - len(self._fields)]
+
+    def _add_findings(self, record_no, index, kind, messages):
+        if not messages:
+            return
+
+        positions = self._findings_by_record.setdefault(record_no, [])
+        for message in messages:
+            arguments = _ARGUMENT.findall(message)
+            template = message.replace("{", "{{").replace("}", "}}")
+            if arguments:
+                template = _ARGUMENT.sub("{}", template)
+            code = self._message_codes.get(template)
+            if code is None:
+                code = self._message_codes[template] = len(self._messages)
+                self._messages.append(template)
+
+            positions.append(len(self._finding_codes))
+            self._finding_records.append(record_no)
+            self._finding_fields.append(index)
+            self._finding_codes.append(code)
+            self._finding_kinds.append(kind)
+            self._finding_arguments.append(tuple(arguments) if arguments else None)
+
+        if kind == _ERROR:
+            self._counts.add_errors(self._get_field(index), messages)
+            self._flags[record_no] |= _HAS_ERRORS
+        else:
+            self._counts.add_warnings(self._get_field(index), messages)
+            self._flags[record_no] |= _HAS_WARNINGS
+
+    def _get_message(self, position):
+        return self._messages[self._finding_codes[position]].format(*(self._finding_arguments[position] or ()))
+
+    def iter_findings(self, code=None):
+        """
+        Iterates over the errors and warnings in the order they were found.
+
+        :param code: Only yield findings of this message code, all findings if None
+        :type code: int or None
+        :returns: Iterator over (record number, field, message, is error) tuples
+        :rtype: iterator of (int, Field, str, bool)
+        """
+        for position, finding_code in enumerate(self._finding_codes):
+            if code is None or finding_code == code:
+                yield (
+                    self._finding_records[position],
+                    self._get_field(self._finding_fields[position]),
+                    self._get_message(position),
+                    self._finding_kinds[position] == _ERROR,
+                )
+
+    def count_findings(self, code):
+        """
+        :param code: Message code
+        :type code: int
+        :returns: Number of errors and warnings of the message code
+        :rtype: int
+        """
+        return self._finding_codes.count(code)
+
+    @property
+    def messages(self):
+        """
+        Message templates of the errors and warnings, indexed by their message code. Line numbers referenced by
+        the messages are replaced by {} placeholders.
+        """
+        return tuple(self._messages)
+
+    @property
+    def records_raw(self):
+        if not self._store_raw_records:
+            return []
+        return list(self._raw_records)
+
+    @property
+    def record_count(self):
+        return len(self._flags)
+
+    @property
+    def records(self):
+        return ColumnarRecords(self)
+
+
+class ColumnarRecords(Sequence):
+    """
+    Sequence of the records of a ColumnarValidationResult, creating record views on access
+    """
+
+    __slots__ = ("_result",)
+
+    def __init__(self, result):
+        self._result = result
+
+    def __len__(self):
+        return len(self._result._flags)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return ColumnarRecordResult(self._result, index)
+
+
+class ColumnarRecordResult:
+    """
+    View of a single record of a ColumnarValidationResult, providing the API of RecordValidationResult
+    """
+
+    __slots__ = ("_result", "_record_no", "_values")
+
+    def __init__(self, result, record_no, values=None):
+        self._result = result
+        self._record_no = record_no
+        self._values = values
+
+    def _field_result(self, index):
+        result = self._result
+        errors = []
+        warnings = []
+        for position in result._findings_by_record.get(self._record_no, ()):
+            if result._finding_fields[position] == index:
+                messages = errors if result._finding_kinds[position] == _ERROR else warnings
+                messages.append(result._get_message(position))
+
+        field = result._get_field(index)
+        if self.was_ignored or index >= len(result._fields):
+            if not errors and not warnings:
+                return None
+            return FieldResult(field, None, errors or _EMPTY, warnings or _EMPTY, None, "")
+
+        value_string = result._value_strings[index][self._record_no]
+        raw = result._raw_overrides.get((self._record_no, index), value_string)
+        value = self._values[index] if self._values is not None else _UNRESOLVED
+        return FieldResult(field, value, errors or _EMPTY, warnings or _EMPTY, raw, value_string)
+
+    @property
+    def field_results(self) -> list[FieldResult]:
+        field_results = (
+            self._field_result(i) for i in range(len(self._result._fields) + len(self._result._other_fields))
+        )
+        return [fr for fr in field_results if fr is not None]
+
+    def add_field_errors(self, field, errors):
+        if isinstance(errors, str):
+            errors = [errors]
+        self._result._add_findings(self._record_no, self._result._get_position(field, create=True), _ERROR, errors)
+
+    def add_field_warnings(self, field, warnings):
+        if isinstance(warnings, str):
+            warnings = [warnings]
+        self._result._add_findings(self._record_no, self._result._get_position(field, create=True), _WARNING, warnings)
+
+    def get_outcome(self):
+        """
+        See RecordValidationResult.get_outcome().
+        """
+        return get_outcome(self._field_result(index) for index in range(len(self._result._fields)))
+
+    def get_field_result(self, field_name_or_class):
+        """
+        :param field_name_or_class: Field name or class
+        :type field_name_or_class: str or Field
+        :returns: FieldResult instance if found, None otherwise.
+        :rtype: FieldResult
+        """
+        index = self._result._get_position(field_name_or_class)
+        return self._field_result(index) if index is not None else None
+
+    def get_field_value(self, field_name_or_class):
+        return to_pycountry(self._get_field_value(field_name_or_class))
+
+    def _get_field_value(self, field_name_or_class):
+        index = self._result._get_position(field_name_or_class)
+        if index is None or index >= len(self._result._fields) or self.was_ignored:
+            return None
+        if self._values is not None:
+            return self._values[index]
+        return self._field_result(index)._get_value()
+
+    @property
+    def raw(self):
+        if not self._result._store_raw_records:
+            return None
+        return self._result._raw_records[self._record_no]
+
+    @property
+    def extra_offset(self):
+        return self._result._extras.get(self._record_no, (_EMPTY, 0))[1]
+
+    @property
+    def extra(self):
+        return self._result._extras.get(self._record_no, (_EMPTY, 0))[0]
+
+    @property
+    def error_count(self):
+        kinds = self._result._finding_kinds
+        return sum(1 for p in self._result._findings_by_record.get(self._record_no, ()) if kinds[p] == _ERROR)
+
+    @property
+    def warning_count(self):
+        kinds = self._result._finding_kinds
+        return sum(1 for p in self._result._findings_by_record.get(self._record_no, ()) if kinds[p] == _WARNING)
+
+    @property
+    def has_errors(self):
+        return bool(self._result._flags[self._record_no] & _HAS_ERRORS)
+
+    @property
+    def has_warnings(self):
+        return bool(self._result._flags[self._record_no] & _HAS_WARNINGS)
+
+    @property
+    def record_no(self):
+        return self._record_no
+
+    @property
+    def was_ignored(self):
+        return bool(self._result._flags[self._record_no] & _IGNORED)
@@ -24,14 +24,35 @@
 #
 
 from contextlib import suppress
-from ipaddress import IPv4Network, IPv6Network, ip_network
+from ipaddress import ip_network
 
-import pycountry
+from geofeed_validator.iso3166 import get_country, get_subdivision, to_pycountry
+from geofeed_validator.prefix import IPPrefix, parse_prefix
+from geofeed_validator.special_networks import classify_network
+from geofeed_validator.utils import LRUCache
+
+#: Hooks taking the raw value, paired with their counterparts that also receive the value parsed by to_python.
+_PARSED_HOOKS = (
+    ("_check_errors", "_check_errors_parsed"),
+    ("_check_warnings", "_check_warnings_parsed"),
+    ("to_string", "_to_string_parsed"),
+)
+
+#: Number of values whose outcome is cached by the fields caching it by default
+DEFAULT_CACHE_SIZE = 4096
 
 
 class Field:
     """
     Base class for representing a field
+
+    Fields parse a value once, using to_python, and pass the result to the *_parsed hooks, which produce the
+    errors, warnings and canonical string from it. By default these hooks call their raw value counterparts
+    _check_errors, _check_warnings and to_string, which parse the value again.
+
+    Fields setting CACHE_SIZE keep the outcome of clean() for the values validated most recently, in a cache shared
+    by all instances of the field class. This is only correct for fields whose outcome depends on the value alone.
+    CACHE_SIZE is not inherited, as subclasses may check values differently: each class caching outcomes sets it.
     """
 
     ERROR = None
@@ -39,6 +60,50 @@ class Field:
     REQUIRED = True
     WARNING = None
 
+    #: Passed to the *_parsed hooks in place of the parsed value if to_python failed.
+    INVALID = object()
+
+    #: Number of values whose outcome clean() caches, None to not cache outcomes
+    CACHE_SIZE = None
+
+    _cache = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # A subclass overriding a raw value hook, but not its parsed counterpart, expects its override to be
+        # called: fall back to the default parsed hook, which calls the raw value hook.
+        for hook, parsed_hook in _PARSED_HOOKS:
+            for klass in cls.__mro__:
+                if parsed_hook in vars(klass):
+                    break
+                if hook in vars(klass):
+                    setattr(cls, parsed_hook, getattr(Field, parsed_hook))
+                    break
+        # Subclasses check values differently, each class opts in to a cache of its own.
+        if "CACHE_SIZE" not in vars(cls):
+            cls.CACHE_SIZE = None
+        cls._cache = LRUCache(cls.CACHE_SIZE) if cls.CACHE_SIZE else None
+
+    @classmethod
+    def set_cache_size(cls, size):
+        """
+        Replaces the cache of clean() of the field class, but not the ones of its subclasses, by an empty one.
+
+        :param size: Number of values whose outcome is cached, None to not cache outcomes
+        :type size: int or None
+        """
+        cls._cache = LRUCache(size) if size else None
+        cls.CACHE_SIZE = size
+
+    @classmethod
+    def get_cache(cls):
+        """
+        :returns: Cache of clean() of the field class, whose statistics help tuning CACHE_SIZE. None if outcomes
+            are not cached.
+        :rtype: geofeed_validator.utils.LRUCache or None
+        """
+        return cls._cache
+
     def __init__(self):
         if not isinstance(getattr(self, "ERROR", None), str):
             raise ValueError(f"ERROR class-attribute of {self.__class__!r} not set or invalid.")
@@ -56,15 +121,61 @@ class Field:
     def _check_warnings(self, value):
         return False
 
-    def validate(self, value):
-        errors = self._normalize_check_result(self._check_errors(value), self.ERROR)
-        warnings = self._normalize_check_result(self._check_warnings(value), self.WARNING)
+    def _check_errors_parsed(self, value, cleaned_value):
+        return self._check_errors(value)
 
-        cleaned_value = None
-        with suppress(Exception):
-            cleaned_value = self.to_python(value)
+    def _check_warnings_parsed(self, value, cleaned_value):
+        return self._check_warnings(value)
 
-        return errors, warnings, cleaned_value
+    def _to_string_parsed(self, value, cleaned_value):
+        return self.to_string(value)
+
+    def _parse(self, value):
+        try:
+            return self.to_python(value)
+        except Exception:
+            return self.INVALID
+
+    def _from_string(self, value_string):
+        """
+        Parses a string returned by to_string() back into a value, e.g. to restore a result without its values.
+        """
+        return self.to_python(value_string)
+
+    def clean(self, value):
+        """
+        Validates a value, parsing it only once.
+
+        :param value: Value to validate
+        :type value: str
+        :returns: Errors, warnings, the cleaned value (None if invalid) and the canonical string of the value
+        :rtype: (tuple of str, tuple of str, object, str)
+        """
+        cache = self._cache
+        if cache is None:
+            return self._clean(value)
+
+        outcome = cache.get(value)
+        if outcome is None:
+            errors, warnings, cleaned_value, value_string = self._clean(value)
+            # Shared by all records with the value, so immutable
+            outcome = (tuple(errors), tuple(warnings), cleaned_value, value_string)
+            cache.put(value, outcome)
+        return outcome
+
+    def _clean(self, value):
+        cleaned_value = self._parse(value)
+        errors = self._normalize_check_result(self._check_errors_parsed(value, cleaned_value), self.ERROR)
+        warnings = self._normalize_check_result(self._check_warnings_parsed(value, cleaned_value), self.WARNING)
+        value_string = self._to_string_parsed(value, cleaned_value)
+
+        if cleaned_value is self.INVALID:
+            cleaned_value = None
+        return errors, warnings, cleaned_value, value_string
+
+    def validate(self, value):
+        errors, warnings, cleaned_value, _ = self.clean(value)
+        return errors, warnings, to_pycountry(cleaned_value)
 
     @staticmethod
     def _normalize_check_result(check_result, default):
@@ -114,78 +225,80 @@ class NetworkField(Field):
     NAME = "network"
 
     def _check_errors(self, value: str) -> bool | str:
-        try:
-            net = self.to_python(value)
-        except Exception:
+        return NetworkField._check_errors_parsed(self, value, self._parse(value))
+
+    def _check_errors_parsed(self, value: str, net: IPPrefix) -> bool | str:
+        if net is self.INVALID:
             with suppress(ValueError):
                 net = ip_network(value, strict=False)
                 return self.ERROR_HOSTBITS.format(net.compressed)
             return True
 
-        if net.is_link_local:
-            return self.ERROR_LINKLOCAL
-        elif net.is_loopback:
-            return self.ERROR_LOOPBACK
-        elif net.is_multicast:
-            return self.ERROR_MULTICAST
-        elif net.is_reserved:  # reserved are also private - check first
-            return self.ERROR_RESERVED
-        elif net.is_private:
-            return self.ERROR_PRIVATE
+        # Link-local, loopback, multicast, reserved (reserved are also private - checked first) or private
+        error = classify_network(net)
+        return getattr(self, error) if error else False
 
-        return False
+    def to_python(self, value: str) -> IPPrefix:
+        return parse_prefix(value)
 
-    def to_python(self, value: str) -> IPv4Network | IPv6Network:
-        return ip_network(value)
+    def _to_string_parsed(self, value, net):
+        return str(net) if net is not self.INVALID else None
 
 
 class CountryField(Field):
     ERROR = "Not a valid ISO3166-1 country code"
     NAME = "country"
+    CACHE_SIZE = DEFAULT_CACHE_SIZE
 
     def _check_errors(self, value):
-        return bool(value and not self.to_python(value))
+        return CountryField._check_errors_parsed(self, value, self._parse(value))
+
+    def _check_errors_parsed(self, value, country):
+        return bool(value and (country is self.INVALID or not country))
 
     def to_python(self, value):
         if value:
-            return pycountry.countries.get(alpha_2=value)
+            return get_country(value)
         return None
 
     def to_string(self, value):
-        if value:
-            try:
-                country = self.to_python(value)
-                return country.alpha_2
-            except Exception:
-                pass
+        return CountryField._to_string_parsed(self, value, self._parse(value))
+
+    def _to_string_parsed(self, value, country):
+        if value and country is not self.INVALID and country:
+            return country.alpha_2
         return ""
 
 
 class SubdivisionField(Field):
     ERROR = "Not a valid ISO3166-2 subdivision code"
     NAME = "subdivision"
+    CACHE_SIZE = DEFAULT_CACHE_SIZE
 
     def _check_errors(self, value):
-        return bool(value and not self.to_python(value))
+        return SubdivisionField._check_errors_parsed(self, value, self._parse(value))
+
+    def _check_errors_parsed(self, value, subdivision):
+        return bool(value and (subdivision is self.INVALID or not subdivision))
 
     def to_python(self, value):
         if value:
-            return pycountry.subdivisions.get(code=value)
+            return get_subdivision(value)
         return None
 
     def to_string(self, value):
-        if value:
-            try:
-                subdivision = self.to_python(value)
-                return subdivision.code
-            except Exception:
-                pass
+        return SubdivisionField._to_string_parsed(self, value, self._parse(value))
+
+    def _to_string_parsed(self, value, subdivision):
+        if value and subdivision is not self.INVALID and subdivision:
+            return subdivision.code
         return ""
 
 
 class CityField(Field):
     ERROR = "unvalidated"
     NAME = "city"
+    CACHE_SIZE = DEFAULT_CACHE_SIZE
 
     def _check_errors(self, value):
         # TODO: city is not validated right now
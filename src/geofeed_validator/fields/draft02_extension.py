@@ -31,11 +31,10 @@ class AllocationSizeField(Field):
     NAME = "allocation_size"
 
     def _check_errors(self, value):
-        try:
-            self.to_python(value)
-        except Exception:
-            return True
-        return False
+        return AllocationSizeField._check_errors_parsed(self, value, self._parse(value))
+
+    def _check_errors_parsed(self, value, allocation_size):
+        return allocation_size is self.INVALID
 
     def to_python(self, value):
         if value and not value.startswith("/"):
@@ -44,3 +43,15 @@ class AllocationSizeField(Field):
             return int(value[1:])
         else:
             return ""
+
+    def to_string(self, value):
+        return AllocationSizeField._to_string_parsed(self, value, self._parse(value))
+
+    def _to_string_parsed(self, value, allocation_size):
+        if allocation_size is self.INVALID:
+            return None
+        return str(allocation_size)
+
+    def _from_string(self, value_string):
+        # The string of an allocation size is its prefix length, without the leading slash.
+        return int(value_string) if value_string else ""
@@ -23,9 +23,9 @@
 # Gerhard Bogner <gbogner@anexia-it.com>
 #
 
-from pycountry import countries
-
 from geofeed_validator.fields import CityField, CountryField, NetworkField, SubdivisionField, ZipCodeField
+from geofeed_validator.fields.base import DEFAULT_CACHE_SIZE
+from geofeed_validator.iso3166 import get_country
 
 
 class Alpha2CodeField(CountryField):
@@ -33,19 +33,24 @@ class Alpha2CodeField(CountryField):
     NAME = "alpha2code"
     REQUIRED = False
     WARNING = "Not an assigned ISO3316-1 alpha-2 code"
+    CACHE_SIZE = DEFAULT_CACHE_SIZE
 
     def _check_errors(self, value: str) -> bool:
         return bool(value) and not (len(value) == 2 and value.isalpha() and value.isascii())
 
     def _check_warnings(self, value: str) -> bool:
-        return len(value) == 2 and value.isalpha() and value.isascii() and not self.to_python(value)
+        return Alpha2CodeField._check_warnings_parsed(self, value, self._parse(value))
+
+    def _check_warnings_parsed(self, value: str, country) -> bool:
+        return len(value) == 2 and value.isalpha() and value.isascii() and (country is self.INVALID or not country)
 
     def to_python(self, value):
-        return countries.get(alpha_2=value.upper()) if value else None
+        return get_country(value) if value else None
 
 
 class CityFieldFinal(CityField):
     REQUIRED = False
+    CACHE_SIZE = DEFAULT_CACHE_SIZE
 
 
 class IPPrefixField(NetworkField):
@@ -73,3 +78,4 @@ class PostalCodeField(ZipCodeField):
 class RegionField(SubdivisionField):
     NAME = "region"
     REQUIRED = False
+    CACHE_SIZE = DEFAULT_CACHE_SIZE
@@ -0,0 +1,1164 @@
+# geofeed_validator/incremental.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+import json
+import random
+import re
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import MutableSequence
+from ipaddress import IPV4LENGTH, IPV6LENGTH
+
+import geofeed_validator
+from geofeed_validator.prefix import get_address_range
+from geofeed_validator.result import RecordValidationResult
+from geofeed_validator.utils import get_data_version
+from geofeed_validator.validator.base import BaseCSVValidator, BaseValidator, Registry
+
+#: Record numbers referenced by messages, e.g. "Duplicate of line #123"
+_REFERENCE = re.compile(r"#(\d+)")
+
+_MISSING = object()
+
+
+def _get_versions():
+    return [geofeed_validator.__version__, get_data_version()]
+
+
+def _find_validator(validator):
+    if isinstance(validator, type) and issubclass(validator, BaseValidator):
+        return validator
+    if isinstance(validator, str):
+        return Registry.find(validator)
+    raise ValueError(f"Validator {validator!r} is invalid.")
+
+
+def _sweep_parents(ranges):
+    """
+    Finds the closest enclosing network of each network, like BaseValidator._validate_common_network_overlaps.
+
+    :param ranges: (IP version, first address, negated last address, network) of each network, sorted
+    :type ranges: list of tuple
+    :returns: Closest enclosing network by network, for networks contained in another one
+    :rtype: dict of (str, str)
+    """
+    parents = {}
+    stack = []
+    for version, first, negative_last, network in ranges:
+        while stack and (stack[-1][0] != version or -stack[-1][1] < first):
+            stack.pop()
+        if stack:
+            parents[network] = stack[-1][2]
+        stack.append((version, negative_last, network))
+    return parents
+
+
+def _get_entry(validator, record):
+    """
+    :returns: Network, location and findings of a validated record (None for ignored records) and the address
+        range of its network
+    :rtype: (tuple or None, tuple or None)
+    """
+    if record.was_ignored:
+        return None, None
+
+    network_field = validator._role_fields["network"]
+    ip_prefix = record.get_field_result(network_field) if network_field else None
+    network = ip_prefix.value_string if ip_prefix and ip_prefix.value_string else None
+    location = tuple(
+        getattr(record.get_field_result(field), "value_string", None) for field in validator._get_location_fields()
+    )
+    findings = []
+    for field_result in record.field_results:
+        findings.extend((field_result.field.name, True, error) for error in field_result.errors)
+        findings.extend((field_result.field.name, False, warning) for warning in field_result.warnings)
+
+    network_range = None
+    if network is not None:
+        network_range = get_address_range(ip_prefix.peek_value())
+    return (network, location, tuple(findings)), network_range
+
+
+def _validate_line(validator, field_index, record_no, line):
+    """
+    Runs the checks of a line that do not depend on other lines.
+
+    :returns: See _get_entry()
+    :rtype: (tuple or None, tuple or None)
+    """
+    record = RecordValidationResult(record_no, validator._fields, validator.parse_line(line), line, field_index)
+    record.validate()
+    if not record.was_ignored:
+        validator._validate_common_record(record)
+    return _get_entry(validator, record)
+
+
+class Problem:
+    """
+    An error or warning of a record, as reported by FeedDiff and EditableFeed
+    """
+
+    __slots__ = ("record_no", "raw", "field_name", "message", "is_error", "_key")
+
+    def __init__(self, record_no, raw, field_name, message, is_error, lines):
+        """
+        :param record_no: Record number
+        :type record_no: int
+        :param raw: Line of the record
+        :type raw: str
+        :param field_name: Name of the field the problem was found in
+        :type field_name: str
+        :param message: Error or warning message
+        :type message: str
+        :param is_error: Whether the problem is an error, a warning otherwise
+        :type is_error: bool
+        :param lines: Lines of the feed, to identify records referenced by the message
+        :type lines: sequence of str
+        """
+        self.record_no = record_no
+        self.raw = raw
+        self.field_name = field_name
+        self.message = message
+        self.is_error = is_error
+
+        # Identified by content instead of record numbers, which change with every line inserted or removed.
+        self._key = (
+            raw,
+            field_name,
+            is_error,
+            _REFERENCE.sub("#", message),
+            tuple(lines[int(n)] for n in _REFERENCE.findall(message)),
+        )
+
+    def __repr__(self):
+        kind = "E" if self.is_error else "W"
+        return f"<Problem {kind} #{self.record_no} {self.field_name}: {self.message}>"
+
+
+class FeedDiff:
+    """
+    Differences between two versions of a feed, as returned by FeedIndex.update()
+    """
+
+    def __init__(self, index, inserted, removed, introduced, resolved):
+        #: Index, updated to the new version of the feed
+        self.index = index
+        #: Record numbers of the lines inserted into the new version of the feed
+        self.inserted = inserted
+        #: Record numbers of the lines removed from the previous version of the feed
+        self.removed = removed
+        #: Problems of the new version not found in the previous version, numbered as in the new version
+        self.introduced = introduced
+        #: Problems of the previous version not found in the new version, numbered as in the previous version
+        self.resolved = resolved
+
+
+def _get_size(node):
+    return node.size if node is not None else 0
+
+
+def _attach(node):
+    node.size = 1 + _get_size(node.left) + _get_size(node.right)
+    if node.left is not None:
+        node.left.parent = node
+    if node.right is not None:
+        node.right.parent = node
+    return node
+
+
+def _merge(first, second):
+    """
+    :returns: Root of a treap of the nodes of the first treap followed by the ones of the second
+    :rtype: _Node or None
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if first.priority > second.priority:
+        first.right = _merge(first.right, second)
+        return _attach(first)
+    second.left = _merge(first, second.left)
+    return _attach(second)
+
+
+def _split(node, count):
+    """
+    :returns: Roots of a treap of the first count nodes of a treap and of a treap of the remaining ones
+    :rtype: (_Node or None, _Node or None)
+    """
+    if node is None:
+        return None, None
+    if _get_size(node.left) >= count:
+        first, node.left = _split(node.left, count)
+        return first, _attach(node)
+    node.right, second = _split(node.right, count - _get_size(node.left) - 1)
+    return _attach(node), second
+
+
+def _build(nodes):
+    """
+    Builds a treap of nodes in order in linear time, as the Cartesian tree of their priorities.
+
+    :returns: Root of the treap
+    :rtype: _Node or None
+    """
+    stack = []
+    for node in nodes:
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+    if not stack:
+        return None
+
+    # Children before their parents
+    order = [stack[0]]
+    for node in order:
+        order.extend(child for child in (node.left, node.right) if child is not None)
+    for node in reversed(order):
+        _attach(node)
+    stack[0].parent = None
+    return stack[0]
+
+
+def _get_position(node):
+    """
+    :returns: Number of nodes preceding a node in its treap, the record number for EditableFeed
+    :rtype: int
+    """
+    position = _get_size(node.left)
+    while node.parent is not None:
+        if node is node.parent.right:
+            position += _get_size(node.parent.left) + 1
+        node = node.parent
+    return position
+
+
+def _get_rank(node, key):
+    """
+    :returns: Number of nodes of a treap ordered by key with a key less than the given one
+    :rtype: int
+    """
+    rank = 0
+    while node is not None:
+        if node.key < key:
+            rank += _get_size(node.left) + 1
+            node = node.right
+        else:
+            node = node.left
+    return rank
+
+
+def _iter_from(node):
+    """
+    :returns: Iterator over a node and the nodes following it in its treap
+    :rtype: iterator of _RangeNode or _Node
+    """
+    while node is not None:
+        yield node
+        if node.right is not None:
+            node = node.right
+            while node.left is not None:
+                node = node.left
+        else:
+            while node.parent is not None and node is node.parent.right:
+                node = node.parent
+            node = node.parent
+
+
+class _RangeNode:
+    """
+    Network of _NetworkOverlaps, a node of a treap ordered by address range
+    """
+
+    __slots__ = ("key", "priority", "size", "left", "right", "parent")
+
+    def __init__(self, key):
+        #: (IP version, first address, negated last address, network)
+        self.key = key
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+        self.parent = None
+
+
+class _NetworkOverlaps:
+    """
+    Address ranges of the networks of a feed and the closest enclosing network of each network, updated as
+    networks are added and removed.
+
+    The networks are kept in a treap ordered by address range, in which the networks within a network directly
+    follow it. Adding or removing a network takes logarithmic time in the number of networks plus the time to visit
+    the networks within it.
+    """
+
+    def __init__(self):
+        #: (IP version, first address, last address) by network
+        self.ranges = {}
+        #: Network by (IP version, first address, last address)
+        self.by_range = {}
+        #: Treap node by network
+        self.nodes = {}
+        self.root = None
+        #: Closest enclosing network by network
+        self.parents = {}
+
+    def set_sorted(self, ranges):
+        """
+        :param ranges: (IP version, first address, negated last address, network) of each network, sorted
+        :type ranges: list of tuple
+        """
+        nodes = [_RangeNode(key) for key in ranges]
+        self.nodes = {node.key[3]: node for node in nodes}
+        self.root = _build(nodes)
+
+    def iter_sorted(self):
+        """
+        :returns: Iterator over (IP version, first address, negated last address, network) of each network, sorted
+        :rtype: iterator of tuple
+        """
+        node = self.root
+        while node is not None and node.left is not None:
+            node = node.left
+        return (node.key for node in _iter_from(node))
+
+    def rebuild(self):
+        ranges = sorted((version, first, -last, network) for network, (version, first, last) in self.ranges.items())
+        self.set_sorted(ranges)
+        self.by_range = {network_range: network for network, network_range in self.ranges.items()}
+        self.parents = _sweep_parents(ranges)
+
+    def _find_parent(self, version, first, last):
+        # Enclosing networks are prefixes of the network, at most one per prefix length.
+        bits = IPV4LENGTH if version == 4 else IPV6LENGTH
+        for host_bits in range((last - first + 1).bit_length(), bits + 1):
+            mask = (1 << host_bits) - 1
+            parent = self.by_range.get((version, first & ~mask, (first & ~mask) | mask))
+            if parent is not None:
+                return parent
+        return None
+
+    @staticmethod
+    def _iter_descendants(node):
+        # Networks within a network directly follow it in sorted order.
+        version, _, negative_last, _ = node.key
+        descendants = _iter_from(node)
+        next(descendants)
+        for descendant in descendants:
+            descendant_version, first, _, network = descendant.key
+            if descendant_version != version or first > -negative_last:
+                return
+            yield network
+
+    def iter_children(self, network):
+        """
+        :returns: Iterator over the networks directly contained in a network
+        :rtype: iterator of str
+        """
+        return (
+            descendant
+            for descendant in self._iter_descendants(self.nodes[network])
+            if self.parents.get(descendant) == network
+        )
+
+    def _set_parent(self, network, parent, old_parents):
+        old_parents.setdefault(network, self.parents.get(network))
+        if parent is None:
+            self.parents.pop(network, None)
+        else:
+            self.parents[network] = parent
+
+    def _set_root(self, root):
+        if root is not None:
+            root.parent = None
+        self.root = root
+
+    def update(self, removed, added, new_ranges, rebuild_ratio=None):
+        """
+        Updates the enclosing networks for the networks removed and added.
+
+        :param rebuild_ratio: Share of the networks changed from which the enclosing networks are found again from
+            scratch, None to always update them one by one
+        :type rebuild_ratio: float or None
+        :returns: Previous enclosing network by network, for the networks whose enclosing network changed
+        :rtype: dict of (str, str)
+        """
+        old_parents = {}
+        if rebuild_ratio is not None and len(removed) + len(added) > len(self.ranges) * rebuild_ratio:
+            parents = self.parents
+            for network in removed:
+                del self.ranges[network]
+            for network in added:
+                self.ranges[network] = new_ranges[network]
+            self.rebuild()
+            for network in parents.keys() | self.parents.keys():
+                if parents.get(network) != self.parents.get(network):
+                    old_parents[network] = parents.get(network)
+            return old_parents
+
+        for network in removed:
+            del self.by_range[self.ranges.pop(network)]
+            node = self.nodes.pop(network)
+
+            # Networks directly contained in the network are now contained in its enclosing network.
+            parent = self.parents.get(network)
+            self._set_parent(network, None, old_parents)
+            for descendant in self._iter_descendants(node):
+                if self.parents.get(descendant) == network:
+                    self._set_parent(descendant, parent, old_parents)
+
+            first, second = _split(self.root, _get_position(node))
+            self._set_root(_merge(first, _split(second, 1)[1]))
+
+        for network in added:
+            version, first, last = network_range = self.ranges[network] = new_ranges[network]
+            parent = self._find_parent(version, first, last)
+            node = self.nodes[network] = _RangeNode((version, first, -last, network))
+            head, tail = _split(self.root, _get_rank(self.root, node.key))
+            self._set_root(_merge(_merge(head, node), tail))
+            self.by_range[network_range] = network
+
+            # Networks of the enclosing network within the network are now contained in the network.
+            self._set_parent(network, parent, old_parents)
+            for descendant in self._iter_descendants(node):
+                if self.parents.get(descendant) == parent:
+                    self._set_parent(descendant, network, old_parents)
+
+        return old_parents
+
+
+class FeedIndex:
+    """
+    Index of a validated feed, from which later versions of the feed are validated incrementally.
+
+    The index keeps the lines of the feed, the outcome of the checks that only depend on a line by line content,
+    the address range of each network and the closest enclosing network of each network. update() diffs a new
+    version of the feed line by line against the index and validates the inserted lines only. The enclosing
+    networks are updated for the networks added and removed, and the problems of the lines affected by the
+    changes are compared by content, so lines moving around do not change their problems.
+
+    Reading and diffing the new version remains linear in the number of lines, the checks are linear in the
+    number of changes.
+    """
+
+    #: Version of the format written by save()
+    FORMAT = 1
+
+    #: Share of the networks changed from which the enclosing networks are found again from scratch
+    REBUILD_RATIO = 1 / 16
+
+    def __init__(self, validator):
+        """
+        Constructs an empty index, update() then validates the first version of a feed from scratch.
+
+        :param validator: Validator class or name
+        :type validator: BaseValidator or str
+        """
+        self._validator = _find_validator(validator)
+        self._versions = _get_versions()
+        self._lines = []
+        #: Network, location and findings by line, None for ignored lines
+        self._entries = {}
+        self._overlaps = _NetworkOverlaps()
+        #: Record numbers by network and the networks listed more than once, see _get_groups()
+        self._groups = None
+        self._error_count = 0
+        self._warning_count = 0
+
+    @property
+    def validator(self):
+        return self._validator
+
+    @property
+    def record_count(self):
+        return len(self._lines)
+
+    @property
+    def error_count(self):
+        return self._error_count
+
+    @property
+    def warning_count(self):
+        return self._warning_count
+
+    @classmethod
+    def from_result(cls, result, validator):
+        """
+        Builds the index of a validated feed.
+
+        :param result: Complete result of the feed, with raw records stored
+        :type result: ValidationResult
+        :param validator: Validator class or name the feed was validated with
+        :type validator: BaseValidator or str
+        :returns: Index of the feed
+        :rtype: FeedIndex
+        """
+        if not result._store_raw_records:
+            raise ValueError("Building an index requires a result with raw records stored.")
+        if result.truncated or result.paused or len(result.records) != result.record_count:
+            raise ValueError("Building an index requires a result of all records of the feed.")
+
+        index = cls(validator)
+        validator = index._validator("")
+        index._lines = lines = [record.raw for record in result.records]
+
+        findings = {}
+        for record in result.records:
+            if record.raw not in index._entries:
+                entry, network_range = _get_entry(validator, record)
+                index._entries[record.raw] = entry
+                findings[record.raw] = (record.record_no, entry[2] if entry else ())
+                if network_range and entry[0] not in index._overlaps.ranges:
+                    index._overlaps.ranges[entry[0]] = network_range
+
+        index._overlaps.rebuild()
+
+        # The findings of a record include the ones of the cross-record checks, which depend on the feed.
+        groups = index._get_groups()[0]
+        for raw, (record_no, record_findings) in findings.items():
+            entry = index._entries[raw]
+            if entry is None:
+                continue
+
+            feed_findings = Counter(
+                index._iter_feed_findings(
+                    validator, record_no, lines, index._entries, groups, index._overlaps.parents.get
+                )
+            )
+            local_findings = []
+            for finding in record_findings:
+                if feed_findings[finding] > 0:
+                    feed_findings[finding] -= 1
+                else:
+                    local_findings.append(finding)
+            index._entries[raw] = (entry[0], entry[1], tuple(local_findings))
+
+        index._error_count = result.error_count
+        index._warning_count = result.warning_count
+        return index
+
+    def _get_groups(self):
+        """
+        :returns: Record numbers by network in record order, and the networks listed more than once
+        :rtype: (dict of (str, list of int), set of str)
+        """
+        if self._groups is None:
+            groups = {}
+            duplicated = set()
+            for record_no, line in enumerate(self._lines):
+                entry = self._entries[line]
+                if entry is not None and entry[0] is not None:
+                    if entry[0] in groups:
+                        duplicated.add(entry[0])
+                    groups.setdefault(entry[0], []).append(record_no)
+            self._groups = groups, duplicated
+        return self._groups
+
+    def _iter_feed_findings(self, validator, record_no, lines, entries, groups, get_parent):
+        """
+        Yields the findings of the cross-record checks of a record, see BaseValidator._iter_common.
+
+        :returns: Iterator over (field name, is error, message) tuples
+        :rtype: iterator of tuple
+        """
+        network, location, _ = entries[lines[record_no]]
+        if network is None:
+            return
+
+        field_name = validator._role_fields["network"].name
+        record_nos = groups[network]
+        if record_nos[0] != record_no:
+            yield field_name, True, validator._format_duplicate_error([record_nos[0]])
+        elif len(record_nos) > 1:
+            yield field_name, True, validator._format_duplicate_error(record_nos[1:])
+
+        parent = get_parent(network)
+        if parent is not None:
+            parent_record_no = groups[parent][0]
+            parent_location = entries[lines[parent_record_no]][1]
+            yield (
+                field_name,
+                False,
+                validator._format_containment_warning(parent_record_no, location != parent_location),
+            )
+
+    def _iter_problems(self, validator, record_nos, lines, entries, groups, get_parent):
+        for record_no in record_nos:
+            raw = lines[record_no]
+            entry = entries[raw]
+            if entry is None:
+                continue
+
+            for field_name, is_error, message in entry[2]:
+                yield Problem(record_no, raw, field_name, message, is_error, lines)
+            for field_name, is_error, message in self._iter_feed_findings(
+                validator, record_no, lines, entries, groups, get_parent
+            ):
+                yield Problem(record_no, raw, field_name, message, is_error, lines)
+
+    def iter_problems(self):
+        """
+        :returns: Iterator over the problems of the indexed version of the feed, in record order
+        :rtype: iterator of Problem
+        """
+        return self._iter_problems(
+            self._validator(""),
+            range(len(self._lines)),
+            self._lines,
+            self._entries,
+            self._get_groups()[0],
+            self._overlaps.parents.get,
+        )
+
+    def update(self, feed):
+        """
+        Validates a new version of the indexed feed incrementally, updating the index in place.
+
+        Lines not found in the previous version are validated, the cross-record checks are updated for the
+        networks of the inserted and removed lines. An index of another library or ISO3166 data version is
+        validated from scratch, while still reporting the differences.
+
+        :param feed: String or file-like object representing the new version of the feed
+        :type feed: str or file
+        :returns: Differences between the versions
+        :rtype: FeedDiff
+        """
+        validator = self._validator(feed)
+        if not isinstance(validator, BaseCSVValidator):
+            raise ValueError("Incremental validation requires a validator reading records from lines.")
+
+        reuse = self._versions == _get_versions()
+        old_lines = self._lines
+        old_entries = self._entries
+        old_groups, old_duplicated = self._get_groups()
+
+        # Read the new version, validating lines not seen before
+        added_entries = {}
+        new_ranges = {}
+        lines = []
+        groups = {}
+        duplicated = set()
+        known_entries = old_entries if reuse else {}
+        field_index = validator._field_index
+        for line in validator.get_lines():
+            entry = known_entries.get(line, _MISSING)
+            if entry is _MISSING:
+                entry = added_entries.get(line, _MISSING)
+            if entry is _MISSING:
+                entry, network_range = _validate_line(validator, field_index, len(lines), line)
+                added_entries[line] = entry
+                if network_range:
+                    new_ranges[entry[0]] = network_range
+
+            if entry is not None and entry[0] is not None:
+                record_nos = groups.get(entry[0])
+                if record_nos is None:
+                    groups[entry[0]] = [len(lines)]
+                else:
+                    record_nos.append(len(lines))
+                    duplicated.add(entry[0])
+            lines.append(line)
+
+        if reuse:
+            entries = old_entries
+            entries.update(added_entries)
+        else:
+            entries = added_entries
+
+        # Diff the versions line by line
+        old_counts = Counter(old_lines)
+        counts = Counter(lines)
+        removed = self._get_surplus(old_lines, old_counts - counts)
+        inserted = self._get_surplus(lines, counts - old_counts)
+
+        # Networks whose records changed, the order of records only matters for networks listed more than once
+        if reuse:
+            changed = {
+                entry[0] for entry in (old_entries[old_lines[record_no]] for record_no in removed) if entry is not None
+            }
+            changed.update(
+                entry[0] for entry in (entries[lines[record_no]] for record_no in inserted) if entry is not None
+            )
+            changed.discard(None)
+            for network in old_duplicated | duplicated:
+                old_record_nos = old_groups.get(network, ())
+                record_nos = groups.get(network, ())
+                if len(old_record_nos) != len(record_nos) or any(
+                    old_lines[a] != lines[b] for a, b in zip(old_record_nos, record_nos, strict=True)
+                ):
+                    changed.add(network)
+        else:
+            changed = old_groups.keys() | groups.keys()
+
+        old_parents = self._overlaps.update(
+            [network for network in changed if network not in groups],
+            [network for network in changed if network not in old_groups],
+            new_ranges,
+            self.REBUILD_RATIO,
+        )
+
+        # Records whose problems may have changed: those of changed networks, of networks with another enclosing
+        # network and of networks enclosed by a network with another first record.
+        affected = changed | old_parents.keys()
+        for network in changed:
+            if network in groups and lines[groups[network][0]] != (
+                old_lines[old_groups[network][0]] if network in old_groups else None
+            ):
+                affected.update(self._overlaps.iter_children(network))
+
+        if reuse:
+            old_record_nos = set(removed)
+            new_record_nos = set(inserted)
+            for network in affected:
+                old_record_nos.update(old_groups.get(network, ()))
+                new_record_nos.update(groups.get(network, ()))
+        else:
+            old_record_nos = range(len(old_lines))
+            new_record_nos = range(len(lines))
+
+        def get_old_parent(network):
+            return old_parents[network] if network in old_parents else self._overlaps.parents.get(network)
+
+        old_problems = list(
+            self._iter_problems(validator, sorted(old_record_nos), old_lines, old_entries, old_groups, get_old_parent)
+        )
+        problems = list(
+            self._iter_problems(validator, sorted(new_record_nos), lines, entries, groups, self._overlaps.parents.get)
+        )
+        introduced = self._get_new_problems(problems, old_problems)
+        resolved = self._get_new_problems(old_problems, problems)
+
+        # Keep the entries of the lines of the new version only
+        if reuse:
+            for line in old_counts.keys() - counts.keys():
+                del entries[line]
+        self._entries = entries
+        self._versions = _get_versions()
+        self._lines = lines
+        self._groups = groups, duplicated
+        self._error_count += sum(p.is_error for p in introduced) - sum(p.is_error for p in resolved)
+        self._warning_count += sum(not p.is_error for p in introduced) - sum(not p.is_error for p in resolved)
+        return FeedDiff(self, inserted, removed, introduced, resolved)
+
+    @staticmethod
+    def _get_surplus(lines, surplus_counts):
+        """
+        :param surplus_counts: Number of occurrences of lines in surplus of the other version
+        :type surplus_counts: Counter
+        :returns: Record numbers of the lines in surplus, the later occurrences of a line counting as surplus
+        :rtype: list of int
+        """
+        surplus = []
+        if not surplus_counts:
+            return surplus
+
+        for record_no in range(len(lines) - 1, -1, -1):
+            line = lines[record_no]
+            if surplus_counts.get(line):
+                surplus_counts[line] -= 1
+                surplus.append(record_no)
+        surplus.reverse()
+        return surplus
+
+    @staticmethod
+    def _get_new_problems(problems, other_problems):
+        remaining = Counter(problem._key for problem in other_problems)
+        new_problems = []
+        for problem in problems:
+            if remaining[problem._key] > 0:
+                remaining[problem._key] -= 1
+            else:
+                new_problems.append(problem)
+        return new_problems
+
+    def save(self, path):
+        """
+        Writes the index to a file, to be read by load().
+
+        :param path: Path of the file
+        :type path: str
+        """
+        data = {
+            "format": self.FORMAT,
+            "validator": self._validator.NAME,
+            "versions": self._versions,
+            "error_count": self._error_count,
+            "warning_count": self._warning_count,
+            "lines": self._lines,
+            "entries": self._entries,
+            # In sorted order, so they do not have to be sorted again when loading
+            "ranges": [
+                [network, version, first, -negative_last]
+                for version, first, negative_last, network in self._overlaps.iter_sorted()
+            ],
+            "parents": self._overlaps.parents,
+        }
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(data, fp, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index written by save().
+
+        :param path: Path of the file
+        :type path: str
+        :returns: Index
+        :rtype: FeedIndex
+        """
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+        if data.get("format") != cls.FORMAT:
+            raise ValueError(f"Unsupported index format {data.get('format')!r}.")
+
+        index = cls(data["validator"])
+        index._versions = data["versions"]
+        index._error_count = data["error_count"]
+        index._warning_count = data["warning_count"]
+        index._lines = data["lines"]
+        index._entries = {
+            line: (entry[0], tuple(entry[1]), tuple(map(tuple, entry[2]))) if entry is not None else None
+            for line, entry in data["entries"].items()
+        }
+        overlaps = index._overlaps
+        overlaps.set_sorted([(version, first, -last, network) for network, version, first, last in data["ranges"]])
+        overlaps.ranges = {network: (version, first, last) for network, version, first, last in data["ranges"]}
+        overlaps.by_range = {network_range: network for network, network_range in overlaps.ranges.items()}
+        overlaps.parents = data["parents"]
+        return index
+
+
+class _Node:
+    """
+    Record of an EditableFeed, a node of a treap ordered by record number
+    """
+
+    __slots__ = ("line", "entry", "priority", "size", "left", "right", "parent")
+
+    def __init__(self, line, entry):
+        self.line = line
+        self.entry = entry
+        self.priority = random.random()
+        #: Number of records in the subtree of the node
+        self.size = 1
+        self.left = None
+        self.right = None
+        self.parent = None
+
+
+class EditableFeed(MutableSequence):
+    """
+    Feed edited line by line, revalidated incrementally with every edit.
+
+    The lines are kept in a treap, so looking up, inserting and removing lines by record number and numbering
+    them is logarithmic in the number of lines. An edit validates the edited line only. The records of each
+    network are kept in record order for the duplicate checks, and the closest enclosing networks are updated
+    through supernet lookups for networks added to or removed from the feed, which also touches the networks
+    directly contained in them. Problems are created on access, so the record numbers referenced by messages
+    follow inserts and removals without updating the records referencing them.
+    """
+
+    def __init__(self, validator, feed=""):
+        """
+        :param validator: Validator class or name
+        :type validator: BaseValidator or str
+        :param feed: String or file-like object representing the feed to start from
+        :type feed: str or file
+        """
+        self._validator = _find_validator(validator)
+        self._instance = self._validator(feed)
+        if not isinstance(self._instance, BaseCSVValidator):
+            raise ValueError("Editing feeds requires a validator reading records from lines.")
+        self._field_index = self._instance._field_index
+
+        #: Records of each network, in record order
+        self._groups = {}
+        self._overlaps = _NetworkOverlaps()
+        self._error_count = 0
+        self._warning_count = 0
+
+        validated = {}
+        nodes = []
+        for line in self._instance.get_lines():
+            if line not in validated:
+                validated[line] = _validate_line(self._instance, self._field_index, len(nodes), line)
+            entry, network_range = validated[line]
+            node = _Node(line, entry)
+            self._count_findings(entry, 1)
+            if entry is not None and entry[0] is not None:
+                self._groups.setdefault(entry[0], []).append(node)
+                self._overlaps.ranges[entry[0]] = network_range
+            nodes.append(node)
+
+        self._root = _build(nodes)
+        self._overlaps.rebuild()
+        for network in self._groups:
+            self._count_network(network, 1)
+
+    @property
+    def validator(self):
+        return self._validator
+
+    @property
+    def error_count(self):
+        return self._error_count
+
+    @property
+    def warning_count(self):
+        return self._warning_count
+
+    def is_valid(self, allow_warnings=False):
+        """
+        :param allow_warnings: Whether the feed is valid despite warnings
+        :type allow_warnings: bool
+        :rtype: bool
+        """
+        return self._error_count == 0 and (allow_warnings or self._warning_count == 0)
+
+    def __len__(self):
+        return _get_size(self._root)
+
+    def __iter__(self):
+        for node in self._iter_nodes():
+            yield node.line
+
+    def _iter_nodes(self):
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def _get_record_no(self, record_no):
+        if not isinstance(record_no, int):
+            raise TypeError(f"Record numbers must be integers, not {type(record_no).__name__}.")
+        if record_no < 0:
+            record_no += len(self)
+        if not 0 <= record_no < len(self):
+            raise IndexError("record number out of range")
+        return record_no
+
+    def _get_node(self, record_no):
+        node = self._root
+        while True:
+            left = _get_size(node.left)
+            if record_no < left:
+                node = node.left
+            elif record_no == left:
+                return node
+            else:
+                record_no -= left + 1
+                node = node.right
+
+    def __getitem__(self, record_no):
+        """
+        :param record_no: Record number
+        :type record_no: int
+        :returns: Line of the record
+        :rtype: str
+        """
+        return self._get_node(self._get_record_no(record_no)).line
+
+    def __setitem__(self, record_no, line):
+        """
+        Replaces the line of a record.
+
+        :param record_no: Record number
+        :type record_no: int
+        :param line: New line
+        :type line: str
+        """
+        record_no = self._get_record_no(record_no)
+        line = self._check_line(line)
+        node = self._get_node(record_no)
+        if node.line == line:
+            return
+
+        self._remove(node, record_no)
+        node.line = line
+        self._add(node, record_no)
+
+    def __delitem__(self, record_no):
+        """
+        Removes the line of a record, renumbering the following records.
+
+        :param record_no: Record number
+        :type record_no: int
+        """
+        record_no = self._get_record_no(record_no)
+        self._remove(self._get_node(record_no), record_no)
+        first, second = _split(self._root, record_no)
+        self._set_root(_merge(first, _split(second, 1)[1]))
+
+    def insert(self, record_no, line):
+        """
+        Inserts a line before a record, renumbering the following records.
+
+        :param record_no: Record number of the inserted line
+        :type record_no: int
+        :param line: Line to insert
+        :type line: str
+        """
+        # Like list.insert(), out of range record numbers insert at the start or end.
+        if not isinstance(record_no, int):
+            raise TypeError(f"Record numbers must be integers, not {type(record_no).__name__}.")
+        if record_no < 0:
+            record_no = max(record_no + len(self), 0)
+        record_no = min(record_no, len(self))
+
+        node = _Node(self._check_line(line), None)
+        first, second = _split(self._root, record_no)
+        self._set_root(_merge(_merge(first, node), second))
+        self._add(node, record_no)
+
+    def _set_root(self, root):
+        if root is not None:
+            root.parent = None
+        self._root = root
+
+    @staticmethod
+    def _check_line(line):
+        if "\n" in line or "\r" in line:
+            raise ValueError("Lines must not contain line breaks.")
+        return line.strip()
+
+    def _count_findings(self, entry, sign):
+        if entry is not None:
+            errors = sum(is_error for _, is_error, _ in entry[2])
+            self._error_count += sign * errors
+            self._warning_count += sign * (len(entry[2]) - errors)
+
+    def _count_network(self, network, sign):
+        # Each record of a network listed more than once has a duplicate error, each record of a network
+        # contained in another one a containment warning.
+        records = self._groups[network]
+        if len(records) > 1:
+            self._error_count += sign * len(records)
+        if network in self._overlaps.parents:
+            self._warning_count += sign * len(records)
+
+    def _update_overlaps(self, removed, added, new_ranges):
+        old_parents = self._overlaps.update(removed, added, new_ranges)
+        for network, old_parent in old_parents.items():
+            if network in self._groups and network not in added:
+                parent = self._overlaps.parents.get(network)
+                sign = (parent is not None) - (old_parent is not None)
+                self._warning_count += sign * len(self._groups[network])
+
+    def _add(self, node, record_no):
+        """
+        Validates the line of a record inserted into the treap and adds it to the checks across records.
+        """
+        entry, network_range = _validate_line(self._instance, self._field_index, record_no, node.line)
+        node.entry = entry
+        self._count_findings(entry, 1)
+        if entry is None or entry[0] is None:
+            return
+
+        network = entry[0]
+        records = self._groups.get(network)
+        if records is None:
+            self._groups[network] = [node]
+            self._update_overlaps([], [network], {network: network_range})
+        else:
+            self._count_network(network, -1)
+            records.insert(bisect_left(records, record_no, key=_get_position), node)
+        self._count_network(network, 1)
+
+    def _remove(self, node, record_no):
+        """
+        Removes a record, still in the treap, from the checks across records.
+        """
+        entry = node.entry
+        self._count_findings(entry, -1)
+        if entry is None or entry[0] is None:
+            return
+
+        network = entry[0]
+        records = self._groups[network]
+        self._count_network(network, -1)
+        if len(records) == 1:
+            del self._groups[network]
+            self._update_overlaps([network], [], {})
+        else:
+            del records[bisect_left(records, record_no, key=_get_position)]
+            self._count_network(network, 1)
+
+    def _iter_record_problems(self, node, record_no):
+        entry = node.entry
+        if entry is None:
+            return
+
+        for field_name, is_error, message in entry[2]:
+            yield Problem(record_no, node.line, field_name, message, is_error, self)
+
+        network, location, _ = entry
+        if network is None:
+            return
+
+        validator = self._instance
+        field_name = validator._role_fields["network"].name
+        records = self._groups[network]
+        if records[0] is not node:
+            message = validator._format_duplicate_error([_get_position(records[0])])
+            yield Problem(record_no, node.line, field_name, message, True, self)
+        elif len(records) > 1:
+            message = validator._format_duplicate_error([_get_position(record) for record in records[1:]])
+            yield Problem(record_no, node.line, field_name, message, True, self)
+
+        parent = self._overlaps.parents.get(network)
+        if parent is not None:
+            parent_record = self._groups[parent][0]
+            message = validator._format_containment_warning(
+                _get_position(parent_record), location != parent_record.entry[1]
+            )
+            yield Problem(record_no, node.line, field_name, message, False, self)
+
+    def get_problems(self, record_no):
+        """
+        :param record_no: Record number
+        :type record_no: int
+        :returns: Problems of the record
+        :rtype: list of Problem
+        """
+        record_no = self._get_record_no(record_no)
+        return list(self._iter_record_problems(self._get_node(record_no), record_no))
+
+    def iter_problems(self):
+        """
+        :returns: Iterator over the problems of the feed, in record order
+        :rtype: iterator of Problem
+        """
+        for record_no, node in enumerate(self._iter_nodes()):
+            yield from self._iter_record_problems(node, record_no)
@@ -0,0 +1,360 @@
+# geofeed_validator/iso3166.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+"""
+ISO3166 countries and subdivisions, as far as the fields need them: alpha-2 codes, subdivision codes and the
+country of each subdivision.
+
+The codes are read from a compact snapshot bundled with the package, generated from pycountry by
+bin/update-iso3166-snapshot.py, which loads in about a millisecond. pycountry itself, which takes several hundred
+milliseconds to load, is only used if the snapshot cannot be read, to look up other attributes of a country or
+subdivision (e.g. its name) on demand, and to return pycountry objects at the public API, see to_pycountry().
+
+Snapshot format, integers in little-endian byte order:
+
+* header: magic, length of the pycountry version, number of countries, number of subdivisions
+* pycountry version the snapshot was generated from, UTF-8
+* alpha-2 codes of the countries, two ASCII characters each, sorted
+* character offset of each subdivision code in the subdivision codes, and their total length, uint32 each
+* country of each subdivision, as index into the countries, uint16 each
+* subdivision codes, sorted and concatenated, UTF-8
+"""
+
+import os
+import struct
+import sys
+from array import array
+from functools import cache
+from types import MappingProxyType
+
+#: Path of the bundled snapshot
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "data", "iso3166.bin")
+
+_MAGIC = b"GFV3166\x01"
+_HEADER = struct.Struct("<8sHHH")
+
+# Country index of subdivisions of a country missing from the countries
+_NO_COUNTRY = 0xFFFF
+
+
+class _Entry:
+    """
+    Country or subdivision, looking up attributes other than its codes in pycountry on first access.
+    """
+
+    __slots__ = ("_pycountry_object",)
+
+    def __init__(self):
+        self._pycountry_object = None
+
+    def _get_pycountry_object(self):
+        raise NotImplementedError
+
+    def __getattr__(self, name):
+        # Only called for attributes not found otherwise
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._pycountry_object is None:
+            self._pycountry_object = self._get_pycountry_object()
+        if self._pycountry_object is None:
+            raise AttributeError(f"{self!r} has no attribute {name!r}, it is not known to pycountry.")
+        return getattr(self._pycountry_object, name)
+
+
+class Country(_Entry):
+    """
+    ISO3166-1 country, one instance per country as returned by get_country().
+    """
+
+    __slots__ = ("alpha_2",)
+
+    def __init__(self, alpha_2):
+        """
+        :param alpha_2: Upper case alpha-2 code
+        :type alpha_2: str
+        """
+        super().__init__()
+        self.alpha_2 = alpha_2
+
+    def _get_pycountry_object(self):
+        import pycountry
+
+        return pycountry.countries.get(alpha_2=self.alpha_2)
+
+    def __repr__(self):
+        return f"Country(alpha_2={self.alpha_2!r})"
+
+    def __reduce__(self):
+        return get_country, (self.alpha_2,)
+
+
+class Subdivision(_Entry):
+    """
+    ISO3166-2 subdivision, one instance per subdivision as returned by get_subdivision().
+    """
+
+    __slots__ = ("code", "country_code")
+
+    def __init__(self, code, country_code):
+        """
+        :param code: Upper case subdivision code
+        :type code: str
+        :param country_code: Alpha-2 code of the country the subdivision belongs to
+        :type country_code: str
+        """
+        super().__init__()
+        self.code = code
+        self.country_code = country_code
+
+    def _get_pycountry_object(self):
+        import pycountry
+
+        return pycountry.subdivisions.get(code=self.code)
+
+    def __repr__(self):
+        return f"Subdivision(code={self.code!r})"
+
+    def __reduce__(self):
+        return get_subdivision, (self.code,)
+
+
+def _read_array(typecode, data, position, count):
+    values = array(typecode)
+    end = position + values.itemsize * count
+    values.frombytes(data[position:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, end
+
+
+def read_snapshot(path):
+    """
+    Reads a snapshot written by write_snapshot().
+
+    :param path: Path of the snapshot
+    :type path: str
+    :returns: pycountry version the snapshot was generated from, alpha-2 codes of the countries and code and country
+        code of each subdivision, both sorted
+    :rtype: (str, list of str, list of (str, str))
+    :raises OSError: If the snapshot cannot be read
+    :raises ValueError: If the file is not a valid snapshot
+    """
+    with open(path, "rb") as fp:
+        data = fp.read()
+
+    if len(data) < _HEADER.size or data[: len(_MAGIC)] != _MAGIC:
+        raise ValueError(f"{path} is not an ISO3166 snapshot.")
+    _, version_length, country_count, subdivision_count = _HEADER.unpack_from(data)
+
+    position = _HEADER.size + version_length
+    version = data[_HEADER.size : position].decode()
+    countries = data[position : position + 2 * country_count].decode("ascii")
+    alpha_2_codes = [countries[index : index + 2] for index in range(0, len(countries), 2)]
+    offsets, position = _read_array("I", data, position + 2 * country_count, subdivision_count + 1)
+    country_indexes, position = _read_array("H", data, position, subdivision_count)
+    codes = data[position:].decode()
+    if (
+        len(alpha_2_codes) != country_count
+        or len(offsets) != subdivision_count + 1
+        or len(country_indexes) != subdivision_count
+        or offsets[-1] != len(codes)
+    ):
+        raise ValueError(f"ISO3166 snapshot {path} is truncated.")
+
+    subdivisions = [
+        (codes[start:end], alpha_2_codes[index] if index != _NO_COUNTRY else codes[start:end].partition("-")[0])
+        for start, end, index in zip(offsets, offsets[1:], country_indexes, strict=False)
+    ]
+    return version, alpha_2_codes, subdivisions
+
+
+def write_snapshot(path, data):
+    """
+    Writes a snapshot of ISO3166 codes.
+
+    :param path: Path of the snapshot
+    :type path: str
+    :param data: pycountry version, alpha-2 codes of the countries and code and country code of each subdivision, as
+        returned by read_pycountry()
+    :type data: (str, list of str, list of (str, str))
+    """
+    version, alpha_2_codes, subdivisions = data
+    alpha_2_codes = sorted(alpha_2_codes)
+    subdivisions = sorted(subdivisions)
+    if not all(len(code) == 2 and code.isascii() for code in alpha_2_codes):
+        raise ValueError("Alpha-2 codes must be two ASCII characters.")
+
+    country_indexes = {code: index for index, code in enumerate(alpha_2_codes)}
+    offsets = array("I", [0])
+    for code, _ in subdivisions:
+        offsets.append(offsets[-1] + len(code))
+    indexes = array("H", [country_indexes.get(country_code, _NO_COUNTRY) for _, country_code in subdivisions])
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        indexes.byteswap()
+
+    encoded_version = version.encode()
+    with open(path, "wb") as fp:
+        fp.write(_HEADER.pack(_MAGIC, len(encoded_version), len(alpha_2_codes), len(subdivisions)))
+        fp.write(encoded_version)
+        fp.write("".join(alpha_2_codes).encode("ascii"))
+        fp.write(offsets.tobytes())
+        fp.write(indexes.tobytes())
+        fp.write("".join(code for code, _ in subdivisions).encode())
+
+
+def read_pycountry():
+    """
+    Reads the ISO3166 codes from pycountry.
+
+    :returns: Installed pycountry version, empty if unknown, and the codes like read_snapshot()
+    :rtype: (str, list of str, list of (str, str))
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    import pycountry
+
+    try:
+        pycountry_version = version("pycountry")
+    except PackageNotFoundError:
+        pycountry_version = ""
+    return (
+        pycountry_version,
+        sorted(country.alpha_2 for country in pycountry.countries),
+        sorted((subdivision.code, subdivision.country_code) for subdivision in pycountry.subdivisions),
+    )
+
+
+@cache
+def get_data():
+    """
+    Returns the ISO3166 codes in use: those of the bundled snapshot, or those of pycountry if the snapshot cannot
+    be read.
+
+    :returns: pycountry version and codes, see read_snapshot()
+    :rtype: (str, list of str, list of (str, str))
+    """
+    try:
+        return read_snapshot(SNAPSHOT_PATH)
+    except (OSError, ValueError):
+        return read_pycountry()
+
+
+@cache
+def countries_by_alpha_2():
+    """
+    Returns the ISO3166-1 countries, indexed by their upper case alpha-2 code.
+
+    The index is built on first use and shared by all callers of the process.
+
+    :returns: Read-only mapping of alpha-2 code to country
+    :rtype: mapping of (str, Country)
+    """
+    return MappingProxyType({code: Country(code) for code in get_data()[1]})
+
+
+@cache
+def subdivisions_by_code():
+    """
+    Returns the ISO3166-2 subdivisions, indexed by their upper case code.
+
+    :returns: Read-only mapping of subdivision code to subdivision
+    :rtype: mapping of (str, Subdivision)
+    """
+    return MappingProxyType({code: Subdivision(code, country_code) for code, country_code in get_data()[2]})
+
+
+@cache
+def countries_by_subdivision_code():
+    """
+    Returns the ISO3166-1 countries, indexed by the upper case codes of their subdivisions.
+
+    :returns: Read-only mapping of subdivision code to the country the subdivision belongs to
+    :rtype: mapping of (str, Country)
+    """
+    countries = countries_by_alpha_2()
+    return MappingProxyType(
+        {
+            code: countries[subdivision.country_code]
+            for code, subdivision in subdivisions_by_code().items()
+            if subdivision.country_code in countries
+        }
+    )
+
+
+def get_country(alpha_2):
+    """
+    Looks up a country by its alpha-2 code, ignoring case.
+
+    :param alpha_2: Alpha-2 code
+    :type alpha_2: str
+    :returns: Country if found, None otherwise
+    :rtype: Country
+    """
+    countries = countries_by_alpha_2()
+    # Codes are usually upper case already, only fall back to converting them on a miss.
+    return countries.get(alpha_2) or countries.get(alpha_2.upper())
+
+
+def get_subdivision(code):
+    """
+    Looks up a subdivision by its code, ignoring case.
+
+    :param code: Subdivision code
+    :type code: str
+    :returns: Subdivision if found, None otherwise
+    :rtype: Subdivision
+    """
+    subdivisions = subdivisions_by_code()
+    return subdivisions.get(code) or subdivisions.get(code.upper())
+
+
+def to_pycountry(value):
+    """
+    Returns the pycountry object of a country or subdivision, as the fields returned them before the snapshot was
+    bundled. Loads pycountry on first use.
+
+    :param value: Field value
+    :type value: object
+    :returns: pycountry object of countries and subdivisions known to pycountry, value otherwise
+    :rtype: object
+    """
+    if not isinstance(value, _Entry):
+        return value
+    if value._pycountry_object is None:
+        value._pycountry_object = value._get_pycountry_object()
+    return value._pycountry_object or value
+
+
+def get_subdivision_country(subdivision):
+    """
+    Looks up the country a subdivision belongs to.
+
+    :param subdivision: Subdivision
+    :type subdivision: Subdivision
+    :returns: Country if found, None otherwise
+    :rtype: Country
+    """
+    return countries_by_subdivision_code().get(subdivision.code)
@@ -0,0 +1,338 @@
+# geofeed_validator/parallel.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+import heapq
+import io
+import os
+
+from geofeed_validator.result import _EMPTY, _UNRESOLVED, FieldResult, RecordValidationResult
+
+#: Chunks are never made smaller than this, so small feeds are not spread over more processes than useful.
+MIN_CHUNK_SIZE = 256 * 1024
+
+#: Number of chunks handed to each process, so a slow chunk does not leave the other processes idle.
+CHUNKS_PER_PROCESS = 4
+
+
+def split_file(path, chunk_size):
+    """
+    Splits a file into newline-aligned byte ranges.
+
+    :param path: Path of the file to split
+    :type path: str
+    :param chunk_size: Minimum size of a chunk in bytes, chunks are extended up to the next line break
+    :type chunk_size: int
+    :returns: List of (start, end) byte offsets, end being exclusive
+    :rtype: list of (int, int)
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive.")
+
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as fp:
+        while start < size:
+            fp.seek(min(start + chunk_size, size) - 1)
+            fp.readline()
+            end = min(fp.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _open_chunk(validator_class, path, start, end, store_raw_records, encoding):
+    """
+    :returns: Validator reading the records in a byte range of a feed file
+    :rtype: BaseValidator
+    """
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        data = fp.read(end - start)
+
+    # Universal newlines, as used when the feed file is opened in text mode.
+    return validator_class(io.StringIO(data.decode(encoding), newline=None), store_raw_records=store_raw_records)
+
+
+def _pack_field_results(record, fields):
+    """
+    Packs the field results of a validated record into plain tuples.
+
+    :returns: Errors, warnings, raw value and value string of each field result, None for fields without result,
+        followed by the field, errors, warnings, raw value and value string of results of fields the validator
+        does not define. None for records without findings whose value strings are their raw values, which
+        _restore_record() restores without them.
+    :rtype: tuple or None
+    """
+    field_results = record._field_results
+    if record.was_ignored and not field_results:
+        return None
+    if len(field_results) == len(fields) and all(
+        fr is not None and fr.raw is not None and not fr.errors and not fr.warnings and fr.value_string == fr.raw
+        for fr in field_results
+    ):
+        return None
+
+    return tuple(
+        (fr.errors, fr.warnings, fr.raw, fr.value_string) if fr is not None else None
+        for fr in field_results[: len(fields)]
+    ) + tuple((fr.field, fr.errors, fr.warnings, fr.raw, fr.value_string) for fr in field_results[len(fields) :])
+
+
+def _restore_record(record_no, fields, field_index, record, raw_data, packed):
+    """
+    Restores a record validated by _validate_chunk() from the record data read again and its packed field
+    results. Values are parsed from their value strings on first access, like those of unpickled results.
+
+    :rtype: RecordValidationResult
+    """
+    record_validation = RecordValidationResult(record_no, fields, record, raw_data, field_index)
+    record_validation._record = None
+    if not record:
+        record_validation._was_ignored = True
+
+    if packed is not None:
+        record_validation._field_results = [
+            FieldResult(fields[index], _UNRESOLVED, *field_result) if field_result is not None else None
+            for index, field_result in enumerate(packed[: len(fields)])
+        ] + [FieldResult(field, _UNRESOLVED, *field_result) for field, *field_result in packed[len(fields) :]]
+    elif record:
+        record_validation._field_results = [
+            FieldResult(field, _UNRESOLVED, _EMPTY, _EMPTY, record[field], record[field]) for field in fields
+        ]
+    return record_validation
+
+
+def _validate_chunk(validator_class, path, start, end, store_raw_records, encoding):
+    """
+    Validates the records in a byte range of a feed file.
+
+    Runs the field checks and the common checks that only depend on a single record. Only the field results of
+    records with findings or value strings other than their raw values are returned, packed by
+    _pack_field_results(), the other records are restored from the feed file when merging the chunks. The
+    address range of each network is determined here as well, so the networks do not have to be parsed again.
+
+    :returns: Packed field results by record number relative to the start of the chunk, and the address range of
+        the first record of each network of the chunk as (version, first address, negated last address, record
+        number, value string), sorted
+    :rtype: (dict of (int, tuple), list of tuple)
+    """
+    validator = _open_chunk(validator_class, path, start, end, store_raw_records, encoding)
+    fields = validator._fields
+    network_field = validator._role_fields["network"]
+    packed_records = {}
+    ranges = {}
+    for record_no, (record, raw_data) in enumerate(validator.get_records()):
+        # Validated on their own, findings are counted once the records are restored.
+        record_validation = RecordValidationResult(record_no, fields, record, raw_data, validator._field_index)
+        record_validation.validate()
+        validator._validate_common_record(record_validation)
+        if (packed := _pack_field_results(record_validation, fields)) is not None:
+            packed_records[record_no] = packed
+
+        network = record_validation.get_field_result(network_field) if network_field else None
+        if network and network.value_string and network.value_string not in ranges:
+            version, first, negative_last, _, _ = validator._get_network_range([record_validation])
+            ranges[network.value_string] = (version, first, negative_last, record_no, network.value_string)
+    return packed_records, sorted(ranges.values())
+
+
+def iter_file_results(
+    validator_class,
+    path,
+    store_raw_records=False,
+    processes=None,
+    chunk_size=None,
+    encoding=None,
+    columnar=False,
+    problems_only=False,
+    max_errors=None,
+    max_warnings=None,
+    result=None,
+):
+    """
+    Validates a feed file using a pool of processes, yielding results in record order.
+
+    The file is split into newline-aligned byte ranges which are validated in parallel. The per-chunk results
+    are merged in record order and the cross-record checks run on the merged records, so the results are the
+    same as the ones of BaseValidator.iter_results() for the same feed. Processes only send back the findings of
+    their chunk and the address ranges of its networks, sorted, the records are read again from the file while
+    merging and the ranges of all chunks are merged instead of being determined and sorted once more.
+
+    :param validator_class: Validator to use
+    :type validator_class: type
+    :param path: Path of the feed file
+    :type path: str
+    :param store_raw_records: Whether to keep the raw records
+    :type store_raw_records: bool
+    :param processes: Number of processes to use, defaults to the number of CPUs
+    :type processes: int or None
+    :raises ValueError: If processes is not a positive integer or None
+    :param chunk_size: Minimum size of a chunk in bytes, defaults to an even split across the processes or to
+        MIN_CHUNK_SIZE if validation stops after max_errors or max_warnings
+    :type chunk_size: int or None
+    :param encoding: Encoding of the feed file, defaults to UTF-8
+    :type encoding: str or None
+    :param columnar: Whether to store the merged result in a ColumnarValidationResult
+    :type columnar: bool
+    :param problems_only: Whether to retain only records with errors or warnings in the merged result
+    :type problems_only: bool
+    :param max_errors: Stop validating once this many errors have been found
+    :type max_errors: int or None
+    :param max_warnings: Stop validating once this many warnings have been found
+    :type max_warnings: int or None
+    :param result: Result to add the records to, a new one by default
+    :type result: ValidationResult or None
+    :returns: Iterator over RecordValidationResult, RecordUpdate and finally ValidationResult objects
+    :rtype: iterator
+    """
+    if processes is not None and (not isinstance(processes, int) or processes < 1):
+        raise ValueError(f"processes must be a positive integer or None, not {processes!r}.")
+    processes = processes or os.cpu_count() or 1
+    encoding = encoding or "utf-8"
+    if chunk_size is None and (max_errors is not None or max_warnings is not None):
+        # Small chunks, so validation can stop soon after the budget has been exhausted.
+        chunk_size = MIN_CHUNK_SIZE
+    elif chunk_size is None:
+        chunk_size = max(os.path.getsize(path) // (processes * CHUNKS_PER_PROCESS) + 1, MIN_CHUNK_SIZE)
+
+    validator = validator_class(
+        "",
+        store_raw_records=store_raw_records,
+        columnar=columnar,
+        problems_only=problems_only,
+        max_errors=max_errors,
+        max_warnings=max_warnings,
+    )
+    if result is None:
+        result = validator._create_result()
+    ranges = split_file(path, chunk_size)
+    args = (
+        [validator_class] * len(ranges),
+        [path] * len(ranges),
+        [start for start, _ in ranges],
+        [end for _, end in ranges],
+        [store_raw_records] * len(ranges),
+        [encoding] * len(ranges),
+    )
+
+    if processes == 1 or len(ranges) < 2:
+        merger = _ChunkMerger(validator, result, args, map(_validate_chunk, *args))
+        yield from validator._iter_common(
+            result, iter(merger), record_checks=False, network_ranges=merger.get_network_ranges
+        )
+        return
+
+    # Imported on demand, multiprocessing is not needed unless validating with multiple processes.
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(max_workers=min(processes, len(ranges)))
+    try:
+        merger = _ChunkMerger(validator, result, args, executor.map(_validate_chunk, *args))
+        yield from validator._iter_common(
+            result, iter(merger), record_checks=False, network_ranges=merger.get_network_ranges
+        )
+    finally:
+        # When validation stopped early, pending chunks are not validated at all and running ones are abandoned.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def validate_file(
+    validator_class,
+    path,
+    store_raw_records=False,
+    processes=None,
+    chunk_size=None,
+    encoding=None,
+    columnar=False,
+    problems_only=False,
+    max_errors=None,
+    max_warnings=None,
+):
+    """
+    Validates a feed file using a pool of processes.
+
+    See iter_file_results() for the parameters.
+
+    :returns: ValidationResult object
+    :rtype: ValidationResult
+    """
+    result = None
+    for item in iter_file_results(
+        validator_class,
+        path,
+        store_raw_records=store_raw_records,
+        processes=processes,
+        chunk_size=chunk_size,
+        encoding=encoding,
+        columnar=columnar,
+        problems_only=problems_only,
+        max_errors=max_errors,
+        max_warnings=max_warnings,
+    ):
+        result = item
+    return result
+
+
+class _ChunkMerger:
+    """
+    Adds the records of the chunks to the result in record order, restoring them from the feed file and the
+    results of _validate_chunk(), and collects the address ranges of their networks.
+    """
+
+    def __init__(self, validator, result, args, chunks):
+        self._validator = validator
+        self._result = result
+        self._args = args
+        self._chunks = chunks
+        self._ranges = []
+
+    def __iter__(self):
+        validator = self._validator
+        result = self._result
+        fields = validator._fields
+        field_index = validator._field_index
+        store_raw_records = validator._store_raw_records
+        for args, (packed_records, ranges) in zip(zip(*self._args, strict=True), self._chunks, strict=True):
+            offset = result.record_count
+            # Renumbered to their position in the feed, which keeps them sorted.
+            self._ranges.append([(*r[:3], r[3] + offset, r[4]) for r in ranges])
+            for record_no, (record, raw_data) in enumerate(_open_chunk(*args).get_records()):
+                record_validation = _restore_record(
+                    offset + record_no,
+                    fields,
+                    field_index,
+                    record,
+                    raw_data if store_raw_records else None,
+                    packed_records.get(record_no),
+                )
+                yield result.add_record_result(record_validation)
+
+    def get_network_ranges(self):
+        """
+        :returns: Address ranges of the networks of all chunks, sorted, see BaseValidator._iter_common()
+        :rtype: iterator of tuple
+        """
+        return heapq.merge(*self._ranges)
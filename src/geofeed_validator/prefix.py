@@ -0,0 +1,231 @@
+# geofeed_validator/prefix.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+from ipaddress import IPV4LENGTH, IPV6LENGTH, IPv4Network, IPv6Address, IPv6Network, ip_network
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+# IPv4-mapped IPv6 addresses are formatted differently by different Python versions, see IPPrefix.__str__.
+_IPV4_MAPPED = 0xFFFF
+
+# Networks hash their network address and netmask as a tuple since Python 3.13, XORed before.
+_HASH_TUPLE = hash(IPv4Network("1.0.0.0/8")) == hash((1 << 24, 0xFF000000))
+
+
+class IPPrefix:
+    """
+    IP prefix as IP version, network address as integer and prefix length.
+
+    A compact, immutable alternative to the networks of the ipaddress module, as returned by parse_prefix(). The
+    ipaddress network is only built when calling to_network(), or when accessing one of its attributes not
+    provided by IPPrefix. Prefixes compare equal to the ipaddress networks of the same prefix and hash alike.
+    """
+
+    __slots__ = ("version", "network", "prefixlen", "_network_object")
+
+    def __init__(self, version, network, prefixlen):
+        """
+        :param version: IP version, 4 or 6
+        :type version: int
+        :param network: Network address, without host bits set
+        :type network: int
+        :param prefixlen: Prefix length
+        :type prefixlen: int
+        """
+        self.version = version
+        self.network = network
+        self.prefixlen = prefixlen
+        self._network_object = None
+
+    @property
+    def max_prefixlen(self):
+        return IPV4LENGTH if self.version == 4 else IPV6LENGTH
+
+    @property
+    def num_addresses(self):
+        return 1 << (self.max_prefixlen - self.prefixlen)
+
+    @property
+    def last(self):
+        """
+        Last address of the prefix as integer
+        """
+        return self.network | ((1 << (self.max_prefixlen - self.prefixlen)) - 1)
+
+    def to_network(self):
+        """
+        :returns: Network of the ipaddress module, built on first call
+        :rtype: IPv4Network or IPv6Network
+        """
+        if self._network_object is None:
+            network_class = IPv4Network if self.version == 4 else IPv6Network
+            self._network_object = network_class((self.network, self.prefixlen))
+        return self._network_object
+
+    def __getattr__(self, name):
+        # Only called for attributes not found otherwise
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.to_network(), name)
+
+    def __str__(self):
+        if self._network_object is not None:
+            # Also keeps the scope of scoped IPv6 addresses parsed by ipaddress
+            return str(self._network_object)
+
+        network = self.network
+        if self.version == 4:
+            return f"{network >> 24}.{network >> 16 & 255}.{network >> 8 & 255}.{network & 255}/{self.prefixlen}"
+        if network >> 32 == _IPV4_MAPPED:
+            return f"{IPv6Address(network)}/{self.prefixlen}"
+
+        # Compressed like ipaddress does: the first longest run of more than one zero hextet is elided.
+        hextets = [f"{network >> shift & 0xFFFF:x}" for shift in range(112, -1, -16)]
+        best_start, best_length, start = 0, 0, None
+        for index, hextet in enumerate(hextets):
+            if hextet != "0":
+                start = None
+                continue
+            if start is None:
+                start = index
+            if index + 1 - start > best_length:
+                best_start, best_length = start, index + 1 - start
+        if best_length > 1:
+            end = best_start + best_length
+            hextets[best_start:end] = [""] * (1 + (best_start == 0) + (end == len(hextets)))
+        return f"{':'.join(hextets)}/{self.prefixlen}"
+
+    def __repr__(self):
+        return f"IPPrefix('{self}')"
+
+    def __eq__(self, other):
+        if isinstance(other, IPPrefix):
+            return (self.version, self.network, self.prefixlen) == (other.version, other.network, other.prefixlen)
+        if isinstance(other, (IPv4Network, IPv6Network)):
+            return (self.version, self.network, self.prefixlen) == (
+                other.version,
+                int(other.network_address),
+                other.prefixlen,
+            )
+        return NotImplemented
+
+    def __lt__(self, other):
+        if not isinstance(other, IPPrefix):
+            return NotImplemented
+        if self.version != other.version:
+            raise TypeError(f"{self} and {other} are not of the same version")
+        return (self.network, self.prefixlen) < (other.network, other.prefixlen)
+
+    def __hash__(self):
+        # Like the hash of ipaddress networks
+        max_prefixlen = self.max_prefixlen
+        netmask = ((1 << max_prefixlen) - 1) ^ ((1 << (max_prefixlen - self.prefixlen)) - 1)
+        if _HASH_TUPLE:
+            return hash((self.network, netmask))
+        return hash(self.network ^ netmask)
+
+    def __reduce__(self):
+        return IPPrefix, (self.version, self.network, self.prefixlen)
+
+
+def _parse_ipv4(address):
+    network = 0
+    parts = address.split(".")
+    if len(parts) != 4:
+        return None
+    for part in parts:
+        # Leading zeros are ambiguous (octal), ipaddress rejects them.
+        if not (0 < len(part) <= 3 and part.isascii() and part.isdigit()) or (part[0] == "0" and len(part) > 1):
+            return None
+        octet = int(part)
+        if octet > 255:
+            return None
+        network = network << 8 | octet
+    return network
+
+
+def _parse_ipv6(address):
+    head, double_colon, tail = address.partition("::")
+    head_parts = head.split(":") if head else []
+    tail_parts = tail.split(":") if tail else []
+    count = len(head_parts) + len(tail_parts)
+    if (count > 7 or "::" in tail) if double_colon else count != 8:
+        return None
+
+    network = 0
+    for part in head_parts:
+        if not 0 < len(part) <= 4 or not _HEX_DIGITS.issuperset(part):
+            return None
+        network = network << 16 | int(part, 16)
+    network <<= 16 * (8 - count)
+    for part in tail_parts:
+        if not 0 < len(part) <= 4 or not _HEX_DIGITS.issuperset(part):
+            return None
+        network = network << 16 | int(part, 16)
+    return network
+
+
+def parse_prefix(value):
+    """
+    Parses an IP prefix like ipaddress.ip_network(value) does, rejecting prefixes with host bits set.
+
+    Prefixes in CIDR notation are parsed using integer arithmetic. Other notations, e.g. with a netmask or
+    embedded IPv4 address, and invalid values are left to ipaddress, so the same values are accepted and the same
+    errors raised.
+
+    :param value: Prefix
+    :type value: str
+    :returns: Parsed prefix
+    :rtype: IPPrefix
+    :raises ValueError: If value is not a valid prefix
+    """
+    address, slash, length = value.partition("/")
+    if slash and length.isascii() and length.isdigit():
+        prefixlen = int(length)
+        if "." in address:
+            version, bits, network = 4, IPV4LENGTH, _parse_ipv4(address)
+        elif "%" not in address:
+            version, bits, network = 6, IPV6LENGTH, _parse_ipv6(address)
+        else:
+            network = None
+        if network is not None and prefixlen <= bits and not network & ((1 << (bits - prefixlen)) - 1):
+            return IPPrefix(version, network, prefixlen)
+
+    network = ip_network(value)
+    prefix = IPPrefix(network.version, int(network.network_address), network.prefixlen)
+    prefix._network_object = network
+    return prefix
+
+
+def get_address_range(network):
+    """
+    :param network: Prefix, or network of the ipaddress module
+    :type network: IPPrefix or IPv4Network or IPv6Network
+    :returns: IP version, first and last address of the network
+    :rtype: (int, int, int)
+    """
+    if isinstance(network, IPPrefix):
+        return network.version, network.network, network.last
+    return network.version, int(network.network_address), int(network.broadcast_address)
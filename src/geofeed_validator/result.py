@@ -23,43 +23,197 @@
 # Stephan Peijnik <speijnik@anexia-it.com>
 #
 
-import inspect
-from contextlib import suppress
+from bisect import bisect_left
+from collections import Counter
 
 from geofeed_validator.fields import Field
+from geofeed_validator.iso3166 import to_pycountry
+
+_UNRESOLVED = object()
+
+
+class _EmptyList(list):
+    """
+    Immutable empty list, shared by all results without errors, warnings or extra values
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Shared empty result list is immutable, assign a new list instead.")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+    def __reduce__(self):
+        # Unpickle as the shared instance
+        return "_EMPTY"
+
+
+_EMPTY = _EmptyList()
 
 
 class FieldResult:
+    """
+    Validation result of a single field of a record
+
+    errors and warnings are a shared, immutable empty list if there are none.
+    """
+
+    __slots__ = ("field", "_value", "errors", "warnings", "raw", "value_string")
+
     def __init__(self, field, value, errors, warnings, raw, value_string):
         self.field = field
-        self.value = value
+        self._value = value
         self.errors = errors
         self.warnings = warnings
         self.raw = raw
         self.value_string = value_string
 
+    @property
+    def value(self):
+        # Countries and subdivisions are validated without pycountry, but returned as pycountry objects.
+        return to_pycountry(self._get_value())
+
+    def _get_value(self):
+        """
+        :returns: Value as cleaned by the field
+        """
+        if self._value is _UNRESOLVED:
+            # Unpickled results only carry the value string, the value is restored on first access.
+            self._value = self.peek_value()
+        return self._value
+
+    def peek_value(self):
+        """
+        Returns the value as cleaned by the field, without keeping a value restored from the value string.
+
+        :returns: Parsed value
+        """
+        if self._value is not _UNRESOLVED:
+            return self._value
+
+        # Results without raw data never had a value, invalid values have no value string.
+        if self.raw is not None and self.value_string is not None:
+            try:
+                return self.field._from_string(self.value_string)
+            except Exception:
+                return None
+        return None
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
     def __getstate__(self):
-        state = self.__dict__.copy()
-        del state["value"]
-        return state
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_value"}
 
     def __setstate__(self, state):
-        field = state["field"]
-        value = None
-        if state.get("value_string", None):
-            with suppress(Exception):
-                value = field.to_python(state["value_string"])
+        self._value = _UNRESOLVED
+        for name, value in state.items():
+            setattr(self, name, value)
 
-        state["value"] = value
-        self.__dict__.update(state)
+
+class FindingCounts:
+    """
+    Running totals of the errors and warnings of a ValidationResult, by field name and by message
+    """
+
+    __slots__ = (
+        "errors",
+        "warnings",
+        "errors_by_field",
+        "warnings_by_field",
+        "errors_by_message",
+        "warnings_by_message",
+    )
+
+    def __init__(self):
+        self.errors = 0
+        self.warnings = 0
+        self.errors_by_field = Counter()
+        self.warnings_by_field = Counter()
+        self.errors_by_message = Counter()
+        self.warnings_by_message = Counter()
+
+    def add_errors(self, field, errors):
+        if errors:
+            self.errors += len(errors)
+            self.errors_by_field[field.name] += len(errors)
+            self.errors_by_message.update(errors)
+
+    def add_warnings(self, field, warnings):
+        if warnings:
+            self.warnings += len(warnings)
+            self.warnings_by_field[field.name] += len(warnings)
+            self.warnings_by_message.update(warnings)
+
+    def add_record(self, record):
+        """
+        Adds the findings of a record.
+
+        :param record: Validated record
+        :type record: RecordValidationResult
+        """
+        for field_result in record._field_results:
+            if field_result is not None:
+                self.add_errors(field_result.field, field_result.errors)
+                self.add_warnings(field_result.field, field_result.warnings)
+
+
+def get_outcome(field_results):
+    """
+    :param field_results: Results of the fields defined by the validator, in field order, None for missing fields
+    :type field_results: iterable of FieldResult
+    :returns: Outcome of the field checks, see RecordValidationResult.get_outcome()
+    :rtype: list
+    """
+    outcome = [
+        None
+        if fr is None or fr.raw is None or (not fr.errors and not fr.warnings and fr.value_string == fr.raw)
+        else [list(fr.errors), list(fr.warnings), fr.value_string]
+        for fr in field_results
+    ]
+    while outcome and outcome[-1] is None:
+        outcome.pop()
+    return outcome
+
+
+def get_field_index(fields):
+    """
+    Maps field names to their position in fields, as used by RecordValidationResult to store field results.
+
+    :param fields: List of fields as defined by the validator
+    :type fields: list of Field
+    :returns: Position by field name
+    :rtype: dict of (str, int)
+    """
+    return {field.name: index for index, field in enumerate(fields)}
 
 
 class RecordValidationResult:
     """
     Validation result for a single record
+
+    Field results are stored by the position of their field in fields, followed by results of fields the
+    validator does not define. Findings added using add_field_errors() and add_field_warnings() are also
+    reported to the ValidationResult the record belongs to.
     """
 
-    def __init__(self, record_no, fields, record, raw_data):
+    __slots__ = (
+        "_record_no",
+        "_fields",
+        "_field_index",
+        "_record",
+        "_raw_data",
+        "_was_ignored",
+        "_extra",
+        "_extra_offset",
+        "_field_results",
+        "_result",
+    )
+
+    def __init__(self, record_no, fields, record, raw_data, field_index=None):
         """
         :param record_no: Record number
         :type record_no: int
@@ -69,77 +223,147 @@ class RecordValidationResult:
         :type record: dict of (Field, str)
         :param raw_data: Raw record data, as read by parser
         :type raw_data: basestring
+        :param field_index: Position by field name, as returned by get_field_index(fields), shared between records
+        :type field_index: dict of (str, int)
         """
         self._record_no = record_no
         self._fields = fields
+        self._field_index = field_index if field_index is not None else get_field_index(fields)
         self._record = record
         self._raw_data = raw_data
         self._was_ignored = False
 
-        self._has_extra: bool = "__extra__" in record
-        self._extra: list[str] = []
+        self._extra: list[str] = _EMPTY
         self._extra_offset: int = 0
-        self._field_results: dict[str, FieldResult] = {}
+        self._field_results: list[FieldResult | None] = _EMPTY
+        self._result: ValidationResult | None = None
 
-        if self._has_extra:
+        if "__extra__" in record:
             self._extra = record["__extra__"]
             del record["__extra__"]
             self._extra_offset = len(record)
 
     @property
     def field_results(self) -> list[FieldResult]:
-        return list(self._field_results.values())
+        return [fr for fr in self._field_results if fr is not None]
 
-    def validate(self):
-        if len(self._record) == 0:
+    def validate(self, outcome=None, cleaned=None):
+        """
+        Runs the field checks.
+
+        :param outcome: Outcome of the field checks of an identical record as returned by get_outcome(), restored
+            instead of running the field checks again. Values are parsed from their value strings on first access,
+            like those of unpickled results.
+        :type outcome: list or None
+        :param cleaned: Results of Field.clean() computed elsewhere, by field index, used instead of cleaning these
+            fields again
+        :type cleaned: dict of (int, tuple) or None
+        """
+        record = self._record
+        # The field values are kept in the field results, the record is not needed any more.
+        self._record = None
+        if len(record) == 0:
             self._was_ignored = True
             return
 
-        for field in self._fields:
-            if field not in self._record:
-                self._field_results[field.name] = FieldResult(
+        field_results = self._field_results = [None] * len(self._fields)
+        for index, field in enumerate(self._fields):
+            if field not in record:
+                field_results[index] = FieldResult(
                     field,
                     None,
-                    ["Field is missing."] if field.REQUIRED else [],
-                    [] if field.REQUIRED else ["Field is missing."],
+                    ["Field is missing."] if field.REQUIRED else _EMPTY,
+                    _EMPTY if field.REQUIRED else ["Field is missing."],
                     None,
                     "",
                 )
             else:
-                # Validate the field data...
-                errors, warnings, cleaned_value = field.validate(self._record[field])
-                self._field_results[field.name] = FieldResult(
+                # Validate the field data, parsing it only once...
+                value = record[field]
+                if outcome is not None:
+                    if index < len(outcome) and outcome[index] is not None:
+                        errors, warnings, value_string = outcome[index]
+                    else:
+                        errors, warnings, value_string = _EMPTY, _EMPTY, value
+                    cleaned_value = _UNRESOLVED if value_string is not None else None
+                elif cleaned is not None and index in cleaned:
+                    errors, warnings, cleaned_value, value_string = cleaned[index]
+                else:
+                    errors, warnings, cleaned_value, value_string = field.clean(value)
+                field_results[index] = FieldResult(
                     field,
                     cleaned_value,
-                    list(errors),
-                    list(warnings),
-                    self._record[field],
-                    field.to_string(self._record[field]),
+                    list(errors) if errors else _EMPTY,
+                    list(warnings) if warnings else _EMPTY,
+                    value,
+                    value_string,
                 )
 
+    def get_outcome(self):
+        """
+        Returns a copy of the outcome of the field checks, to be passed to validate() of an identical record. Must
+        be called before findings are added to the record.
+
+        :returns: Errors, warnings and value string of each field. None for missing fields and for fields without
+            findings whose value string is their raw value, trailing ones are left out. So the outcome of most
+            records is empty.
+        :rtype: list
+        """
+        return get_outcome(self._field_results[: len(self._fields)])
+
+    def _release_values(self):
+        """
+        Releases the parsed field values, which are parsed again from their value strings when accessed.
+        """
+        for field_result in self._field_results:
+            if field_result is not None:
+                field_result._value = _UNRESOLVED
+
+    def _set_field_result(self, field_result):
+        field_results = self._field_results
+        if len(field_results) < len(self._fields):
+            # Ignored records have no field results yet
+            field_results = self._field_results = [None] * len(self._fields)
+
+        index = self._field_index.get(field_result.field.name)
+        if index is None:
+            field_results.append(field_result)
+        else:
+            field_results[index] = field_result
+
     def add_field_errors(self, field, errors):
         if isinstance(errors, tuple):
             errors = list(errors)
         elif not isinstance(errors, list):
             errors = [errors]
+        if self._result is not None:
+            self._result._add_findings(self, field, errors=errors)
 
         if field_result := self.get_field_result(field):
-            field_result.errors += errors
+            if field_result.errors:
+                field_result.errors += errors
+            else:
+                field_result.errors = list(errors)
             return
 
-        self._field_results[field.name] = FieldResult(field, None, errors, [], None, "")
+        self._set_field_result(FieldResult(field, None, list(errors), _EMPTY, None, ""))
 
     def add_field_warnings(self, field, warnings):
         if isinstance(warnings, tuple):
             warnings = list(warnings)
         elif not isinstance(warnings, list):
             warnings = [warnings]
+        if self._result is not None:
+            self._result._add_findings(self, field, warnings=warnings)
 
         if field_result := self.get_field_result(field):
-            field_result.warnings += warnings
+            if field_result.warnings:
+                field_result.warnings += warnings
+            else:
+                field_result.warnings = list(warnings)
             return
 
-        self._field_results[field.name] = FieldResult(field, None, [], warnings, None, "")
+        self._set_field_result(FieldResult(field, None, _EMPTY, list(warnings), None, ""))
 
     def get_field_result(self, field_name_or_class):
         """
@@ -148,20 +372,36 @@ class RecordValidationResult:
         :returns: FieldResult instance if found, None otherwise.
         :rtype: FieldResult
         """
-        if inspect.isclass(field_name_or_class) and issubclass(field_name_or_class, Field):
-            field_name = field_name_or_class.NAME
-        elif isinstance(field_name_or_class, Field):
+        # Field instances are the common case, check for them first.
+        if isinstance(field_name_or_class, Field):
             field_name = field_name_or_class.name
+        elif isinstance(field_name_or_class, type) and issubclass(field_name_or_class, Field):
+            field_name = field_name_or_class.NAME
         else:
             field_name = field_name_or_class
 
-        return self._field_results.get(field_name)
+        index = self._field_index.get(field_name)
+        if index is not None:
+            return self._field_results[index] if index < len(self._field_results) else None
+
+        for field_result in self._field_results[len(self._fields) :]:
+            if field_result.field.name == field_name:
+                return field_result
+        return None
 
     def get_field_value(self, field_name_or_class):
         if field_result := self.get_field_result(field_name_or_class):
             return field_result.value
         return None
 
+    def _get_field_value(self, field_name_or_class):
+        """
+        Returns the value of a field as cleaned by the field, see FieldResult.peek_value(), for the common checks.
+        """
+        if field_result := self.get_field_result(field_name_or_class):
+            return field_result._get_value()
+        return None
+
     @property
     def raw(self):
         return self._raw_data
@@ -176,19 +416,19 @@ class RecordValidationResult:
 
     @property
     def error_count(self):
-        return sum(len(fr.errors) for fr in self._field_results.values())
+        return sum(len(fr.errors) for fr in self._field_results if fr is not None)
 
     @property
     def warning_count(self):
-        return sum(len(fr.warnings) for fr in self._field_results.values())
+        return sum(len(fr.warnings) for fr in self._field_results if fr is not None)
 
     @property
     def has_errors(self):
-        return any(fr.errors for fr in self._field_results.values())
+        return any(fr.errors for fr in self._field_results if fr is not None)
 
     @property
     def has_warnings(self):
-        return any(fr.warnings for fr in self._field_results.values())
+        return any(fr.warnings for fr in self._field_results if fr is not None)
 
     @property
     def record_no(self):
@@ -199,29 +439,230 @@ class RecordValidationResult:
         return self._was_ignored
 
 
+class _DroppedRecord:
+    """
+    What the cross-record checks keep of a clean record dropped by a problems_only result: its record number, the
+    location compared by the containment check and what it takes to validate the record again, should findings be
+    added to it after all.
+    """
+
+    __slots__ = ("record_no", "location", "_values", "_extra", "_raw_data", "_result")
+
+    def __init__(self, record, location, shared):
+        """
+        :param record: Clean record, validated
+        :type record: RecordValidationResult
+        :param location: Value strings of the location fields
+        :type location: tuple of str
+        :param shared: Locations and their values by value, shared between the dropped records of a feed, updated in
+            place. Feeds list few distinct locations, so most values of a record are shared.
+        :type shared: dict
+        """
+        self.record_no = record.record_no
+        if location not in shared:
+            shared[location] = location
+            for value in location:
+                shared.setdefault(value, value)
+        self.location = shared[location]
+        self._values = tuple(shared.get(fr.raw, fr.raw) for fr in record._field_results)
+        self._extra = record.extra
+        self._raw_data = record.raw
+        self._result = record._result
+
+    def restore(self):
+        """
+        :returns: The record, validated again and belonging to its result again
+        :rtype: RecordValidationResult
+        """
+        result = self._result
+        record = dict(zip(result.fields, self._values, strict=True))
+        if self._extra:
+            record["__extra__"] = self._extra
+        record_validation = RecordValidationResult(
+            self.record_no, result.fields, record, self._raw_data, result._field_index
+        )
+        record_validation.validate()
+        record_validation._result = result
+        return record_validation
+
+
+class RecordUpdate:
+    """
+    Findings added to an already reported record by a cross-record check of a later record
+    """
+
+    def __init__(self, record, field, errors=(), warnings=()):
+        """
+        :param record: Record the findings were added to
+        :type record: RecordValidationResult
+        :param field: Field the findings were added to
+        :type field: Field
+        :param errors: Errors added to the field
+        :type errors: list of str
+        :param warnings: Warnings added to the field
+        :type warnings: list of str
+        """
+        self.record = record
+        self.field = field
+        self.errors = errors
+        self.warnings = warnings
+
+    @property
+    def record_no(self):
+        return self.record.record_no
+
+
 class ValidationResult:
     """
     Class representing a validation result.
+
+    The error and warning totals are kept up to date as records are added and findings are added to them.
+
+    With problems_only, only records with errors or warnings are retained, clean records are dropped as they are
+    added. A dropped record is retained after all once findings are added to it, in record order. Dropped records
+    may still be referenced by the cross-record checks, their parsed values are released once the next record is
+    added. The cross-record checks only keep a _DroppedRecord of them.
     """
 
-    def __init__(self, fields, store_raw_records=False):
+    def __init__(self, fields, store_raw_records=False, problems_only=False, field_index=None):
+        """
+        :param fields: List of fields as defined by the validator
+        :type fields: list of Field
+        :param field_index: Position by field name, as returned by get_field_index(fields), shared between results
+        :type field_index: dict of (str, int)
+        """
         #: :type: list of RecordValidationResult
         self._records: list[RecordValidationResult] = []
         self._store_raw_records = store_raw_records
+        self._problems_only = problems_only
         self._fields = fields
-
-    def add_record(self, record, raw_data):
+        self._field_index = field_index if field_index is not None else get_field_index(fields)
+        self._counts = FindingCounts()
+        self._record_count = 0
+        self._previous = None
+        self._truncated = False
+        self._paused = False
+        self._offset = None
+
+    def add_record(self, record, raw_data, outcome=None, cleaned=None):
         """
         :param record: Record data as dict
         :type record: dict of (Field, value)
+        :param outcome: Outcome of the field checks of an identical record, see RecordValidationResult.validate()
+        :type outcome: list or None
+        :param cleaned: Results of Field.clean() computed elsewhere, see RecordValidationResult.validate()
+        :type cleaned: dict of (int, tuple) or None
+        :returns: Validation result of the record
+        :rtype: RecordValidationResult
         """
         if not self._store_raw_records:
             raw_data = None
 
-        record_no = len(self._records)
-        record_validation = RecordValidationResult(record_no, self._fields, record, raw_data)
-        record_validation.validate()
-        self._records.append(record_validation)
+        record_no = self._record_count
+        record_validation = RecordValidationResult(record_no, self._fields, record, raw_data, self._field_index)
+        record_validation.validate(outcome, cleaned)
+        return self._append(record_validation)
+
+    def add_record_result(self, record_validation):
+        """
+        Appends a record that has already been validated elsewhere, e.g. in another process, renumbering it to
+        its position in this result.
+
+        :param record_validation: Validated record
+        :type record_validation: RecordValidationResult
+        :returns: The appended record
+        :rtype: RecordValidationResult
+        """
+        record_validation._record_no = self._record_count
+        if not self._store_raw_records:
+            record_validation._raw_data = None
+        # Unpickled records have copies of the fields.
+        if record_validation._fields is not self._fields:
+            record_validation._fields = self._fields
+            record_validation._field_index = self._field_index
+            for index, field_result in enumerate(record_validation._field_results[: len(self._fields)]):
+                if field_result is not None:
+                    field_result.field = self._fields[index]
+        return self._append(record_validation)
+
+    def _append(self, record_validation):
+        self._record_count += 1
+        self._counts.add_record(record_validation)
+        record_validation._result = self
+        if self._problems_only:
+            # The checks of the preceding record are done by now. Retained, it is the most recent record kept.
+            previous = self._previous
+            if previous is not None and not (self._records and self._records[-1] is previous):
+                previous._release_values()
+            self._previous = record_validation
+
+        if not self._problems_only or record_validation.has_errors or record_validation.has_warnings:
+            self._records.append(record_validation)
+        return record_validation
+
+    def _add_findings(self, record, field, errors=(), warnings=()):
+        """
+        Called by records when findings are added to them.
+        """
+        self._counts.add_errors(field, errors)
+        self._counts.add_warnings(field, warnings)
+        if self._problems_only and not (self._records and self._records[-1] is record):
+            # Retain the record in record order, findings are usually added to the most recent record though.
+            index = bisect_left(self._records, record.record_no, key=lambda r: r.record_no)
+            if index == len(self._records) or self._records[index] is not record:
+                self._records.insert(index, record)
+
+    def truncate(self):
+        """
+        Marks the result as truncated, i.e. validation stopped before the end of the feed.
+        """
+        self._truncated = True
+
+    @property
+    def truncated(self):
+        """
+        Whether validation stopped before the end of the feed, e.g. because its error budget was exhausted. Such a
+        result only covers the records read so far and lacks the findings of the whole-feed checks.
+        """
+        return self._truncated
+
+    def pause(self, offset=None):
+        """
+        Marks the result as paused, i.e. only covering the records read so far while validation is interrupted
+        and may be resumed later on.
+
+        :param offset: Position reached in the feed, None if unknown
+        :type offset: int or None
+        """
+        self._paused = True
+        self._offset = offset
+
+    def resume(self):
+        self._paused = False
+        self._offset = None
+
+    @property
+    def paused(self):
+        """
+        Whether validation has been paused, e.g. because its time budget ran out. record_count and offset tell how
+        far validation got.
+        """
+        return self._paused
+
+    @property
+    def offset(self):
+        """
+        Position reached in the feed when validation was paused, as returned by tell() of the feed (a byte offset
+        for files opened in binary mode and feeds opened by GeoFeedValidator.from_path()). None if unknown.
+        """
+        return self._offset
+
+    @property
+    def record_count(self):
+        """
+        Number of records added, including the ones not retained
+        """
+        return self._record_count
 
     @property
     def records_raw(self):
@@ -237,17 +678,52 @@ class ValidationResult:
 
     @property
     def error_count(self):
-        return sum([r.error_count for r in self._records])
+        return self._counts.errors
 
     @property
     def warning_count(self):
-        return sum([r.warning_count for r in self._records])
+        return self._counts.warnings
+
+    @property
+    def error_counts_by_field(self):
+        """
+        :returns: Number of errors by field name
+        :rtype: dict of (str, int)
+        """
+        return dict(self._counts.errors_by_field)
+
+    @property
+    def warning_counts_by_field(self):
+        """
+        :returns: Number of warnings by field name
+        :rtype: dict of (str, int)
+        """
+        return dict(self._counts.warnings_by_field)
+
+    @property
+    def error_counts_by_message(self):
+        """
+        :returns: Number of errors by message
+        :rtype: dict of (str, int)
+        """
+        return dict(self._counts.errors_by_message)
+
+    @property
+    def warning_counts_by_message(self):
+        """
+        :returns: Number of warnings by message
+        :rtype: dict of (str, int)
+        """
+        return dict(self._counts.warnings_by_message)
 
     @property
     def records(self):
         return self._records
 
     def is_valid(self, allow_warnings=False):
+        # The rest of a truncated or paused feed has not been checked.
+        if self._truncated or self._paused:
+            return False
         if allow_warnings:
             return self.error_count == 0
         return self.error_count == 0 and self.warning_count == 0
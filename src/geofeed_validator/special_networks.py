@@ -0,0 +1,195 @@
+# geofeed_validator/special_networks.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+from bisect import bisect_right
+from functools import cache
+from ipaddress import IPV4LENGTH, IPV6LENGTH, IPv4Network, IPv6Address, IPv6Network
+
+from geofeed_validator.prefix import get_address_range
+
+#: Network checks in the order NetworkField reports them, by the name of the error constant reported.
+_CHECKS = (
+    ("ERROR_LINKLOCAL", "is_link_local"),
+    ("ERROR_LOOPBACK", "is_loopback"),
+    ("ERROR_MULTICAST", "is_multicast"),
+    ("ERROR_RESERVED", "is_reserved"),
+    ("ERROR_PRIVATE", "is_private"),
+)
+
+#: Special-purpose IPv4 networks of the IANA registry, plus all networks the ipaddress checks of Python 3.9 to
+#: 3.13 are based on. Only used to split the address space into intervals, so listing too many is harmless.
+_IPV4_NETWORKS = (
+    "0.0.0.0/8",
+    "0.0.0.0/32",
+    "10.0.0.0/8",
+    "100.64.0.0/10",
+    "127.0.0.0/8",
+    "169.254.0.0/16",
+    "172.16.0.0/12",
+    "192.0.0.0/24",
+    "192.0.0.0/29",
+    "192.0.0.8/32",
+    "192.0.0.9/32",
+    "192.0.0.10/32",
+    "192.0.0.170/31",
+    "192.0.2.0/24",
+    "192.31.196.0/24",
+    "192.52.193.0/24",
+    "192.88.99.0/24",
+    "192.168.0.0/16",
+    "192.175.48.0/24",
+    "198.18.0.0/15",
+    "198.51.100.0/24",
+    "203.0.113.0/24",
+    "224.0.0.0/4",
+    "240.0.0.0/4",
+    "255.255.255.255/32",
+)
+
+#: Same for IPv6. IPv4 networks mapped into IPv6 are added to these, as newer Python versions check IPv4-mapped
+#: addresses like IPv4 ones.
+_IPV6_NETWORKS = (
+    "::/8",
+    "::/128",
+    "::1/128",
+    "::ffff:0:0/96",
+    "64:ff9b::/96",
+    "64:ff9b:1::/48",
+    "100::/8",
+    "100::/64",
+    "200::/7",
+    "400::/6",
+    "800::/5",
+    "1000::/4",
+    "2001::/23",
+    "2001::/32",
+    "2001:1::1/128",
+    "2001:1::2/128",
+    "2001:1::3/128",
+    "2001:2::/48",
+    "2001:3::/32",
+    "2001:4:112::/48",
+    "2001:10::/28",
+    "2001:20::/28",
+    "2001:30::/28",
+    "2001:db8::/32",
+    "2002::/16",
+    "2620:4f:8000::/48",
+    "3fff::/20",
+    "4000::/3",
+    "5f00::/16",
+    "6000::/3",
+    "8000::/3",
+    "a000::/3",
+    "c000::/3",
+    "e000::/4",
+    "f000::/5",
+    "f800::/6",
+    "fc00::/7",
+    "fe00::/9",
+    "fe80::/10",
+    "fec0::/10",
+    "ff00::/8",
+)
+
+#: Table entry of intervals the checks do not give the same results for at both ends. Networks touching such an
+#: interval are checked with the ipaddress module.
+_UNKNOWN = object()
+
+
+def _networks(version):
+    if version == 4:
+        return [IPv4Network(n) for n in _IPV4_NETWORKS]
+    mapped = int(IPv6Address("::ffff:0:0"))
+    return [IPv6Network(n) for n in _IPV6_NETWORKS] + [
+        IPv6Network((mapped | int(n.network_address), 96 + n.prefixlen)) for n in _networks(4)
+    ]
+
+
+def _check_network(network):
+    for error, check in _CHECKS:
+        if getattr(network, check):
+            return error
+    return None
+
+
+@cache
+def _table(version):
+    """
+    Builds the classification table of an IP version.
+
+    The address space is split into intervals at the boundaries of the special-purpose networks listed above.
+    The public ipaddress network checks are evaluated at the first and last address of each interval. If both
+    give the same result, networks within the interval get that result, otherwise the interval is marked as
+    unknown. So the table follows the ipaddress module of the running Python version, including the changed
+    private semantics of newer releases.
+    """
+    network_class, bits = (IPv4Network, IPV4LENGTH) if version == 4 else (IPv6Network, IPV6LENGTH)
+
+    boundaries = {0}
+    for network in _networks(version):
+        boundaries.add(int(network.network_address))
+        boundaries.add(int(network.broadcast_address) + 1)
+    starts = sorted(b for b in boundaries if b < 1 << bits)
+
+    results = []
+    for start, end in zip(starts, [*starts[1:], 1 << bits], strict=True):
+        # Networks of single addresses, as the network checks of newer Python versions differ from the address
+        # checks for IPv4-mapped addresses
+        result = _check_network(network_class((start, bits)))
+        results.append(result if result == _check_network(network_class((end - 1, bits))) else _UNKNOWN)
+    return starts, tuple(results)
+
+
+def warmup():
+    """
+    Builds the classification tables of both IP versions, which classify_network() otherwise builds on first use.
+    """
+    for version in (4, 6):
+        _table(version)
+
+
+def classify_network(network):
+    """
+    Classifies a network against the special-purpose networks of the IANA registries.
+
+    Gives the same results as checking is_link_local, is_loopback, is_multicast, is_reserved and is_private of
+    the network in this order, using a single table lookup for nearly all networks.
+
+    :param network: Network to classify
+    :type network: IPPrefix or IPv4Network or IPv6Network
+    :returns: Name of the NetworkField error constant of the first matching check, None if no check matches
+    :rtype: str or None
+    """
+    version, first, last = get_address_range(network)
+    starts, results = _table(version)
+
+    i = bisect_right(starts, first) - 1
+    if (i + 1 == len(starts) or last < starts[i + 1]) and results[i] is not _UNKNOWN:
+        # Both ends within the same interval
+        return results[i]
+
+    # Networks spanning several intervals are rare, check them like NetworkField used to
+    return _check_network(network)
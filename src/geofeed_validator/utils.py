@@ -23,6 +23,13 @@
 # Stephan Peijnik <speijnik@anexia-it.com>
 #
 
+import codecs
+import mmap
+import os
+from collections import OrderedDict
+
+from geofeed_validator.iso3166 import get_data
+
 
 def is_file_like_object(obj):
     """
@@ -34,3 +41,229 @@ def is_file_like_object(obj):
     :rtype: bool
     """
     return hasattr(obj, "read") and hasattr(obj, "close")
+
+
+def get_data_version():
+    """
+    Returns the version of the ISO3166 data in use, i.e. of the pycountry release the bundled snapshot was
+    generated from, or of pycountry if it is used instead.
+
+    :returns: Version, empty if unknown
+    :rtype: str
+    """
+    return get_data()[0]
+
+
+def iter_lines(obj):
+    """
+    Helper function that lazily yields the lines of a file-like object.
+
+    Lines are read one at a time using readline(), so the feed is never held in memory as a whole.
+
+    :param obj: File-like object to read from
+    :type obj: file
+    :returns: Iterator over the lines of obj
+    :rtype: iterator of str
+    """
+    readline = obj.readline
+    while line := readline():
+        yield line
+
+
+class MappedFeed:
+    """
+    Read-only, file-like view of a feed file backed by a memory mapping.
+
+    Lines are decoded straight from the mapping as they are read, so the file is never copied into memory as a
+    whole. The encoding must be ASCII compatible. Like files opened in text mode, lines are split at LF, CR LF
+    and CR, which are all translated to LF, and read() counts characters.
+    """
+
+    def __init__(self, path, encoding=None):
+        """
+        :param path: Path of the feed file
+        :type path: str
+        :param encoding: Encoding of the feed file, defaults to UTF-8
+        :type encoding: str or None
+        """
+        self.name = path
+        self.encoding = encoding or "utf-8"
+        self._decoder = codecs.getincrementaldecoder(self.encoding)()
+        self._map = None
+        self.closed = False
+        # Position of the next CR, kept so the mapping is searched for CRs only once, len(mapping) if there are none
+        self._next_cr = -1
+        # Rest of a line partially returned by read(), and the size of its line break in bytes
+        self._pending = ""
+        self._pending_break_size = 1
+
+        with open(path, "rb") as fp:
+            # Empty files cannot be mapped, they are treated as being at EOF right away.
+            if os.fstat(fp.fileno()).st_size > 0:
+                self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _check_closed(self):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+
+    def _read_line(self):
+        """
+        :returns: Next line of the mapping with its line break translated to LF, and the size of the line break in
+            bytes
+        :rtype: (str, int)
+        """
+        mapping = self._map
+        if mapping is None or mapping.tell() == len(mapping):
+            return self._decoder.decode(b"", final=True), 0
+
+        start = mapping.tell()
+        if self._next_cr < start:
+            self._next_cr = mapping.find(b"\r", start)
+            if self._next_cr < 0:
+                self._next_cr = len(mapping)
+        if self._next_cr == len(mapping):
+            data = mapping.readline()
+            return self._decoder.decode(data), 1 if data.endswith(b"\n") else 0
+
+        end = mapping.find(b"\n", start, self._next_cr)
+        if end < 0:
+            end = self._next_cr
+
+        break_size = 2 if end == self._next_cr and mapping[end + 1 : end + 2] == b"\n" else 1
+        line = self._decoder.decode(mapping.read(end - start)) + "\n"
+        mapping.seek(end + break_size)
+        return line, break_size
+
+    def read(self, size=-1):
+        """
+        :param size: Number of characters to read, all if negative
+        :type size: int
+        """
+        self._check_closed()
+        if size is None or size < 0:
+            return "".join(iter(self.readline, ""))
+
+        parts = []
+        while size > 0 and (line := self.readline()):
+            if len(line) > size:
+                line, self._pending = line[:size], line[size:]
+            parts.append(line)
+            size -= len(line)
+        return "".join(parts)
+
+    def readline(self):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if self._pending:
+            line, self._pending = self._pending, ""
+            return line
+
+        mapping = self._map
+        if mapping is not None and self._next_cr == len(mapping):
+            # No CRs left, the common case
+            data = mapping.readline()
+            return self._decoder.decode(data, final=not data)
+
+        line, self._pending_break_size = self._read_line()
+        return line
+
+    def tell(self):
+        """
+        :returns: Byte offset of the next line to be read, or of the next character to be read after read()
+        :rtype: int
+        """
+        self._check_closed()
+        if self._map is None:
+            return 0
+
+        pending_size = 0
+        if self._pending.endswith("\n"):
+            pending_size = len(self._pending[:-1].encode(self.encoding)) + self._pending_break_size
+        elif self._pending:
+            pending_size = len(self._pending.encode(self.encoding))
+        return self._map.tell() - pending_size
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LRUCache:
+    """
+    Mapping of a bounded size, evicting the least recently used entries beyond that.
+    """
+
+    def __init__(self, max_size):
+        """
+        :param max_size: Maximum number of entries
+        :type max_size: int
+        """
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, not {max_size!r}.")
+
+        self._max_size = max_size
+        self._entries = OrderedDict()
+
+        #: Number of keys found in the cache
+        self.hits = 0
+        #: Number of keys not found in the cache
+        self.misses = 0
+        #: Number of entries evicted
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def hit_rate(self):
+        """
+        Share of the lookups that found their key, 0.0 before the first lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key):
+        """
+        :returns: Value of a key, None if not cached
+        :rtype: object
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        :param value: Value of the key, not None
+        :type value: object
+        """
+        self._entries[key] = value
+        if len(self._entries) > self._max_size:
+            try:
+                self._entries.popitem(last=False)
+            except KeyError:
+                return
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics.
+        """
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
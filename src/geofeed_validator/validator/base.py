@@ -23,12 +23,16 @@
 # Stephan Peijnik <speijnik@anexia-it.com>
 #
 
-import inspect
 import io
+import itertools
 
+from geofeed_validator.columnar import ColumnarValidationResult
 from geofeed_validator.fields import CityField, CountryField, Field, NetworkField, SubdivisionField, ZipCodeField
-from geofeed_validator.result import ValidationResult
-from geofeed_validator.utils import is_file_like_object
+from geofeed_validator.iso3166 import get_subdivision_country
+from geofeed_validator.prefix import get_address_range
+from geofeed_validator.result import RecordUpdate, ValidationResult, _DroppedRecord, get_field_index
+from geofeed_validator.utils import is_file_like_object, iter_lines
+from geofeed_validator.vectorized import HAS_NUMPY, clean_networks, find_parents, supports_field
 
 
 class BaseValidator:
@@ -40,110 +44,476 @@ class BaseValidator:
     FIELDS = None
     RECORD_NAME = "record"
 
-    def __init__(self, feed, store_raw_records=False):
-        if not isinstance(getattr(self, "NAME", None), str):
+    #: Number of records read ahead to look up their lines in the cache at once.
+    CACHE_BATCH_SIZE = 256
+
+    #: Validation engines: "python" checks the networks of the feed one by one, "numpy" checks them as arrays.
+    ENGINES = ("python", "numpy")
+
+    #: Number of records read ahead to clean their networks, and the other values cleaned by value alone, at once
+    #: with the "numpy" engine.
+    ENGINE_BATCH_SIZE = 4096
+
+    #: Maximum number of duplicates listed in the error reported on the first record of a duplicate network.
+    MAX_DUPLICATES_LISTED = 10
+
+    #: Field classes of the columns used by the common checks, by role.
+    FIELD_ROLES = {
+        "network": NetworkField,
+        "country": CountryField,
+        "region": SubdivisionField,
+        "city": CityField,
+        "postal_code": ZipCodeField,
+    }
+
+    def __init__(
+        self,
+        feed,
+        store_raw_records=False,
+        columnar=False,
+        problems_only=False,
+        max_errors=None,
+        max_warnings=None,
+        cache=None,
+        engine="python",
+    ):
+        #: :type: tuple of Field
+        self._fields, self._role_fields, self._field_index = self._get_setup()
+
+        self._feed = None
+        self._store_raw_records = store_raw_records
+        self._columnar = columnar
+        self._problems_only = problems_only
+        self._max_errors = max_errors
+        self._max_warnings = max_warnings
+        #: :type: geofeed_validator.cache.ValidationCache
+        self._cache = cache
+        self._engine = self._check_options(columnar, problems_only, max_errors, max_warnings, cache, engine)
+        if isinstance(feed, str):
+            # Universal newlines, like feed files opened in text mode
+            self._feed = io.StringIO(feed, newline=None)
+        elif is_file_like_object(feed):
+            self._feed = feed
+        else:
+            raise ValueError("feed argument must either be a string or a file-like object.")
+
+    @classmethod
+    def _check_options(cls, columnar, problems_only, max_errors, max_warnings, cache, engine):
+        """
+        Checks the options of the validator, also for GeoFeedValidator and ReusableValidator, which check them
+        before constructing validators.
+
+        :returns: Validation engine to use, "python" if the "numpy" engine was requested without NumPy installed
+        :rtype: str
+        :raises ValueError: If an option is invalid or not supported in combination with the others
+        """
+        for name, budget in (("max_errors", max_errors), ("max_warnings", max_warnings)):
+            if budget is not None and (not isinstance(budget, int) or budget < 1):
+                raise ValueError(f"{name} must be a positive integer or None, not {budget!r}.")
+        if columnar and problems_only:
+            raise ValueError("Columnar results always store all records, problems_only is not supported.")
+        if engine not in cls.ENGINES:
+            raise ValueError(f"engine must be one of {', '.join(map(repr, cls.ENGINES))}, not {engine!r}.")
+        if engine != "python" and cache is not None:
+            raise ValueError(f"The {engine!r} engine is not supported with a cache.")
+        # Without NumPy, the "numpy" engine falls back to the "python" engine.
+        return engine if engine != "numpy" or HAS_NUMPY else "python"
+
+    @classmethod
+    def _get_setup(cls):
+        """
+        Checks the class attributes and instantiates the fields, once per validator class. All instances of a
+        validator class share its fields, which are stateless.
+
+        :returns: Fields, the field of each role in FIELD_ROLES and the position of each field by name
+        :rtype: (tuple of Field, dict of (str, Field), dict of (str, int))
+        :raises ValueError: If NAME or FIELDS is not set or invalid
+        """
+        setup = cls.__dict__.get("_setup")
+        if setup is not None:
+            return setup
+
+        if not isinstance(getattr(cls, "NAME", None), str):
             raise ValueError(
                 "NAME class-attribute of {!r} not set or invalid (type={!r}).".format(
-                    self.__class__, type(getattr(self, "NAME", None))
+                    cls, type(getattr(cls, "NAME", None))
                 )
             )
 
-        if type(getattr(self, "FIELDS", None)) not in (list, tuple):
+        if type(getattr(cls, "FIELDS", None)) not in (list, tuple):
             raise ValueError(
                 "FIELDS class-attribute of {!r} not set or invalid (type={!r}).".format(
-                    self.__class__, type(getattr(self, "FIELDS", None))
+                    cls, type(getattr(cls, "FIELDS", None))
                 )
             )
 
-        self._fields = []
-        for field_or_class in self.FIELDS:
+        fields = []
+        for field_or_class in cls.FIELDS:
             if (
                 not isinstance(field_or_class, Field)
-                and inspect.isclass(field_or_class)
+                and isinstance(field_or_class, type)
                 and issubclass(field_or_class, Field)
             ):
                 field_or_class = field_or_class()
             elif not isinstance(field_or_class, Field):
                 raise ValueError(f"FIELDS class {field_or_class!r} not subclass/instance of {Field!r}.")
 
-            self._fields.append(field_or_class)
+            fields.append(field_or_class)
 
-        self._feed = None
-        self._store_raw_records = store_raw_records
-        if isinstance(feed, str):
-            self._feed = io.StringIO(feed)
-        elif is_file_like_object(feed):
-            self._feed = feed
-        else:
-            raise ValueError("feed argument must either be a string or a file-like object.")
+        fields = tuple(fields)
+        role_fields = {role: fields[index] if index is not None else None for role, index in cls._get_plan().items()}
+        setup = cls._setup = (fields, role_fields, get_field_index(fields))
+        return setup
+
+    @classmethod
+    def _get_plan(cls):
+        """
+        Returns the column index of each role in FIELD_ROLES, compiled once per validator class.
+
+        :returns: Column index by role, None if the validator has no column of that role
+        :rtype: dict of (str, int)
+        """
+        plan = cls.__dict__.get("_plan")
+        if plan is None:
+            plan = {}
+            for role, field_class in cls.FIELD_ROLES.items():
+                (plan[role],) = [
+                    index
+                    for index, field in enumerate(cls.FIELDS)
+                    if (issubclass(field, field_class) if isinstance(field, type) else isinstance(field, field_class))
+                ] or (None,)
+            cls._plan = plan
+        return plan
+
+    @property
+    def engine(self):
+        """
+        :returns: Validation engine in use, "python" if the "numpy" engine was requested without NumPy installed
+        :rtype: str
+        """
+        return self._engine
 
     def get_records(self):
         raise NotImplementedError
 
+    def _create_result(self):
+        """
+        :returns: Empty result for the records of this validator
+        :rtype: ValidationResult
+        """
+        if self._columnar:
+            return ColumnarValidationResult(
+                self._fields, self._store_raw_records, self._problems_only, field_index=self._field_index
+            )
+        return ValidationResult(
+            self._fields, self._store_raw_records, self._problems_only, field_index=self._field_index
+        )
+
+    def iter_results(self, result=None):
+        """
+        Validates the feed in self._feed, yielding results as they are produced.
+
+        Each record is yielded as a RecordValidationResult as soon as its field checks and the cross-record
+        checks against the preceding records are done. Findings of checks that need the whole feed (e.g. the
+        duplicates of a record, networks contained in other networks) follow the last record as RecordUpdate
+        events. The ValidationResult is yielded last, closing the stream.
+
+        :param result: Result to add the records to, a new one by default
+        :type result: ValidationResult or None
+        :returns: Iterator over RecordValidationResult, RecordUpdate and finally ValidationResult objects
+        :rtype: iterator
+        """
+        if result is None:
+            result = self._create_result()
+        yield from self._iter_common(result, self._iter_records(result))
+
+    def _iter_records(self, result):
+        """
+        Adds the records of the feed to result, restoring the outcome of the field checks from the cache if one
+        is set. New outcomes are written to the cache once all records have been read.
+
+        :param result: Result to add the records to
+        :type result: ValidationResult
+        :returns: Iterator over the added records
+        :rtype: iterator of RecordValidationResult
+        """
+        cache = self._cache
+        network_field = self._role_fields["network"]
+        if self._engine == "numpy" and network_field is not None and supports_field(network_field):
+            yield from self._iter_records_vectorized(result, network_field)
+            return
+
+        if cache is None:
+            for record, raw_data in self.get_records():
+                yield result.add_record(record, raw_data)
+            return
+
+        # Records are read in batches, so their outcomes can be looked up in one query.
+        records = self.get_records()
+        while batch := list(itertools.islice(records, self.CACHE_BATCH_SIZE)):
+            keys = [
+                cache.get_key(self.NAME, raw_data) if record and isinstance(raw_data, str) else None
+                for record, raw_data in batch
+            ]
+            cache.prefetch([key for key in keys if key is not None])
+            for (record, raw_data), key in zip(batch, keys, strict=True):
+                if key is None:
+                    yield result.add_record(record, raw_data)
+                    continue
+
+                outcome = cache.get(key)
+                record_validation = result.add_record(record, raw_data, outcome)
+                if outcome is None:
+                    cache.put(key, record_validation.get_outcome())
+                yield record_validation
+        cache.flush()
+
+    def _iter_records_vectorized(self, result, network_field):
+        """
+        Adds the records of the feed to result, cleaning their networks in batches of ENGINE_BATCH_SIZE records,
+        see geofeed_validator.vectorized.clean_networks(). The values of fields caching the outcome of clean() are
+        cleaned once per batch and value.
+
+        :param result: Result to add the records to
+        :type result: ValidationResult
+        :param network_field: Network field, supported by clean_networks()
+        :type network_field: NetworkField
+        :returns: Iterator over the added records
+        :rtype: iterator of RecordValidationResult
+        """
+        network_index = self._get_plan()["network"]
+        # Fields whose outcome depends on the value alone are cleaned once per distinct value of a batch.
+        value_fields = [
+            (index, field)
+            for index, field in enumerate(self._fields)
+            if index != network_index and field.get_cache() is not None
+        ]
+        records = self.get_records()
+        while batch := list(itertools.islice(records, self.ENGINE_BATCH_SIZE)):
+            values = [record.get(network_field) for record, _ in batch]
+            in_column = [isinstance(value, str) for value in values]
+            networks = iter(clean_networks(network_field, list(itertools.compress(values, in_column))))
+            outcomes = [(index, field, {}) for index, field in value_fields]
+            for (record, raw_data), network_in_column in zip(batch, in_column, strict=True):
+                cleaned = {network_index: next(networks)} if network_in_column else {}
+                for index, field, field_outcomes in outcomes:
+                    value = record.get(field)
+                    if value is not None:
+                        outcome = field_outcomes.get(value)
+                        if outcome is None:
+                            outcome = field_outcomes[value] = field.clean(value)
+                        cleaned[index] = outcome
+                yield result.add_record(record, raw_data, cleaned=cleaned)
+
     def validate(self):
         """
         Validates the feed in self._feed.
+
+        Records are validated as they are read from the feed, cross-record checks run in the same pass. With
+        max_errors or max_warnings, validation stops early once they are reached, see ValidationResult.truncated.
+
         :returns: ValidationResult object
         :rtype: ValidationResult
         """
-        result = ValidationResult(self._fields, self._store_raw_records)
-        for record, raw_data in self.get_records():
-            result.add_record(record, raw_data)
-
-        self._validate_common(result)
+        result = None
+        for item in self.iter_results():
+            result = item
         return result
 
     def _validate_common_network_duplicates(self, networks, record):
-        (ip_prefix_field,) = [
-            field
-            for field in self.FIELDS
-            if (issubclass(field, NetworkField) if inspect.isclass(field) else isinstance(field, NetworkField))
-        ] or (None,)
-        ip_prefix = record.get_field_result(ip_prefix_field)
-
-        if ip_prefix:
-            network_str = str(ip_prefix.value)
+        """
+        Checks a record for a network already seen in a preceding record.
+
+        A duplicate is reported as a duplicate of the network's first record only, the first record is reported by
+        _report_network_duplicates once the whole feed has been seen. This keeps the work linear in the number of
+        records, regardless of how often a network is repeated.
+
+        :param networks: Records by network seen so far, updated in place. The first record of a network may be a
+            _DroppedRecord, see _iter_common.
+        :type networks: dict of (str, list of RecordValidationResult)
+        :param record: Record to check
+        :type record: RecordValidationResult
+        :returns: Records of the network if record is the first record of its network, None otherwise
+        :rtype: list of RecordValidationResult or None
+        """
+        ip_prefix_field = self._role_fields["network"]
+        ip_prefix = record.get_field_result(ip_prefix_field) if ip_prefix_field else None
+
+        # Keyed by the canonical string, so the network object itself never has to be touched.
+        if ip_prefix and ip_prefix.value_string:
+            network_str = ip_prefix.value_string
             if network_str in networks:
-                for other_record in networks[network_str]:
-                    other_record.add_field_errors(
-                        ip_prefix_field, f"Duplicate of {self.RECORD_NAME} #{record.record_no}"
-                    )
-                    record.add_field_errors(
-                        ip_prefix_field, f"Duplicate of {self.RECORD_NAME} #{other_record.record_no}"
-                    )
-                networks[network_str].append(record)
+                records = networks[network_str]
+                record.add_field_errors(ip_prefix_field, self._format_duplicate_error([records[0].record_no]))
+                records.append(record)
             else:
-                networks[network_str] = [record]
-        return networks
+                records = networks[network_str] = [record]
+                return records
+        return None
+
+    def _get_network_range(self, records):
+        """
+        Returns the address range of a network as sort key for _validate_common_network_overlaps.
+
+        :param records: Records of the network, as collected by _validate_common_network_duplicates
+        :type records: list of RecordValidationResult
+        :returns: IP version, first address, negated last address, record number of the first record and records
+        :rtype: tuple
+        """
+        # Values released by the result are not restored for good just for this.
+        network = records[0].get_field_result(self._role_fields["network"]).peek_value()
+        version, first, last = get_address_range(network)
+        # Enclosing networks sort before the networks they contain, duplicates are grouped already.
+        return version, first, -last, records[0].record_no, records
+
+    def _report_network_duplicates(self, networks):
+        """
+        Reports the duplicates of each network on the network's first record, listing at most
+        MAX_DUPLICATES_LISTED of them.
+
+        :param networks: Records by network, as collected by _validate_common_network_duplicates
+        :type networks: dict of (str, list of RecordValidationResult)
+        :returns: Findings added to the first records of duplicate networks
+        :rtype: iterator of RecordUpdate
+        """
+        ip_prefix_field = self._role_fields["network"]
+
+        for records in networks.values():
+            if len(records) == 1:
+                continue
+
+            error = self._format_duplicate_error([r.record_no for r in records[1:]])
+            first = self._restore_first_record(records)
+            first.add_field_errors(ip_prefix_field, error)
+            yield RecordUpdate(first, ip_prefix_field, errors=[error])
+
+    def _restore_first_record(self, records):
+        """
+        :param records: Records of a network, as collected by _validate_common_network_duplicates, updated in place
+        :type records: list of RecordValidationResult
+        :returns: The first record of the network, restored if it has been dropped, see _iter_common
+        :rtype: RecordValidationResult
+        """
+        if isinstance(records[0], _DroppedRecord):
+            records[0] = records[0].restore()
+        return records[0]
+
+    def _get_location(self, record):
+        """
+        :param record: Record, may be a _DroppedRecord
+        :type record: RecordValidationResult
+        :returns: Value strings of the fields compared to tell whether a contained network has a different location
+        :rtype: tuple of str
+        """
+        if isinstance(record, _DroppedRecord):
+            return record.location
+        return tuple(getattr(record.get_field_result(f), "value_string", None) for f in self._get_location_fields())
+
+    def _format_duplicate_error(self, record_nos):
+        """
+        :param record_nos: Record numbers of the other records of a network, in record order
+        :type record_nos: list of int
+        :returns: Error reported on a record of a network that is listed more than once
+        :rtype: str
+        """
+        if len(record_nos) == 1:
+            return f"Duplicate of {self.RECORD_NAME} #{record_nos[0]}"
+
+        listed = ", ".join(f"#{record_no}" for record_no in record_nos[: self.MAX_DUPLICATES_LISTED])
+        error = f"Duplicate of {self.RECORD_NAME}s {listed}"
+        if len(record_nos) > self.MAX_DUPLICATES_LISTED:
+            error += f" and {len(record_nos) - self.MAX_DUPLICATES_LISTED} more"
+        return error
+
+    def _format_containment_warning(self, record_no, different_location):
+        """
+        :param record_no: Record number of the first record of the closest enclosing network
+        :type record_no: int
+        :param different_location: Whether the location differs from the one of the enclosing network
+        :type different_location: bool
+        :returns: Warning reported on a record of a network contained in another network of the feed
+        :rtype: str
+        """
+        warning = f"Contained in {self.RECORD_NAME} #{record_no}"
+        if different_location:
+            warning += " with a different location"
+        return warning
+
+    def _get_location_fields(self):
+        """
+        :returns: Fields compared to tell whether a contained network has a different location
+        :rtype: list of Field
+        """
+        return [field for field in (self._role_fields[role] for role in ("country", "region", "city")) if field]
+
+    def _validate_common_network_overlaps(self, ranges):
+        """
+        Checks for networks contained in other networks of the feed.
+
+        :param ranges: Address range of each network of the feed, as returned by _get_network_range
+        :type ranges: list of tuple
+        :returns: Findings added to the records of contained networks
+        :rtype: iterator of RecordUpdate
+        """
+        ip_prefix_field = self._role_fields["network"]
+
+        for records, parent_records in self._iter_network_parents(ranges):
+            parent = parent_records[0]
+            parent_location = self._get_location(parent)
+            self._restore_first_record(records)
+            for record in records:
+                location = self._get_location(record)
+                warning = self._format_containment_warning(parent.record_no, location != parent_location)
+                record.add_field_warnings(ip_prefix_field, warning)
+                yield RecordUpdate(record, ip_prefix_field, warnings=[warning])
+
+    def _iter_network_parents(self, ranges):
+        """
+        Finds the closest enclosing network of each network contained in another network, in address order.
+
+        The "python" engine sweeps over the sorted address ranges: as prefixes are either nested or disjoint, the
+        enclosing networks still open at a network's start address form a stack, the top of which is the
+        network's closest enclosing network. The "numpy" engine looks the networks up per prefix length, see
+        geofeed_validator.vectorized.find_parents().
+
+        :param ranges: Address range of each network of the feed, as returned by _get_network_range, sorted in place
+            by the "python" engine
+        :type ranges: list of tuple
+        :returns: Iterator over the records of each contained network and the records of its closest enclosing
+            network
+        :rtype: iterator of (list of RecordValidationResult, list of RecordValidationResult)
+        """
+        if self._engine == "numpy":
+            sorted_ranges, parents = find_parents(ranges)
+            for network_range, parent in zip(sorted_ranges, parents, strict=True):
+                if parent >= 0:
+                    yield network_range[4], sorted_ranges[parent][4]
+            return
+
+        ranges.sort()
+
+        parents = []
+        for version, first, negative_last, _, records in ranges:
+            while parents and (parents[-1][0] != version or -parents[-1][1] < first):
+                parents.pop()
+
+            if parents:
+                yield records, parents[-1][2]
+
+            parents.append((version, negative_last, records))
 
     def _validate_common_geoinfo(self, record):
-        (alpha2_code_field,) = [
-            field
-            for field in self.FIELDS
-            if (issubclass(field, CountryField) if inspect.isclass(field) else isinstance(field, CountryField))
-        ] or (None,)
-        (region_field,) = [
-            field
-            for field in self.FIELDS
-            if (issubclass(field, SubdivisionField) if inspect.isclass(field) else isinstance(field, SubdivisionField))
-        ] or (None,)
-        (city_field,) = [
-            field
-            for field in self.FIELDS
-            if (issubclass(field, CityField) if inspect.isclass(field) else isinstance(field, CityField))
-        ] or (None,)
-        (postal_code_field,) = [
-            field
-            for field in self.FIELDS
-            if (issubclass(field, ZipCodeField) if inspect.isclass(field) else isinstance(field, ZipCodeField))
-        ] or (None,)
-
-        alpha2_code = record.get_field_value(alpha2_code_field)
-        region = record.get_field_value(region_field)
-        city = record.get_field_value(city_field)
-        postal_code = record.get_field_value(postal_code_field)
-
-        if alpha2_code and region and region.country != alpha2_code:
+        alpha2_code_field = self._role_fields["country"]
+        region_field = self._role_fields["region"]
+        city_field = self._role_fields["city"]
+        postal_code_field = self._role_fields["postal_code"]
+
+        alpha2_code = record._get_field_value(alpha2_code_field)
+        region = record._get_field_value(region_field)
+        city = record._get_field_value(city_field)
+        postal_code = record._get_field_value(postal_code_field)
+
+        if alpha2_code and region and get_subdivision_country(region) != alpha2_code:
             record.add_field_errors(region_field, "Region not a subdivison of given country.")
 
         elif region and not alpha2_code:
@@ -158,21 +528,87 @@ class BaseValidator:
     def _validate_common_extra(self, record):
         pass
 
-    def _validate_common(self, result):
+    def _validate_common_record(self, record):
         """
-        :type: result list of RecordValidationResult
+        Runs the common checks that only depend on the record itself.
+
+        :param record: Record to check
+        :type record: RecordValidationResult
         """
-        networks = {}
+        # Validate country, division, city, zipcode
+        self._validate_common_geoinfo(record)
 
-        for record in result.records:
-            # Check for duplicate network entries
-            networks = self._validate_common_network_duplicates(networks, record)
+        # Extra validations...
+        self._validate_common_extra(record)
 
-            # Validate country, division, city, zipcode
-            self._validate_common_geoinfo(record)
+    def _budget_exhausted(self, result):
+        """
+        :returns: Whether result has reached max_errors or max_warnings
+        :rtype: bool
+        """
+        return (self._max_errors is not None and result.error_count >= self._max_errors) or (
+            self._max_warnings is not None and result.warning_count >= self._max_warnings
+        )
 
-            # Extra validations...
-            self._validate_common_extra(record)
+    def _iter_common(self, result, records, record_checks=True, network_ranges=None):
+        """
+        Runs the common checks on validated records in record order, yielding them as they are checked.
+
+        Once max_errors or max_warnings is reached, no more records are read and the whole-feed checks are
+        skipped, the result is yielded marked as truncated.
+
+        With problems_only, the whole-feed checks only keep a _DroppedRecord of clean records, so the records
+        themselves can be released. Records findings are added to later on are restored.
+
+        :param result: Result the records belong to, yielded last
+        :type result: ValidationResult
+        :param records: Records in record order
+        :type records: iterator of RecordValidationResult
+        :param record_checks: Whether to run the per-record checks, which may already have been run elsewhere
+        :type record_checks: bool
+        :param network_ranges: Returns the address ranges of the networks of the records once all records have been
+            read, sorted, as (version, first address, negated last address, record number, value string) of at
+            least the first record of each network. For ranges determined elsewhere, instead of determining them
+            from the parsed networks here.
+        :type network_ranges: callable or None
+        :returns: Iterator over RecordValidationResult, RecordUpdate and finally ValidationResult objects
+        :rtype: iterator
+        """
+        networks = {}
+        # Collected while reading, so the whole-feed checks only have to sort them.
+        ranges = []
+        shared = {}
+        for record in records:
+            if record_checks:
+                self._validate_common_record(record)
+
+            # Check for duplicate network entries
+            network_records = self._validate_common_network_duplicates(networks, record)
+            if network_records:
+                if network_ranges is None:
+                    ranges.append(self._get_network_range(network_records))
+                if result._problems_only and not (record.has_errors or record.has_warnings):
+                    network_records[0] = _DroppedRecord(record, self._get_location(record), shared)
+            yield record
+
+            if self._budget_exhausted(result):
+                result.truncate()
+                yield result
+                return
+
+        # Report duplicates and check for networks contained in other networks, which needs all networks of the feed
+        if networks:
+            if network_ranges is not None:
+                # Networks are listed once per chunk they occur in, the ranges of their first record are kept.
+                ranges = [
+                    (version, first, negative_last, record_no, records)
+                    for version, first, negative_last, record_no, value_string in network_ranges()
+                    if (records := networks[value_string])[0].record_no == record_no
+                ]
+            yield from self._report_network_duplicates(networks)
+            yield from self._validate_common_network_overlaps(ranges)
+
+        yield result
 
 
 class BaseCSVValidator(BaseValidator):
@@ -184,22 +620,36 @@ class BaseCSVValidator(BaseValidator):
 
     def get_records(self):
         """
-        Processes CSV contents on a per-line basis
+        Processes CSV contents on a per-line basis, reading the feed lazily
         """
-        for line in self._feed.readlines():
+        for line in self.get_lines():
             # Process one line at a time...
-            line = line.strip()
-            if line == "" or line.startswith("#"):
-                # Empty line/comment
-                yield {}, line
-                continue
+            yield self.parse_line(line), line
+
+    def get_lines(self):
+        """
+        :returns: Iterator over the lines of the feed, stripped of surrounding whitespace
+        :rtype: iterator of str
+        """
+        for line in iter_lines(self._feed):
+            yield line.strip()
 
-            field_values = line.split(",")
-            record = dict(zip(self._fields, field_values, strict=False))
-            if len(field_values) > len(self._fields):
-                record.update({"__extra__": field_values[len(self._fields) :]})
+    def parse_line(self, line):
+        """
+        :param line: Line as returned by get_lines()
+        :type line: str
+        :returns: Record data, empty for empty lines and comments
+        :rtype: dict of (Field, str)
+        """
+        if line == "" or line.startswith("#"):
+            # Empty line/comment
+            return {}
 
-            yield record, line
+        field_values = line.split(",")
+        record = dict(zip(self._fields, field_values, strict=False))
+        if len(field_values) > len(self._fields):
+            record.update({"__extra__": field_values[len(self._fields) :]})
+        return record
 
 
 class Registry:
@@ -211,7 +661,7 @@ class Registry:
 
     @classmethod
     def register(cls, validator_class):
-        if not inspect.isclass(validator_class) or not issubclass(validator_class, BaseValidator):
+        if not isinstance(validator_class, type) or not issubclass(validator_class, BaseValidator):
             raise ValueError(f"{validator_class!r} is not a subclass of BaseValidator.")
 
         if not isinstance(getattr(validator_class, "NAME", None), str):
@@ -39,26 +39,28 @@ Registry.register(CSVValidatorDraft02)
 class CSVValidatorDraft02WithAllocationSize(CSVValidatorDraft02):
     NAME = "draft02-allocationsize"
     FIELDS = CSVValidatorDraft02.FIELDS + [AllocationSizeField]
+    FIELD_ROLES = {**CSVValidatorDraft02.FIELD_ROLES, "allocation_size": AllocationSizeField}
 
     def _validate_common_extra(self, record):
-        network = record.get_field_value(NetworkField)
-        allocation_size = record.get_field_value(AllocationSizeField)
+        allocation_size_field = self._role_fields["allocation_size"]
+        network = record._get_field_value(self._role_fields["network"])
+        allocation_size = record._get_field_value(allocation_size_field)
         if network and allocation_size:
             if allocation_size < 0:
-                record.add_field_errors(AllocationSizeField, "Allocation size must not be negative.")
+                record.add_field_errors(allocation_size_field, "Allocation size must not be negative.")
 
             if network.version == 4 and allocation_size > 32:
-                record.add_field_errors(AllocationSizeField, "IPv4 prefix length is 32 bits at maximum.")
+                record.add_field_errors(allocation_size_field, "IPv4 prefix length is 32 bits at maximum.")
             elif network.version == 6 and allocation_size > 128:
-                record.add_field_errors(AllocationSizeField, "IPv6 prefix length is 128 bits at maximum.")
+                record.add_field_errors(allocation_size_field, "IPv6 prefix length is 128 bits at maximum.")
 
             if 0 <= allocation_size < network.prefixlen:
                 record.add_field_errors(
-                    AllocationSizeField, "Default allocation size larger than network prefix length."
+                    allocation_size_field, "Default allocation size larger than network prefix length."
                 )
             elif network.prefixlen == allocation_size:
                 record.add_field_warnings(
-                    AllocationSizeField, "Network prefix length is equal to default allocation size."
+                    allocation_size_field, "Network prefix length is equal to default allocation size."
                 )
 
 
@@ -0,0 +1,436 @@
+# geofeed_validator/vectorized.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+"""
+Network checks of the "numpy" engine, operating on whole columns of networks at once.
+
+Networks in the CIDR notation the ipaddress module formats them in are parsed and classified as arrays, IPv4
+addresses as uint32 and IPv6 addresses as two uint64 halves. All other values (other notations, invalid values)
+are cleaned one by one by NetworkField.
+
+NumPy is an optional dependency, HAS_NUMPY tells whether it is available. It is only imported once the "numpy"
+engine is used.
+"""
+
+import itertools
+from importlib.util import find_spec
+from ipaddress import IPV4LENGTH, IPV6LENGTH
+
+from geofeed_validator.fields import NetworkField
+from geofeed_validator.prefix import IPPrefix
+from geofeed_validator.special_networks import _UNKNOWN, _table, classify_network
+
+#: Whether NumPy is installed, which the "numpy" engine needs
+HAS_NUMPY = find_spec("numpy") is not None
+
+#: Longest IPv4 prefix in CIDR notation, "255.255.255.255/32"
+_WIDTH = 18
+
+#: Longest IPv6 prefix in canonical CIDR notation, eight hextets of four digits and "/128"
+_WIDTH6 = 43
+
+# Code points
+_ZERO, _NINE, _DOT, _SLASH, _COLON, _LOWER_A, _LOWER_F = (ord(c) for c in "09./:af")
+
+#: First 96 bits of IPv4-mapped IPv6 addresses, whose notation depends on the Python version, see IPPrefix.__str__
+_IPV4_MAPPED = 0xFFFF
+
+#: Methods of NetworkField, which have to be used unchanged for the results to be the same
+_NETWORK_METHODS = (
+    "clean",
+    "_clean",
+    "_parse",
+    "to_python",
+    "_check_errors",
+    "_check_errors_parsed",
+    "_check_warnings",
+    "_check_warnings_parsed",
+    "to_string",
+    "_to_string_parsed",
+)
+
+_MASK64 = (1 << 64) - 1
+
+# Both halves of an IPv6 address in big-endian order, so addresses sort like their bytes
+_ADDRESS = [("high", ">u8"), ("low", ">u8")]
+
+
+def supports_field(field):
+    """
+    :param field: Network field
+    :type field: NetworkField
+    :returns: Whether clean_networks() gives the same results as the clean() method of field
+    :rtype: bool
+    """
+    return isinstance(field, NetworkField) and all(
+        getattr(type(field), name) is getattr(NetworkField, name) for name in _NETWORK_METHODS
+    )
+
+
+def _parse_ipv4_column(values):
+    """
+    Parses the values in canonical IPv4 CIDR notation, i.e. without leading zeros.
+
+    :returns: Whether each value is in canonical IPv4 CIDR notation, the network addresses and the prefix lengths
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    import numpy
+
+    count = len(values)
+    lengths = numpy.fromiter(map(len, values), dtype=numpy.uint32, count=count)
+    # Longer values are truncated here, but cannot be IPv4 networks anyway.
+    # Code points by column, each column contiguous
+    codes = numpy.array(values, dtype=f"U{_WIDTH}").view(numpy.uint32).reshape(count, _WIDTH).T.copy()
+
+    valid = lengths <= _WIDTH
+    # Octets and the prefix length. Parts of invalid values may wrap around, which does not matter as they are
+    # invalid for having too many digits anyway.
+    parts = numpy.zeros((5, count), dtype=numpy.uint32)
+    digits = numpy.zeros((5, count), dtype=numpy.uint32)
+    leading_zeros = numpy.zeros((5, count), dtype=bool)
+    part = numpy.zeros(count, dtype=numpy.uint32)
+    for column in range(_WIDTH):
+        code = codes[column]
+        present = column < lengths
+        is_digit = present & (code >= _ZERO) & (code <= _NINE)
+        is_dot = present & (code == _DOT)
+        is_slash = present & (code == _SLASH)
+        valid &= ~present | is_digit | (is_dot & (part < 3)) | (is_slash & (part == 3))
+
+        for index in range(5):
+            in_part = is_digit & (part == index)
+            leading_zeros[index] |= in_part & (digits[index] == 0) & (code == _ZERO)
+            parts[index] = numpy.where(in_part, parts[index] * 10 + code - _ZERO, parts[index])
+            digits[index] += in_part
+        part += is_dot | is_slash
+
+    valid &= part == 4
+    valid &= (digits[:4] >= 1).all(axis=0) & (digits[:4] <= 3).all(axis=0) & (parts[:4] <= 255).all(axis=0)
+    valid &= (digits[4] >= 1) & (digits[4] <= 2) & (parts[4] <= IPV4LENGTH)
+    valid &= ~(leading_zeros & (digits > 1)).any(axis=0)
+
+    networks = (parts[0] << 24) | (parts[1] << 16) | (parts[2] << 8) | parts[3]
+    prefixlens = numpy.where(valid, parts[4], IPV4LENGTH)
+    # Networks with host bits set are left to NetworkField, which reports the network to use instead.
+    valid &= (networks & _get_host_masks(prefixlens)) == 0
+    return valid, networks, prefixlens
+
+
+def _get_host_masks(prefixlens):
+    import numpy
+
+    # Looked up rather than shifted, shifting a uint32 by 32 bits for /0 is undefined.
+    masks = numpy.array([(1 << (IPV4LENGTH - prefixlen)) - 1 for prefixlen in range(IPV4LENGTH + 1)], numpy.uint32)
+    return masks[prefixlens]
+
+
+def _parse_ipv6_column(values):
+    """
+    Parses the values in canonical IPv6 CIDR notation, i.e. as the ipaddress module formats them: lowercase
+    hextets without leading zeros, the first longest run of more than one zero hextet elided. IPv4-mapped
+    addresses are left out, their notation depends on the Python version.
+
+    :returns: Whether each value is in canonical IPv6 CIDR notation, the network addresses (see _ADDRESS) and the
+        prefix lengths
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    import numpy
+
+    count = len(values)
+    rows = numpy.arange(count)
+    lengths = numpy.fromiter(map(len, values), dtype=numpy.uint32, count=count)
+    # Code points by column, each column contiguous
+    codes = numpy.array(values, dtype=f"U{_WIDTH6}").view(numpy.uint32).reshape(count, _WIDTH6).T.copy()
+
+    valid = lengths <= _WIDTH6
+    # Hextets in the order written, the ones following "::" are moved to their place below. The last one collects
+    # the hextets of values with too many.
+    hextets = numpy.zeros((count, 9), dtype=numpy.uint32)
+    # Completed hextets, and the digits of the current one
+    group = numpy.zeros(count, dtype=numpy.uint32)
+    digits = numpy.zeros(count, dtype=numpy.uint32)
+    leading_zero = numpy.zeros(count, dtype=bool)
+    # Position of "::" among the hextets
+    gap = numpy.zeros(count, dtype=numpy.uint32)
+    has_gap = numpy.zeros(count, dtype=bool)
+    prefixlens = numpy.zeros(count, dtype=numpy.uint32)
+    prefix_digits = numpy.zeros(count, dtype=numpy.uint32)
+    prefix_leading_zero = numpy.zeros(count, dtype=bool)
+    # State of the preceding character: a colon, the second colon of "::", a colon neither ending a hextet nor
+    # part of "::" (yet), within the prefix length
+    colon = numpy.zeros(count, dtype=bool)
+    double_colon = numpy.zeros(count, dtype=bool)
+    lone_colon = numpy.zeros(count, dtype=bool)
+    slash = numpy.zeros(count, dtype=bool)
+    for column in range(_WIDTH6):
+        code = codes[column]
+        present = column < lengths
+        is_decimal = (code >= _ZERO) & (code <= _NINE)
+        in_hextet = present & ~slash & (is_decimal | ((code >= _LOWER_A) & (code <= _LOWER_F)))
+        in_prefix = present & slash & is_decimal
+        is_colon = present & ~slash & (code == _COLON)
+        is_slash = present & ~slash & (code == _SLASH)
+        valid &= ~present | in_hextet | in_prefix | is_colon | is_slash
+        # A colon neither ending a hextet nor part of "::" has to start "::".
+        valid &= ~(lone_colon & ~is_colon)
+
+        index = numpy.minimum(group, 8)
+        current = hextets[rows, index]
+        value = numpy.where(is_decimal, code - _ZERO, code - (_LOWER_A - 10))
+        hextets[rows, index] = numpy.where(in_hextet, current * 16 + value, current)
+        # Leading zeros are not canonical.
+        valid &= ~(in_hextet & leading_zero)
+        leading_zero |= in_hextet & (digits == 0) & (code == _ZERO)
+        digits += in_hextet
+
+        valid &= ~(in_prefix & prefix_leading_zero)
+        prefix_leading_zero |= in_prefix & (prefix_digits == 0) & (code == _ZERO)
+        prefixlens = numpy.where(in_prefix, prefixlens * 10 + code - _ZERO, prefixlens)
+        prefix_digits += in_prefix
+
+        ends = (is_colon | is_slash) & (digits > 0)
+        elides = is_colon & colon & ~ends
+        # "::" at most once, the prefix length follows a hextet or "::"
+        valid &= ~(elides & has_gap)
+        valid &= ~(is_slash & ~ends & ~double_colon)
+        gap = numpy.where(elides, group, gap)
+        has_gap |= elides
+        lone_colon = is_colon & ~ends & ~colon
+        # Only the first character may be such a colon, the start of a leading "::"
+        if column:
+            valid &= ~lone_colon
+        group += ends
+        digits = numpy.where(is_colon | is_slash, 0, digits)
+        leading_zero &= ~(is_colon | is_slash)
+        valid &= digits <= 4
+        colon = is_colon
+        double_colon = elides
+        slash |= is_slash
+
+    valid &= slash & (prefix_digits >= 1) & (prefix_digits <= 3) & (prefixlens <= IPV6LENGTH)
+    valid &= numpy.where(has_gap, group <= 7, group == 8)
+
+    # Hextets moved to their place, the ones following "::" after the elided ones
+    gap_lengths = numpy.where(has_gap & valid, 8 - group.astype(numpy.int64), 0)
+    gaps = gap.astype(numpy.int64)
+    address = numpy.zeros((8, count), dtype=numpy.uint64)
+    for position in range(8):
+        after_gap = has_gap & (position >= gaps + gap_lengths)
+        in_gap = has_gap & (position >= gaps) & ~after_gap
+        source = numpy.clip(position - numpy.where(after_gap, gap_lengths, 0), 0, 8)
+        address[position] = numpy.where(in_gap, 0, hextets[rows, source])
+
+    # Canonical notation elides the first longest run of more than one zero hextet, and only that one.
+    run = numpy.zeros(count, dtype=numpy.int64)
+    best_start = numpy.zeros(count, dtype=numpy.int64)
+    best_length = numpy.zeros(count, dtype=numpy.int64)
+    for position in range(8):
+        run = numpy.where(address[position] == 0, run + 1, 0)
+        longer = run > best_length
+        best_length = numpy.where(longer, run, best_length)
+        best_start = numpy.where(longer, position + 1 - run, best_start)
+    valid &= numpy.where(best_length > 1, has_gap & (gaps == best_start) & (gap_lengths == best_length), ~has_gap)
+
+    networks = numpy.zeros(count, dtype=_ADDRESS)
+    networks["high"] = (address[0] << 48) | (address[1] << 32) | (address[2] << 16) | address[3]
+    networks["low"] = (address[4] << 48) | (address[5] << 32) | (address[6] << 16) | address[7]
+    valid &= ~((networks["high"] == 0) & (networks["low"] >> 32 == _IPV4_MAPPED))
+
+    prefixlens = numpy.where(valid, prefixlens, IPV6LENGTH)
+    # Networks with host bits set are left to NetworkField, which reports the network to use instead.
+    high_masks, low_masks = _get_host_masks6(prefixlens)
+    valid &= ((networks["high"] & high_masks) == 0) & ((networks["low"] & low_masks) == 0)
+    return valid, networks, prefixlens
+
+
+def _get_host_masks6(prefixlens):
+    import numpy
+
+    masks = [(1 << (IPV6LENGTH - prefixlen)) - 1 for prefixlen in range(IPV6LENGTH + 1)]
+    high_masks = numpy.array([mask >> 64 for mask in masks], numpy.uint64)
+    low_masks = numpy.array([mask & _MASK64 for mask in masks], numpy.uint64)
+    return high_masks[prefixlens], low_masks[prefixlens]
+
+
+def _get_intervals(version, networks, prefixlens):
+    """
+    :returns: Interval of the classification table of the first and of the last address of each network
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    import numpy
+
+    starts = _table(version)[0]
+    if version == 4:
+        starts = numpy.array(starts, dtype=numpy.uint32)
+        firsts = networks
+        lasts = networks | _get_host_masks(prefixlens)
+    else:
+        starts_array = numpy.zeros(len(starts), dtype=_ADDRESS)
+        starts_array["high"] = [start >> 64 for start in starts]
+        starts_array["low"] = [start & _MASK64 for start in starts]
+        # Searched as 16 byte big-endian strings, which sort like the addresses
+        starts = starts_array.view("V16")
+        firsts = networks.view("V16")
+        high_masks, low_masks = _get_host_masks6(prefixlens)
+        last_addresses = numpy.zeros(len(networks), dtype=_ADDRESS)
+        last_addresses["high"] = networks["high"] | high_masks
+        last_addresses["low"] = networks["low"] | low_masks
+        lasts = last_addresses.view("V16")
+    return (
+        numpy.searchsorted(starts, firsts, side="right") - 1,
+        numpy.searchsorted(starts, lasts, side="right") - 1,
+    )
+
+
+def _clean_column(field, version, values):
+    """
+    Cleans a column of network values of one IP version, see clean_networks().
+    """
+    if version == 4:
+        valid, networks, prefixlens = _parse_ipv4_column(values)
+        addresses = networks.tolist()
+    else:
+        valid, networks, prefixlens = _parse_ipv6_column(values)
+        addresses = [
+            high << 64 | low for high, low in zip(networks["high"].tolist(), networks["low"].tolist(), strict=True)
+        ]
+    first_intervals, last_intervals = _get_intervals(version, networks, prefixlens)
+
+    # Outcomes by interval of the classification table, shared by all networks within a single interval. None
+    # for intervals classify_network() checks with the ipaddress module.
+    outcomes = [
+        None if error is _UNKNOWN else ((getattr(field, error),) if error else (), ()) for error in _table(version)[1]
+    ]
+
+    cleaned = []
+    for value, is_valid, network, prefixlen, first_interval, last_interval in zip(
+        values,
+        valid.tolist(),
+        addresses,
+        prefixlens.tolist(),
+        first_intervals.tolist(),
+        last_intervals.tolist(),
+        strict=True,
+    ):
+        if not is_valid:
+            cleaned.append(field.clean(value))
+            continue
+
+        prefix = IPPrefix(version, network, prefixlen)
+        if first_interval == last_interval and outcomes[first_interval] is not None:
+            errors, warnings = outcomes[first_interval]
+        else:
+            error = classify_network(prefix)
+            errors, warnings = ((getattr(field, error),) if error else (), ())
+        # Canonical notation, so the value is its own canonical string
+        cleaned.append((errors, warnings, prefix, value))
+    return cleaned
+
+
+def clean_networks(field, values):
+    """
+    Cleans a column of network values, giving the same results as the clean() method of field.
+
+    Values in canonical IPv4 or IPv6 CIDR notation are parsed and classified against the special-purpose networks
+    as arrays, all other values (other notations, invalid values) are cleaned one by one by field.
+
+    :param field: Network field, supports_field(field) must be true
+    :type field: NetworkField
+    :param values: Values to clean
+    :type values: list of str
+    :returns: Outcome of clean() for each value
+    :rtype: list of tuple
+    """
+    cleaned = [None] * len(values)
+    is_ipv6 = [":" in value for value in values]
+    for version, in_column in ((4, [not flag for flag in is_ipv6]), (6, is_ipv6)):
+        positions = list(itertools.compress(range(len(values)), in_column))
+        if positions:
+            column = _clean_column(field, version, [values[position] for position in positions])
+            for position, outcome in zip(positions, column, strict=True):
+                cleaned[position] = outcome
+    return cleaned
+
+
+def _get_masks(version, prefixlen):
+    import numpy
+
+    # Netmask of the prefix length, split into the halves of _ADDRESS
+    bits = IPV4LENGTH if version == 4 else IPV6LENGTH
+    mask = ((1 << bits) - 1) ^ ((1 << (bits - prefixlen)) - 1)
+    return numpy.uint64(mask >> 64), numpy.uint64(mask & _MASK64)
+
+
+def find_parents(ranges):
+    """
+    Finds the closest enclosing network of each network, like the sweep of
+    BaseValidator._validate_common_network_overlaps.
+
+    Networks are looked up per prefix length: for each prefix length of the feed, the networks of longer
+    prefixes are masked to that length and searched among the networks of that length. Searching the prefix
+    lengths in increasing order leaves each network with its closest enclosing network.
+
+    :param ranges: Address range of each network of the feed, as returned by BaseValidator._get_network_range
+    :type ranges: list of tuple
+    :returns: The ranges sorted, and the position of the range of the closest enclosing network of each sorted
+        range, -1 for networks not contained in another one
+    :rtype: (list of tuple, list of int)
+    """
+    import numpy
+
+    count = len(ranges)
+    versions = numpy.fromiter((r[0] for r in ranges), dtype=numpy.int64, count=count)
+    addresses = numpy.zeros(count, dtype=_ADDRESS)
+    addresses["high"] = numpy.fromiter((r[1] >> 64 for r in ranges), dtype=numpy.uint64, count=count)
+    addresses["low"] = numpy.fromiter((r[1] & _MASK64 for r in ranges), dtype=numpy.uint64, count=count)
+    sizes = numpy.fromiter(((-r[2] - r[1] + 1).bit_length() - 1 for r in ranges), dtype=numpy.int64, count=count)
+    prefixlens = numpy.where(versions == 4, IPV4LENGTH, IPV6LENGTH) - sizes
+
+    # Sorted like the sweep sorts them: enclosing networks before the networks they contain
+    order = numpy.lexsort((prefixlens, addresses["low"], addresses["high"], versions))
+    versions = versions[order]
+    addresses = addresses[order]
+    prefixlens = prefixlens[order]
+    keys = addresses.view("V16")
+
+    parents = numpy.full(count, -1, dtype=numpy.int64)
+    for version, prefixlen in sorted(set(zip(versions.tolist(), prefixlens.tolist(), strict=True))):
+        members = numpy.nonzero((versions == version) & (prefixlens == prefixlen))[0]
+        contained = numpy.nonzero((versions == version) & (prefixlens > prefixlen))[0]
+        if not len(contained):
+            continue
+
+        high_mask, low_mask = _get_masks(version, prefixlen)
+        masked = addresses[contained]
+        masked["high"] &= high_mask
+        masked["low"] &= low_mask
+        # Members are in sorted order already
+        member_keys = keys[members]
+        positions = numpy.searchsorted(member_keys, masked.view("V16"))
+        found = positions < len(members)
+        found[found] = member_keys[positions[found]] == masked.view("V16")[found]
+        parents[contained[found]] = members[positions[found]]
+
+    return [ranges[index] for index in order.tolist()], parents.tolist()
@@ -0,0 +1,153 @@
+# test/test_cache.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+
+
+import os
+import sys
+import tempfile
+import unittest
+
+from geofeed_validator import GeoFeedValidator
+from geofeed_validator.cache import ValidationCache
+from geofeed_validator.result import _UNRESOLVED
+from geofeed_validator.validator import CSVValidatorFinal
+
+__all__ = ["ValidationCacheTestCase"]
+
+FEED = (
+    "# comment\n"
+    "8.8.8.0/24,US,US-CA,Mountain View,\n"
+    "8.8.8.0/24,us,us-ca,Mountain View,\n"
+    "\n"
+    "10.0.0.0/8,XX,AT-1,,\n"
+    "8.8.8.0/25,DE,,,\n"
+    "invalid,AT,,Vienna,\n"
+    "2001:4860::/32,US,US-CA,,,extra\n"
+    "8.8.8.0/24,US,,,\n"
+    "8.8.8.0/24,US,,,\n"
+    "8.8.8.0/24,US,,,\n"
+)
+
+
+def _summary(result):
+    return [
+        (
+            record.record_no,
+            record.was_ignored,
+            record.extra,
+            [(fr.field.name, fr.errors, fr.warnings, fr.raw, fr.value_string, fr.value) for fr in record.field_results],
+        )
+        for record in result.records
+    ]
+
+
+class ValidationCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_0000_same_as_uncached(self):
+        expected = GeoFeedValidator(FEED).validate()
+        for columnar in (False, True):
+            with ValidationCache(self.path) as cache:
+                result = GeoFeedValidator(FEED, columnar=columnar, cache=cache).validate()
+                self.assertEqual(_summary(expected), _summary(result))
+                self.assertEqual(expected.error_count, result.error_count)
+                self.assertEqual(expected.warning_count, result.warning_count)
+
+    def test_0001_hits_and_misses(self):
+        with ValidationCache(self.path) as cache:
+            GeoFeedValidator(FEED, cache=cache).validate()
+            # Comments and empty lines are not cached, the repeated line is a hit.
+            self.assertEqual((2, 7), (cache.hits, cache.misses))
+            self.assertEqual(7, len(cache))
+
+            GeoFeedValidator(FEED, cache=cache).validate()
+            self.assertEqual((11, 7), (cache.hits, cache.misses))
+
+    def test_0002_persistent(self):
+        with ValidationCache(self.path) as cache:
+            GeoFeedValidator(FEED, cache=cache).validate()
+
+        expected = GeoFeedValidator(FEED).validate()
+        with ValidationCache(self.path) as cache:
+            result = GeoFeedValidator(FEED, cache=cache).validate()
+            self.assertEqual((9, 0), (cache.hits, cache.misses))
+            self.assertEqual(_summary(expected), _summary(result))
+
+    def test_0003_keyed_by_validator(self):
+        with ValidationCache(self.path) as cache:
+            self.assertNotEqual(
+                cache.get_key("final", "8.8.8.0/24,US,,,"), cache.get_key("draft02", "8.8.8.0/24,US,,,")
+            )
+            self.assertNotEqual(cache.get_key("final", "8.8.8.0/24,US,,,"), cache.get_key("final", "8.8.8.0/24,DE,,,"))
+
+    def test_0004_eviction(self):
+        with ValidationCache(self.path, max_entries=4) as cache:
+            for feed in ("1.0.0.0/24,US,,,\n2.0.0.0/24,US,,,\n", "1.0.0.0/24,US,,,\n", "3.0.0.0/24,US,,,\n"):
+                CSVValidatorFinal(feed, cache=cache).validate()
+            CSVValidatorFinal("4.0.0.0/24,US,,,\n", cache=cache).validate()
+            self.assertEqual((0, 4), (cache.evictions, len(cache)))
+
+            # The least recently used lines are evicted, down to 90% of max_entries.
+            CSVValidatorFinal("5.0.0.0/24,US,,,\n", cache=cache).validate()
+            self.assertEqual((2, 3), (cache.evictions, len(cache)))
+
+            cache.hits = cache.misses = 0
+            CSVValidatorFinal("1.0.0.0/24,US,,,\n2.0.0.0/24,US,,,\n3.0.0.0/24,US,,,\n", cache=cache).validate()
+            self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_0005_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ValidationCache(self.path, max_entries=0)
+
+        with ValidationCache(self.path) as cache, self.assertRaises(ValueError):
+            GeoFeedValidator.from_path(self.path, processes=2, cache=cache)
+
+    def test_0006_compact_outcomes(self):
+        with ValidationCache(self.path) as cache:
+            GeoFeedValidator(FEED, cache=cache).validate()
+            key = cache.get_key("final", "8.8.8.0/24,US,,,")
+            self.assertEqual(key, cache.get_key("final", "8.8.8.0/24,US,,,"))
+
+        expected = GeoFeedValidator(FEED).validate()
+        with ValidationCache(self.path) as cache:
+            # Lines without findings are stored without an outcome of their fields.
+            row = cache._connection.execute("SELECT outcome FROM outcomes WHERE key = ?", (key,)).fetchone()
+            self.assertEqual(("",), row)
+            # Counted as written, not by counting the entries again
+            self.assertEqual(7, len(cache))
+
+            result = GeoFeedValidator(FEED, cache=cache).validate()
+            # Values of cached lines are only parsed once accessed, not when restoring the outcome.
+            self.assertIs(_UNRESOLVED, result.records[-1].get_field_result("ip_prefix")._value)
+            self.assertEqual(_summary(expected), _summary(result))
+
+    def test_0007_keyed_by_python_version(self):
+        # Networks are classified by the rules of the ipaddress module, which change between Python versions.
+        with ValidationCache(self.path) as cache:
+            self.assertIn("\0{}.{}\0".format(*sys.version_info[:2]).encode(), cache._prefix)
@@ -0,0 +1,154 @@
+# test/test_columnar.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+
+
+import os
+import tempfile
+import unittest
+
+from geofeed_validator import GeoFeedValidator
+from geofeed_validator.columnar import ColumnarValidationResult
+from geofeed_validator.fields import CityField, NetworkField, ZipCodeField
+from geofeed_validator.parallel import validate_file
+from geofeed_validator.validator import CSVValidatorDraft02WithAllocationSize, CSVValidatorFinal
+
+__all__ = ["ColumnarValidationResultTestCase"]
+
+FEED = (
+    "# comment\n"
+    "8.8.8.0/24,US,US-CA,Mountain View,\n"
+    "8.8.8.0/24,us,us-ca,Mountain View,\n"
+    "\n"
+    "10.0.0.0/8,XX,AT-1,,\n"
+    "8.8.8.0/25,DE,,,\n"
+    "invalid,AT,,Vienna,\n"
+    "2001:4860::/32,US,US-CA,,,extra\n"
+    "8.8.8.0/24,US,,,\n"
+)
+
+
+def _summary(result):
+    return (
+        [
+            (
+                record.record_no,
+                record.raw,
+                record.was_ignored,
+                record.extra,
+                record.extra_offset,
+                record.error_count,
+                record.warning_count,
+                record.has_errors,
+                record.has_warnings,
+                [
+                    (fr.field.name, fr.errors, fr.warnings, fr.raw, fr.value_string, fr.value)
+                    for fr in record.field_results
+                ],
+            )
+            for record in result.records
+        ],
+        result.error_count,
+        result.warning_count,
+        result.error_counts_by_field,
+        result.warning_counts_by_message,
+        result.records_raw,
+    )
+
+
+class ColumnarValidationResultTestCase(unittest.TestCase):
+    def test_0000_same_as_validation_result(self):
+        for store_raw_records in (False, True):
+            expected = GeoFeedValidator(FEED, store_raw_records=store_raw_records).validate()
+            result = GeoFeedValidator(FEED, store_raw_records=store_raw_records, columnar=True).validate()
+            self.assertIsInstance(result, ColumnarValidationResult)
+            self.assertEqual(_summary(expected), _summary(result))
+
+        feed = "8.8.8.0/29,,,,,/-1\n8.8.8.0/29,,,,,/29\n2003::/64,,,,,/129\n"
+        expected = CSVValidatorDraft02WithAllocationSize(feed).validate()
+        result = CSVValidatorDraft02WithAllocationSize(feed, columnar=True).validate()
+        self.assertEqual(_summary(expected), _summary(result))
+
+    def test_0001_same_as_validation_result_parallel(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, "w") as fp:
+                fp.write(FEED * 5)
+
+            expected = validate_file(CSVValidatorFinal, path, True, processes=1, chunk_size=100)
+            result = validate_file(CSVValidatorFinal, path, True, processes=2, chunk_size=100, columnar=True)
+            self.assertIsInstance(result, ColumnarValidationResult)
+            self.assertEqual(_summary(expected), _summary(result))
+        finally:
+            os.unlink(path)
+
+    def test_0002_interned_messages(self):
+        result = GeoFeedValidator(FEED, columnar=True).validate()
+
+        code = result.messages.index("Duplicate of line #{}")
+        self.assertEqual(1, result.messages.count("Duplicate of line #{}"))
+        self.assertEqual(2, result.count_findings(code))
+        self.assertEqual(
+            [(2, "ip_prefix", "Duplicate of line #1", True), (8, "ip_prefix", "Duplicate of line #1", True)],
+            [
+                (record_no, field.name, message, is_error)
+                for record_no, field, message, is_error in result.iter_findings(code)
+            ],
+        )
+        self.assertEqual(
+            [result.error_count, result.warning_count],
+            [
+                sum(1 for finding in result.iter_findings() if finding[3]),
+                sum(1 for finding in result.iter_findings() if not finding[3]),
+            ],
+        )
+
+    def test_0003_add_field_warnings_add_field_errors(self):
+        nw_field = NetworkField()
+        city_field = CityField()
+        zipcode_field = ZipCodeField()
+
+        vr = ColumnarValidationResult((nw_field, city_field), store_raw_records=True)
+        vr.add_record({nw_field: "8.8.8.0/24"}, "8.8.8.0/24")
+        vr.add_record({}, "")
+        self.assertEqual(1, vr.error_count)
+
+        for record in vr.records:
+            record.add_field_errors(city_field, ["test_error1", "test_error2"])
+            record.add_field_warnings(zipcode_field, "test_warning {x}")
+
+        self.assertEqual(5, vr.error_count)
+        self.assertEqual(2, vr.warning_count)
+        self.assertEqual(["8.8.8.0/24", ""], vr.records_raw)
+
+        record, ignored = vr.records
+        self.assertEqual(
+            ["Field is missing.", "test_error1", "test_error2"], record.get_field_result(city_field).errors
+        )
+        self.assertEqual(["test_warning {x}"], record.get_field_result("zipcode").warnings)
+        self.assertEqual("8.8.8.0/24", str(record.get_field_value(nw_field)))
+        self.assertTrue(ignored.was_ignored)
+        self.assertIsNone(ignored.get_field_result(nw_field))
+        self.assertEqual(["city", "zipcode"], [fr.field.name for fr in ignored.field_results])
+        self.assertIs(vr.records[-1].get_field_result(zipcode_field).field, zipcode_field)
+        self.assertRaises(IndexError, vr.records.__getitem__, 2)
@@ -28,7 +28,17 @@ from ipaddress import ip_network
 
 import pycountry
 
-from geofeed_validator.fields.base import CityField, CountryField, Field, NetworkField, SubdivisionField, ZipCodeField
+from geofeed_validator.fields import Alpha2CodeField, CityFieldFinal, IPPrefixField, PostalCodeField, RegionField
+from geofeed_validator.fields.base import (
+    DEFAULT_CACHE_SIZE,
+    CityField,
+    CountryField,
+    Field,
+    NetworkField,
+    SubdivisionField,
+    ZipCodeField,
+)
+from geofeed_validator.iso3166 import get_country
 
 __all__ = [
     "FieldTestCase",
@@ -172,6 +182,97 @@ class FieldTestCase(unittest.TestCase):
         test_field = TestField()
         self.assertEqual("test_string", test_field.to_string("test_string"))
 
+    def test_0013_clean(self):
+        class TestField(Field):
+            ERROR = "test_error"
+            NAME = "test_field"
+            WARNING = "test_warning"
+
+            def _check_errors(self, value):
+                return False
+
+            def _check_warnings(self, value):
+                return True
+
+            def to_python(self, value):
+                return value.upper()
+
+        test_field = TestField()
+        self.assertEqual(((), (TestField.WARNING,), "TEST", "TEST"), test_field.clean("test"))
+        self.assertEqual(((), (TestField.WARNING,), None, None), test_field.clean(None))
+
+    def test_0014_clean_parses_once(self):
+        calls = []
+
+        class TestField(NetworkField):
+            def to_python(self, value):
+                calls.append(value)
+                return super().to_python(value)
+
+        self.assertEqual(((), (), ip_network("8.8.8.0/24"), "8.8.8.0/24"), TestField().clean("8.8.8.0/24"))
+        self.assertEqual(["8.8.8.0/24"], calls)
+
+    def test_0015_clean_raw_value_hook_override(self):
+        class TestField(CountryField):
+            def _check_errors(self, value):
+                return value == "AT" or super()._check_errors(value)
+
+            def to_string(self, value):
+                return super().to_string(value).lower()
+
+        test_field = TestField()
+        self.assertEqual(((TestField.ERROR,), (), get_country("AT"), "at"), test_field.clean("AT"))
+        self.assertEqual(((), (), get_country("DE"), "de"), test_field.clean("DE"))
+        self.assertEqual(((TestField.ERROR,), (), None, ""), test_field.clean("XX"))
+
+    def test_0016_clean_cache(self):
+        calls = []
+
+        class TestField(CountryField):
+            CACHE_SIZE = 2
+
+            def to_python(self, value):
+                calls.append(value)
+                return super().to_python(value)
+
+        cache = TestField.get_cache()
+        self.assertEqual(2, cache.max_size)
+        self.assertIsNot(CountryField.get_cache(), cache)
+
+        # Shared by the instances of the class
+        for value in ("AT", "DE", "AT", "XX", "AT"):
+            TestField().clean(value)
+        self.assertEqual(["AT", "DE", "XX"], calls)
+        self.assertEqual(((TestField.ERROR,), (), None, ""), TestField().clean("XX"))
+        self.assertEqual((3, 3, 1), (cache.hits, cache.misses, cache.evictions))
+        self.assertEqual(0.5, cache.hit_rate)
+
+        TestField.set_cache_size(None)
+        self.assertIsNone(TestField.get_cache())
+        TestField().clean("XX")
+        self.assertEqual(["AT", "DE", "XX", "XX"], calls)
+
+    def test_0017_clean_cache_defaults(self):
+        for field_class in (CountryField, SubdivisionField, CityField, Alpha2CodeField, RegionField, CityFieldFinal):
+            self.assertEqual(DEFAULT_CACHE_SIZE, field_class.get_cache().max_size)
+        for field_class in (NetworkField, ZipCodeField, IPPrefixField, PostalCodeField):
+            self.assertIsNone(field_class.get_cache())
+
+    def test_0018_clean_cache_not_inherited(self):
+        class TestField(CountryField):
+            # The outcome depends on the instance, not only on the value.
+            def __init__(self, allowed):
+                super().__init__()
+                self.allowed = allowed
+
+            def _check_errors_parsed(self, value, country):
+                return super()._check_errors_parsed(value, country) or value not in self.allowed
+
+        self.assertIsNone(TestField.CACHE_SIZE)
+        self.assertIsNone(TestField.get_cache())
+        self.assertEqual((), TestField(["AT"]).clean("AT")[0])
+        self.assertEqual((TestField.ERROR,), TestField(["DE"]).clean("AT")[0])
+
 
 class FieldTestCaseMixin:
     FIELD_CLASS = None
@@ -43,3 +43,10 @@ class AllocationSizeFieldTestCase(FieldTestCaseMixin, unittest.TestCase):
 
     def test_0002_empty_string(self):
         self.assertEqual(((), (), ""), self.field.validate(""))
+
+    def test_0003_to_string(self):
+        self.assertEqual("32", self.field.to_string("/32"))
+        self.assertEqual(32, self.field._from_string(self.field.to_string("/32")))
+        self.assertEqual("", self.field.to_string(""))
+        self.assertEqual("", self.field._from_string(self.field.to_string("")))
+        self.assertEqual(None, self.field.to_string("32"))
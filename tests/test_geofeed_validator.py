@@ -23,14 +23,23 @@
 # Stephan Peijnik <speijnik@anexia-it.com>
 #
 
+import gc
 import io
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 
-from geofeed_validator import GeoFeedValidator
-from geofeed_validator.result import ValidationResult
+import geofeed_validator
+from geofeed_validator import IMPORT_TIME_BUDGET, GeoFeedValidator, ReusableValidator, warmup
+from geofeed_validator.cache import ValidationCache
+from geofeed_validator.fields import IPPrefixField
+from geofeed_validator.iso3166 import countries_by_subdivision_code
+from geofeed_validator.result import RecordUpdate, RecordValidationResult, ValidationResult
 from geofeed_validator.validator import BaseValidator, Registry
 
-__all__ = ["GeoFeedValidatorTestCase"]
+__all__ = ["GeoFeedValidatorTestCase", "ReusableValidatorTestCase"]
 
 
 class GeoFeedValidatorTestCase(unittest.TestCase):
@@ -97,3 +106,302 @@ class GeoFeedValidatorTestCase(unittest.TestCase):
         self.assertEqual([], validator.fields)
         validator.validate()
         self.assertEqual(validator._validator.FIELDS, validator.fields)
+
+    def test_0011_iter_results(self):
+        validator = GeoFeedValidator("8.8.8.0/24,US,,,\n8.8.4.0/24,US,,,\n8.8.8.0/24,US,,,\n")
+        items = list(validator.iter_results())
+        self.assertEqual(5, len(items))
+        first, second, third, update, result = items
+
+        self.assertIsInstance(first, RecordValidationResult)
+        self.assertIsInstance(second, RecordValidationResult)
+        self.assertIsInstance(third, RecordValidationResult)
+        self.assertEqual([0, 1, 2], [first.record_no, second.record_no, third.record_no])
+        self.assertEqual(["Duplicate of line #0"], third.get_field_result(IPPrefixField).errors)
+
+        self.assertIsInstance(update, RecordUpdate)
+        self.assertIs(first, update.record)
+        self.assertEqual(0, update.record_no)
+        self.assertEqual(["Duplicate of line #2"], update.errors)
+        self.assertEqual([], list(update.warnings))
+
+        self.assertIsInstance(result, ValidationResult)
+        self.assertIs(result, validator.validate())
+        self.assertEqual([result], list(validator.iter_results()))
+
+    def test_0012_iter_results_resume(self):
+        validator = GeoFeedValidator("8.8.8.0/24,US,,,\n8.8.4.0/24,US,,,\n")
+        for item in validator.iter_results():
+            self.assertEqual(0, item.record_no)
+            break
+
+        result = validator.validate()
+        self.assertEqual(2, len(result.records))
+        self.assertEqual([1], [r.record_no for r in result.records[1:]])
+
+    def test_0013_from_path(self):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.unlink, path)
+        with os.fdopen(fd, "w") as fp:
+            fp.write("8.8.8.0/24,US,,,\r\n# comment\r\n8.8.8.0/24,XX,,,\r\n")
+
+        validator = GeoFeedValidator.from_path(path, store_raw_records=True)
+        result = validator.validate()
+        self.assertTrue(validator._feed.closed)
+        self.assertEqual(["8.8.8.0/24,US,,,", "# comment", "8.8.8.0/24,XX,,,"], result.records_raw)
+        self.assertEqual(["Duplicate of line #2"], result.records[0].get_field_result(IPPrefixField).errors)
+        self.assertEqual(2, result.error_count)
+        self.assertEqual(1, result.warning_count)
+
+    def test_0014_from_path_line_breaks(self):
+        content = "8.8.8.0/24,US,,,\r8.8.4.0/24,US,,,\r\n# comment\r\r8.8.8.0/24,XX,,,\n1.1.1.0/24,AT,,,\r"
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.unlink, path)
+        with os.fdopen(fd, "w", newline="") as fp:
+            fp.write(content)
+
+        def summary(result):
+            return [(r.record_no, r.raw, r.error_count, r.warning_count) for r in result.records]
+
+        expected = summary(GeoFeedValidator(content, store_raw_records=True).validate())
+        self.assertEqual(6, len(expected))
+        self.assertEqual(summary(GeoFeedValidator.from_path(path, store_raw_records=True).validate()), expected)
+        with open(path) as fp:
+            self.assertEqual(summary(GeoFeedValidator(fp, store_raw_records=True, processes=2).validate()), expected)
+
+    def test_0015_from_path_missing(self):
+        self.assertRaises(OSError, GeoFeedValidator.from_path, "/nonexistent/feed.csv")
+
+    def test_0016_problems_only(self):
+        feed = "8.8.8.0/24,US,,,\n8.8.4.0/24,US,,,\n# comment\n8.8.8.0/25,US,,,\n1.1.1.0/24,XX,,,\n1.0.0.0/24,AT,,,\n"
+        expected = GeoFeedValidator(feed, store_raw_records=True).validate()
+        result = GeoFeedValidator(feed, store_raw_records=True, problems_only=True).validate()
+
+        # The contained network only gets its finding from the whole-feed checks and is retained after all.
+        self.assertEqual([3, 4], [record.record_no for record in result.records])
+        self.assertEqual(
+            [
+                (r.record_no, r.raw, [(fr.errors, fr.warnings, fr.value) for fr in r.field_results])
+                for r in result.records
+            ],
+            [
+                (r.record_no, r.raw, [(fr.errors, fr.warnings, fr.value) for fr in r.field_results])
+                for r in expected.records
+                if r.has_errors or r.has_warnings
+            ],
+        )
+        self.assertEqual(6, result.record_count)
+        self.assertEqual(expected.error_count, result.error_count)
+        self.assertEqual(expected.warning_count, result.warning_count)
+        self.assertEqual(["8.8.8.0/25,US,,,", "1.1.1.0/24,XX,,,"], result.records_raw)
+        self.assertRaises(ValueError, GeoFeedValidator, feed, problems_only=True, columnar=True)
+
+    def test_0017_problems_only_releases_clean_records(self):
+        def live_records(lines):
+            # Clean records, all networks distinct, with a duplicate of the first one at the end
+            feed = "".join(f"45.{index // 256}.{index % 256}.0/24,AT,AT-9,Vienna,\n" for index in range(lines))
+            feed += "45.0.0.0/24,AT,AT-9,Vienna,\n"
+            results = GeoFeedValidator(feed, store_raw_records=True, problems_only=True).iter_results()
+            for item in results:
+                if isinstance(item, RecordUpdate):
+                    # All records have been read, the whole-feed checks just started.
+                    gc.collect()
+                    count = sum(isinstance(o, RecordValidationResult) for o in gc.get_objects())
+                    result = list(results)[-1]
+                    return count, item.record, result
+
+        count = live_records(1000)[0]
+        self.assertEqual(count, live_records(2000)[0])
+        self.assertLess(count, 10)
+        _, first, result = live_records(1000)
+
+        # The first record of the duplicate network is restored to add the duplicate's error to it.
+        self.assertEqual([0, 1000], [record.record_no for record in result.records])
+        self.assertIs(first, result.records[0])
+        self.assertEqual("45.0.0.0/24,AT,AT-9,Vienna,", first.raw)
+        self.assertEqual(["Duplicate of line #1000"], first.get_field_result("ip_prefix").errors)
+        location = [first.get_field_result(name).value_string for name in ("alpha2code", "region", "city")]
+        self.assertEqual(["AT", "AT-9", "Vienna"], location)
+
+    def test_0018_max_errors(self):
+        feed = "8.8.8.0/24,US,,,\n8.8.8.0/24,US,,,\ninvalid,US,,,\n1.1.1.0/24,XX,,,\n8.8.4.0/24,US,,,\n"
+
+        result = GeoFeedValidator(feed, max_errors=1).validate()
+        self.assertTrue(result.truncated)
+        self.assertFalse(result.is_valid(allow_warnings=True))
+        self.assertEqual(2, result.record_count)
+        # The whole-feed checks are skipped, so the first record is not reported as duplicate.
+        self.assertEqual(
+            [[], ["Duplicate of line #0"]], [r.get_field_result("ip_prefix").errors for r in result.records]
+        )
+
+        result = GeoFeedValidator(feed, max_errors=3, max_warnings=1).validate()
+        self.assertTrue(result.truncated)
+        self.assertEqual((2, 1, 4), (result.error_count, result.warning_count, result.record_count))
+
+        result = GeoFeedValidator(feed, max_errors=5).validate()
+        self.assertFalse(result.truncated)
+        self.assertEqual(5, result.record_count)
+
+        # Rejected right away, not once validation starts
+        for budget in (0, -1, "1"):
+            self.assertRaises(ValueError, GeoFeedValidator, feed, max_errors=budget)
+            self.assertRaises(ValueError, GeoFeedValidator, feed, max_warnings=budget)
+        for processes in (0, -1, 1.5):
+            self.assertRaises(ValueError, GeoFeedValidator, feed, processes=processes)
+
+    def test_0019_time_budget(self):
+        feed = "8.8.8.0/24,US,,,\n8.8.8.0/24,US,,,\ninvalid,US,,,\n8.8.8.0/25,XX,,,\n"
+        expected = GeoFeedValidator(feed).validate()
+
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.unlink, path)
+        with os.fdopen(fd, "w") as fp:
+            fp.write(feed)
+
+        validator = GeoFeedValidator.from_path(path)
+        # No time at all, each call pauses after a single record or finding.
+        result = validator.validate(time_budget=0)
+        self.assertTrue(result.paused)
+        self.assertFalse(result.is_valid(allow_warnings=True))
+        self.assertEqual((1, 17), (result.record_count, result.offset))
+
+        calls = 1
+        while result.paused:
+            self.assertIs(result, validator.validate(time_budget=0))
+            calls += 1
+        # 4 records, a duplicate and a containment update, the last call finishes
+        self.assertEqual(7, calls)
+        self.assertIsNone(result.offset)
+        self.assertEqual(expected.error_count, result.error_count)
+        self.assertEqual(expected.warning_count, result.warning_count)
+        self.assertIs(result, validator.validate())
+
+    def _run_import(self, *options, env=None):
+        # In a fresh interpreter, this one has imported everything already.
+        path = os.path.dirname(os.path.dirname(geofeed_validator.__file__))
+        env = dict(env or os.environ, PYTHONPATH=os.pathsep.join(filter(None, [path, os.environ.get("PYTHONPATH")])))
+        code = "import sys, geofeed_validator; print(' '.join(sys.modules))"
+        return subprocess.run(
+            [sys.executable, *options, "-c", code], env=env, capture_output=True, text=True, check=True
+        )
+
+    def test_0020_lazy_imports(self):
+        modules = self._run_import().stdout.split()
+        self.assertIn("geofeed_validator", modules)
+        for module in ("pycountry", "numpy", "importlib.metadata", "multiprocessing", "urllib.request"):
+            self.assertNotIn(module, modules)
+
+    @unittest.skipUnless(
+        os.environ.get("GEOFEED_VALIDATOR_BENCHMARKS"),
+        "Timing depends on the machine, GEOFEED_VALIDATOR_BENCHMARKS not set",
+    )
+    def test_0021_import_time_budget(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPYCACHEPREFIX=directory, PYTHONDONTWRITEBYTECODE="")
+            # The first import compiles the package, the budget applies to importing it from bytecode.
+            self._run_import(env=env)
+            times = []
+            for _ in range(3):
+                stderr = self._run_import("-X", "importtime", env=env).stderr
+                (line,) = [line for line in stderr.splitlines() if line.endswith("| geofeed_validator")]
+                times.append(int(line.split("|")[1]) / 1e6)
+        self.assertLess(min(times), IMPORT_TIME_BUDGET)
+
+    def test_0022_warmup(self):
+        warmup()
+        self.assertEqual(1, countries_by_subdivision_code.cache_info().currsize)
+        warmup(engine="numpy")
+
+    def test_0023_version(self):
+        # Cache keys and feed indexes depend on the version, it has to change along with the validation output.
+        with open(os.path.join(os.path.dirname(__file__), os.pardir, "pyproject.toml")) as fp:
+            self.assertIn(f'\nversion = "{geofeed_validator.__version__}"\n', fp.read())
+
+    def test_0024_same_values_in_all_modes(self):
+        content = "8.8.8.0/24,AT,,,,/x\n8.8.9.0/24,AT,,,,/24\n10.0.0.0/24,AT,,,,\n8.8.10.0/24,XX,,,,/33\n"
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.unlink, path)
+        with os.fdopen(fd, "w") as fp:
+            fp.write(content)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        def values(result):
+            return [(r.record_no, [(fr.field.name, fr.value) for fr in r.field_results]) for r in result.records]
+
+        expected = values(GeoFeedValidator(content, validator="draft02-allocationsize").validate())
+        self.assertIsNone(dict(expected[0][1])["allocation_size"])
+        for options in ({"columnar": True}, {"problems_only": True}, {"processes": 2}):
+            with self.subTest(**options):
+                result = GeoFeedValidator.from_path(path, validator="draft02-allocationsize", **options).validate()
+                self.assertEqual(values(result), expected)
+        for _ in range(2):
+            with ValidationCache(os.path.join(directory.name, "cache.sqlite")) as cache:
+                result = GeoFeedValidator(content, validator="draft02-allocationsize", cache=cache).validate()
+                self.assertEqual(values(result), expected)
+
+    def test_0025_invalid_options(self):
+        validator_class = Registry.find(GeoFeedValidator.DEFAULT_VALIDATOR)
+        for options in (
+            {"max_errors": 0},
+            {"max_warnings": "1"},
+            {"problems_only": True, "columnar": True},
+            {"engine": "fortran"},
+            {"engine": "numpy", "cache": object()},
+        ):
+            with self.subTest(**options):
+                messages = []
+                for constructor, args in ((GeoFeedValidator, ("",)), (ReusableValidator, ()), (validator_class, ("",))):
+                    with self.assertRaises(ValueError) as context:
+                        constructor(*args, **options)
+                    messages.append(str(context.exception))
+                self.assertEqual(1, len(set(messages)), messages)
+
+
+class ReusableValidatorTestCase(unittest.TestCase):
+    FEEDS = [
+        "",
+        "8.8.8.0/24,US,US-CA,Mountain View,\n",
+        "8.8.8.0/24,US,,,\n8.8.0.0/16,US,,,\n8.8.8.0/24,DE,,,\n",
+        "# comment\n10.0.0.0/8,XX,AT-9,,\ninvalid\n",
+    ]
+
+    def test_0000_init(self):
+        self.assertIs(Registry.find(GeoFeedValidator.DEFAULT_VALIDATOR), ReusableValidator().validator)
+        self.assertIs(Registry.find("draft02"), ReusableValidator("draft02").validator)
+        self.assertRaises(KeyError, ReusableValidator, "INVALID")
+        self.assertRaises(ValueError, ReusableValidator, 1)
+        self.assertRaises(ValueError, ReusableValidator, max_errors=0)
+        self.assertRaises(ValueError, ReusableValidator, problems_only=True, columnar=True)
+        self.assertRaises(ValueError, ReusableValidator, engine="fortran")
+        self.assertRaises(ValueError, ReusableValidator, engine="numpy", cache=object())
+
+    def test_0001_validate(self):
+        for name in ("final", "draft02"):
+            validator = ReusableValidator(name, store_raw_records=True)
+            # Twice, as results must not depend on the feeds validated before
+            for feed in self.FEEDS + self.FEEDS:
+                with self.subTest(validator=name, feed=feed):
+                    expected = GeoFeedValidator(feed, name, store_raw_records=True).validate()
+                    result = validator.validate(io.StringIO(feed))
+                    self.assertEqual(expected.error_count, result.error_count)
+                    self.assertEqual(expected.warning_count, result.warning_count)
+                    self.assertEqual(
+                        [(r.record_no, r.raw, r.error_count, r.warning_count) for r in expected.records],
+                        [(r.record_no, r.raw, r.error_count, r.warning_count) for r in result.records],
+                    )
+                    self.assertEqual(expected.is_valid(), validator.is_valid(feed))
+
+    def test_0002_options(self):
+        validator = ReusableValidator(problems_only=True, max_errors=1)
+        result = validator.validate(self.FEEDS[2])
+        self.assertTrue(result.truncated)
+        self.assertEqual(1, result.error_count)
+        self.assertFalse(validator.validate(self.FEEDS[1]).truncated)
+
+    def test_0003_iter_results(self):
+        items = list(ReusableValidator().iter_results(self.FEEDS[2]))
+        self.assertIsInstance(items[-1], ValidationResult)
+        self.assertEqual(3, len([item for item in items if isinstance(item, RecordValidationResult)]))
+        self.assertEqual(3, len([item for item in items if isinstance(item, RecordUpdate)]))
@@ -0,0 +1,292 @@
+# test/test_incremental.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+
+
+import os
+import tempfile
+import unittest
+
+from geofeed_validator import GeoFeedValidator, Registry
+from geofeed_validator.incremental import EditableFeed, FeedIndex
+
+__all__ = ["FeedIndexTestCase", "EditableFeedTestCase"]
+
+LINES = [
+    "# comment",
+    "10.0.0.0/8,AT,AT-9,Vienna,",
+    "10.1.0.0/16,AT,AT-9,Vienna,",
+    "",
+    "10.2.0.0/16,DE,,,",
+    "8.8.8.0/24,US,US-CA,Mountain View,",
+    "invalid,AT,,Vienna,",
+    "2001:db8::/32,XX,,,",
+    "2001:db8:1::/48,US,,,",
+]
+
+
+def _feed(lines):
+    return "\n".join(lines) + "\n"
+
+
+def _full(lines, validator="final"):
+    result = GeoFeedValidator(_feed(lines), validator=validator, store_raw_records=True).validate()
+    problems = sorted(
+        (record.record_no, field_result.field.name, message, is_error)
+        for record in result.records
+        for field_result in record.field_results
+        for is_error, messages in ((True, field_result.errors), (False, field_result.warnings))
+        for message in messages
+    )
+    return result, problems
+
+
+def _problems(problems):
+    return sorted((p.record_no, p.field_name, p.message, p.is_error) for p in problems)
+
+
+class FeedIndexTestCase(unittest.TestCase):
+    def assert_matches_full_validation(self, index, lines, validator="final"):
+        result, problems = _full(lines, validator)
+        self.assertEqual(problems, _problems(index.iter_problems()))
+        self.assertEqual(result.error_count, index.error_count)
+        self.assertEqual(result.warning_count, index.warning_count)
+        self.assertEqual(len(lines), index.record_count)
+
+    def test_0000_update_matches_full_validation(self):
+        for validator in ("final", "draft02"):
+            with self.subTest(validator=validator):
+                index = FeedIndex(validator)
+                lines = list(LINES)
+                diff = index.update(_feed(lines))
+                self.assertIs(index, diff.index)
+                self.assertEqual(list(range(len(lines))), diff.inserted)
+                self.assertEqual([], diff.resolved)
+                self.assertEqual(_full(lines, validator)[1], _problems(diff.introduced))
+                self.assert_matches_full_validation(index, lines, validator)
+
+                edits = (
+                    lambda ls: ls.insert(2, "10.1.2.0/24,AT,AT-9,Graz,"),
+                    lambda ls: ls.append("8.8.8.0/24,US,,,"),
+                    lambda ls: ls.remove("10.0.0.0/8,AT,AT-9,Vienna,"),
+                    lambda ls: ls.__setitem__(4, "2001:db8::/32,AT,,,"),
+                    lambda ls: ls.insert(0, ls.pop()),
+                    lambda ls: ls.clear(),
+                )
+                for edit in edits:
+                    edit(lines)
+                    index.update(_feed(lines) if lines else "")
+                    self.assert_matches_full_validation(index, lines, validator)
+
+    def test_0001_duplicates(self):
+        index = FeedIndex("final")
+        lines = list(LINES)
+        index.update(_feed(lines))
+
+        lines.append("8.8.8.0/24,US,,,")
+        diff = index.update(_feed(lines))
+        self.assertEqual([9], diff.inserted)
+        self.assertEqual([], diff.removed)
+        self.assertEqual(
+            [
+                (5, "ip_prefix", "Duplicate of line #9", True),
+                (9, "ip_prefix", "Duplicate of line #5", True),
+            ],
+            _problems(diff.introduced),
+        )
+        self.assertEqual([], diff.resolved)
+
+        del lines[9]
+        diff = index.update(_feed(lines))
+        self.assertEqual([], diff.inserted)
+        self.assertEqual([9], diff.removed)
+        self.assertEqual([], diff.introduced)
+        self.assertEqual(
+            [
+                (5, "ip_prefix", "Duplicate of line #9", True),
+                (9, "ip_prefix", "Duplicate of line #5", True),
+            ],
+            _problems(diff.resolved),
+        )
+
+    def test_0002_containment(self):
+        index = FeedIndex("final")
+        lines = list(LINES)
+        index.update(_feed(lines))
+
+        # Both /16 networks move from the /8 to the new /12, which has the location of the second one.
+        lines.insert(2, "10.0.0.0/12,DE,,,")
+        diff = index.update(_feed(lines))
+        self.assertEqual(
+            [
+                (2, "ip_prefix", "Contained in line #1 with a different location", False),
+                (2, "ip_prefix", "Private IP prefix not allowed", True),
+                (3, "ip_prefix", "Contained in line #2 with a different location", False),
+                (5, "ip_prefix", "Contained in line #2", False),
+            ],
+            _problems(diff.introduced),
+        )
+        self.assertEqual(
+            [
+                (2, "ip_prefix", "Contained in line #1", False),
+                (4, "ip_prefix", "Contained in line #1 with a different location", False),
+            ],
+            _problems(diff.resolved),
+        )
+        self.assert_matches_full_validation(index, lines)
+
+    def test_0003_moved_lines(self):
+        index = FeedIndex("final")
+        lines = list(LINES)
+        index.update(_feed(lines))
+
+        # Problems are compared by content, moving lines and their references around changes nothing.
+        lines.reverse()
+        diff = index.update(_feed(lines))
+        self.assertEqual([], diff.introduced)
+        self.assertEqual([], diff.resolved)
+        self.assert_matches_full_validation(index, lines)
+
+        diff = index.update(_feed(lines))
+        self.assertEqual(([], [], [], []), (diff.inserted, diff.removed, diff.introduced, diff.resolved))
+
+    def test_0004_save_load(self):
+        index = FeedIndex("draft02")
+        lines = list(LINES)
+        index.update(_feed(lines))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.json")
+            index.save(path)
+            loaded = FeedIndex.load(path)
+
+        self.assertIs(index.validator, loaded.validator)
+        self.assertEqual(_problems(index.iter_problems()), _problems(loaded.iter_problems()))
+        lines.insert(3, "10.1.2.0/24,AT,AT-9,Vienna,")
+        loaded.update(_feed(lines))
+        self.assert_matches_full_validation(loaded, lines, "draft02")
+
+    def test_0005_from_result(self):
+        result, _ = _full(LINES)
+        index = FeedIndex.from_result(result, "final")
+        self.assert_matches_full_validation(index, LINES)
+
+        lines = [*LINES, "10.0.0.0/8,AT,,,"]
+        diff = index.update(_feed(lines))
+        self.assertEqual([9], diff.inserted)
+        self.assert_matches_full_validation(index, lines)
+
+        without_raw = GeoFeedValidator(_feed(LINES)).validate()
+        with self.assertRaises(ValueError):
+            FeedIndex.from_result(without_raw, "final")
+
+        problems_only = GeoFeedValidator(_feed(LINES), store_raw_records=True, problems_only=True).validate()
+        with self.assertRaises(ValueError):
+            FeedIndex.from_result(problems_only, "final")
+
+    def test_0006_revalidate(self):
+        diff = GeoFeedValidator(_feed(LINES)).revalidate()
+        self.assert_matches_full_validation(diff.index, LINES)
+
+        lines = [*LINES, "8.8.8.0/24,US,,,"]
+        index = diff.index
+        diff = GeoFeedValidator(_feed(lines)).revalidate(index)
+        self.assertIs(index, diff.index)
+        self.assertEqual(2, len(diff.introduced))
+        self.assert_matches_full_validation(index, lines)
+
+        result, _ = _full(LINES)
+        diff = GeoFeedValidator(_feed(lines)).revalidate(result)
+        self.assertEqual(2, len(diff.introduced))
+
+        with self.assertRaises(ValueError):
+            GeoFeedValidator(_feed(lines), validator="draft02").revalidate(index)
+
+
+class EditableFeedTestCase(unittest.TestCase):
+    def assert_matches_full_validation(self, feed, lines, validator="final"):
+        self.assertEqual(lines, list(feed))
+        result, problems = _full(lines, validator)
+        self.assertEqual(problems, _problems(feed.iter_problems()))
+        self.assertEqual(result.error_count, feed.error_count)
+        self.assertEqual(result.warning_count, feed.warning_count)
+        self.assertEqual(result.is_valid(), feed.is_valid())
+
+    def test_0000_edits_match_full_validation(self):
+        for validator in ("final", "draft02"):
+            with self.subTest(validator=validator):
+                lines = list(LINES)
+                feed = EditableFeed(validator, _feed(lines))
+                self.assert_matches_full_validation(feed, lines, validator)
+
+                edits = (
+                    lambda ls: ls.insert(2, "10.1.2.0/24,AT,AT-9,Graz,"),
+                    lambda ls: ls.append("8.8.8.0/24,US,,,"),
+                    lambda ls: ls.insert(-1, "8.8.8.0/24,US,,,"),
+                    lambda ls: ls.remove("10.0.0.0/8,AT,AT-9,Vienna,"),
+                    lambda ls: ls.__setitem__(4, "2001:db8::/32,AT,,,"),
+                    lambda ls: ls.__delitem__(-1),
+                    lambda ls: ls.insert(0, ls.pop()),
+                    lambda ls: ls.insert(100, "10.0.0.0/8,AT,,,"),
+                    lambda ls: ls.clear(),
+                )
+                for edit in edits:
+                    edit(lines)
+                    edit(feed)
+                    self.assert_matches_full_validation(feed, lines, validator)
+
+    def test_0001_problems(self):
+        feed = EditableFeed("final", _feed(LINES))
+        self.assertEqual(
+            [(2, "ip_prefix", "Contained in line #1", False), (2, "ip_prefix", "Private IP prefix not allowed", True)],
+            _problems(feed.get_problems(2)),
+        )
+        self.assertEqual([], feed.get_problems(0))
+
+        # Referenced record numbers follow the edits.
+        feed.insert(0, "# header")
+        self.assertEqual(
+            [(3, "ip_prefix", "Contained in line #2", False), (3, "ip_prefix", "Private IP prefix not allowed", True)],
+            _problems(feed.get_problems(3)),
+        )
+
+        feed.append("8.8.8.0/24,US,,,")
+        self.assertEqual([(10, "ip_prefix", "Duplicate of line #6", True)], _problems(feed.get_problems(-1)))
+        self.assertEqual([(6, "ip_prefix", "Duplicate of line #10", True)], _problems(feed.get_problems(6)))
+
+    def test_0002_errors(self):
+        feed = EditableFeed("final", _feed(LINES))
+        with self.assertRaises(IndexError):
+            feed[len(LINES)]
+        with self.assertRaises(IndexError):
+            del feed[-len(LINES) - 1]
+        with self.assertRaises(TypeError):
+            feed["1"] = "8.8.8.0/24,US,,,"
+        with self.assertRaises(ValueError):
+            feed.append("8.8.8.0/24,US,,,\n8.8.4.0/24,US,,,")
+
+    def test_0003_edit(self):
+        feed = GeoFeedValidator(_feed(LINES), validator="draft02").edit()
+        self.assertIsInstance(feed, EditableFeed)
+        self.assertEqual(Registry.find("draft02"), feed.validator)
+        self.assert_matches_full_validation(feed, LINES, "draft02")
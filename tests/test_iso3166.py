@@ -0,0 +1,168 @@
+# test/test_iso3166.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import pycountry
+
+import geofeed_validator
+from geofeed_validator.iso3166 import (
+    SNAPSHOT_PATH,
+    Country,
+    Subdivision,
+    countries_by_alpha_2,
+    get_country,
+    get_data,
+    get_subdivision,
+    get_subdivision_country,
+    read_pycountry,
+    read_snapshot,
+    subdivisions_by_code,
+    to_pycountry,
+    write_snapshot,
+)
+
+__all__ = ["ISO3166TestCase", "SnapshotTestCase"]
+
+
+class ISO3166TestCase(unittest.TestCase):
+    def test_0000_tables_complete(self):
+        _, alpha_2_codes, subdivisions = get_data()
+        self.assertEqual(len(alpha_2_codes), len(countries_by_alpha_2()))
+        self.assertEqual(len(subdivisions), len(subdivisions_by_code()))
+
+    def test_0001_tables_shared_and_read_only(self):
+        self.assertIs(countries_by_alpha_2(), countries_by_alpha_2())
+        with self.assertRaises(TypeError):
+            countries_by_alpha_2()["XX"] = None
+
+    def test_0002_get_country(self):
+        country = get_country("AT")
+        self.assertIsInstance(country, Country)
+        self.assertEqual("AT", country.alpha_2)
+        self.assertIs(country, get_country("aT"))
+        self.assertEqual(None, get_country("XX"))
+        self.assertEqual(None, get_country("AUT"))
+
+    def test_0003_get_subdivision(self):
+        subdivision = get_subdivision("AT-1")
+        self.assertIsInstance(subdivision, Subdivision)
+        self.assertEqual(("AT-1", "AT"), (subdivision.code, subdivision.country_code))
+        self.assertIs(subdivision, get_subdivision("at-1"))
+        self.assertEqual(None, get_subdivision("INVALID"))
+
+    def test_0004_get_subdivision_country(self):
+        self.assertIs(get_country("AT"), get_subdivision_country(get_subdivision("AT-1")))
+        self.assertIs(get_country("US"), get_subdivision_country(get_subdivision("US-CA")))
+
+    def test_0005_pycountry_attributes(self):
+        self.assertEqual("Austria", get_country("AT").name)
+        self.assertEqual("AUT", get_country("AT").alpha_3)
+        self.assertEqual("Wien", get_subdivision("AT-9").name)
+        self.assertRaises(AttributeError, getattr, get_country("AT"), "invalid")
+        self.assertRaises(AttributeError, getattr, Country("XX"), "name")
+
+    def test_0006_pickle(self):
+        for value in (get_country("AT"), get_subdivision("AT-9")):
+            self.assertIs(value, pickle.loads(pickle.dumps(value)))
+
+    def test_0007_to_pycountry(self):
+        self.assertIs(pycountry.countries.get(alpha_2="AT"), to_pycountry(get_country("AT")))
+        self.assertIs(pycountry.subdivisions.get(code="AT-9"), to_pycountry(get_subdivision("AT-9")))
+        country = Country("XX")
+        self.assertIs(country, to_pycountry(country))
+        self.assertEqual("Vienna", to_pycountry("Vienna"))
+        self.assertIsNone(to_pycountry(None))
+
+    def test_0008_public_values(self):
+        # Values are validated with the snapshot, but returned as pycountry objects.
+        expected = (pycountry.countries.get(alpha_2="AT"), pycountry.subdivisions.get(code="AT-9"))
+        for columnar in (False, True):
+            result = geofeed_validator.GeoFeedValidator("8.8.8.0/24,AT,AT-9,,", columnar=columnar).validate()
+            record = result.records[0]
+            self.assertEqual(expected, (record.get_field_value("alpha2code"), record.get_field_value("region")))
+            self.assertEqual(expected, tuple(fr.value for fr in record.field_results[1:3]))
+            self.assertIsInstance(record.get_field_value("alpha2code"), pycountry.db.Country)
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def test_0000_write_read(self):
+        data = ("1.0", ["DE", "AT"], [("DE-BY", "DE"), ("AT-9", "AT"), ("XK-1", "XK")])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "iso3166.bin")
+            write_snapshot(path, data)
+            self.assertEqual(
+                ("1.0", ["AT", "DE"], [("AT-9", "AT"), ("DE-BY", "DE"), ("XK-1", "XK")]), read_snapshot(path)
+            )
+
+            write_snapshot(path, ("", [], []))
+            self.assertEqual(("", [], []), read_snapshot(path))
+
+    def test_0001_invalid(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "iso3166.bin")
+            with self.assertRaises(OSError):
+                read_snapshot(path)
+
+            for content in (b"", b"GFV3166", b"invalid snapshot file"):
+                with open(path, "wb") as fp:
+                    fp.write(content)
+                self.assertRaises(ValueError, read_snapshot, path)
+
+            write_snapshot(path, ("1.0", ["AT"], [("AT-9", "AT")]))
+            with open(path, "rb") as fp:
+                content = fp.read()
+            with open(path, "wb") as fp:
+                fp.write(content[:-1])
+            self.assertRaises(ValueError, read_snapshot, path)
+
+    def test_0002_bundled(self):
+        version, alpha_2_codes, subdivisions = read_snapshot(SNAPSHOT_PATH)
+        self.assertEqual((version, alpha_2_codes, subdivisions), get_data())
+        self.assertIn("AT", alpha_2_codes)
+        self.assertIn(("AT-9", "AT"), subdivisions)
+
+    def test_0003_in_sync_with_pycountry(self):
+        data = read_pycountry()
+        if data[0] != get_data()[0]:
+            self.skipTest(f"Snapshot of pycountry {get_data()[0]}, pycountry {data[0]} installed")
+        self.assertEqual(data, get_data())
+
+    def test_0004_pycountry_not_loaded(self):
+        # In a fresh interpreter, as the tests of this process have loaded pycountry already
+        path = os.path.dirname(os.path.dirname(geofeed_validator.__file__))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [path, os.environ.get("PYTHONPATH")])))
+        code = (
+            "import sys, geofeed_validator; "
+            "geofeed_validator.GeoFeedValidator('8.8.8.0/24,US,US-CA,Mountain View,').validate(); "
+            "print(' '.join(sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        self.assertNotIn("pycountry", result.stdout.split())
@@ -0,0 +1,171 @@
+# test/test_parallel.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+import io
+import os
+import tempfile
+import unittest
+
+from geofeed_validator import GeoFeedValidator
+from geofeed_validator.parallel import _validate_chunk, split_file, validate_file
+from geofeed_validator.result import _UNRESOLVED, RecordUpdate
+from geofeed_validator.validator import CSVValidatorDraft02WithAllocationSize, CSVValidatorFinal
+
+__all__ = ["ParallelValidationTestCase", "SplitFileTestCase"]
+
+FEED = (
+    "# comment\r\n"
+    "8.8.8.0/24,US,US-CA,Mountain View,\r\n"
+    "8.8.4.0/24,US,,,\r\n"
+    "\r\n"
+    "10.0.0.0/8,AT,AT-1,,\r\n"
+    "8.8.8.0/24,DE,AT-1,,\r\n"
+    "invalid,XX,,Vienna,\r\n"
+    "2001:4860::/32,US,US-CA,,,extra\r\n"
+    "8.8.4.0/24,US,,,\r\n"
+    "invalid,,,,\r\n"
+    "8.8.8.0/24,US,,,\r\n"
+) * 7
+
+
+def _summary(result):
+    return [
+        (
+            record.record_no,
+            record.raw,
+            record.was_ignored,
+            record.extra,
+            [(fr.field.name, fr.errors, fr.warnings, fr.raw, fr.value_string, fr.value) for fr in record.field_results],
+        )
+        for record in result.records
+    ]
+
+
+class SplitFileTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(b"aaaa\nbb\n\nccccccc\nd")
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_0000_newline_aligned(self):
+        self.assertEqual([(0, 5), (5, 8), (8, 9), (9, 17), (17, 18)], split_file(self.path, 1))
+        self.assertEqual([(0, 8), (8, 17), (17, 18)], split_file(self.path, 6))
+        self.assertEqual([(0, 18)], split_file(self.path, 100))
+
+    def test_0001_invalid_chunk_size(self):
+        self.assertRaises(ValueError, split_file, self.path, 0)
+
+    def test_0002_empty_file(self):
+        with open(self.path, "wb"):
+            pass
+        self.assertEqual([], split_file(self.path, 10))
+
+
+class ParallelValidationTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(FEED.encode())
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def _serial(self, validator_class, store_raw_records):
+        with open(self.path) as fp:
+            return validator_class(fp, store_raw_records=store_raw_records).validate()
+
+    def test_0000_same_as_serial(self):
+        for store_raw_records in (False, True):
+            serial = self._serial(CSVValidatorFinal, store_raw_records)
+            for processes in (1, 3):
+                parallel = validate_file(
+                    CSVValidatorFinal, self.path, store_raw_records, processes=processes, chunk_size=100
+                )
+                self.assertEqual(_summary(serial), _summary(parallel))
+                self.assertEqual(serial.error_count, parallel.error_count)
+                self.assertEqual(serial.warning_count, parallel.warning_count)
+                self.assertEqual(serial.records_raw, parallel.records_raw)
+
+    def test_0001_same_as_serial_extension(self):
+        with open(self.path, "w") as fp:
+            fp.write("8.8.8.0/29,,,,,/-1\n8.8.8.0/29,,,,,/29\n2003::/64,,,,,/129\n8.8.10.0/29,,,,,/24\n" * 5)
+
+        serial = self._serial(CSVValidatorDraft02WithAllocationSize, True)
+        parallel = validate_file(CSVValidatorDraft02WithAllocationSize, self.path, True, processes=2, chunk_size=50)
+        self.assertEqual(_summary(serial), _summary(parallel))
+
+    def test_0002_geofeed_validator(self):
+        with open(self.path) as fp:
+            serial = list(GeoFeedValidator(fp).iter_results())
+        with open(self.path) as fp:
+            parallel = list(GeoFeedValidator(fp, processes=2).iter_results())
+
+        self.assertEqual(len(serial), len(parallel))
+        for serial_item, parallel_item in zip(serial, parallel, strict=True):
+            self.assertIs(type(serial_item), type(parallel_item))
+            if isinstance(serial_item, RecordUpdate):
+                self.assertEqual(serial_item.record_no, parallel_item.record_no)
+                self.assertEqual(serial_item.errors, parallel_item.errors)
+        self.assertEqual(_summary(serial[-1]), _summary(parallel[-1]))
+
+    def test_0003_requires_path(self):
+        self.assertRaises(ValueError, GeoFeedValidator, FEED, processes=2)
+        self.assertRaises(ValueError, GeoFeedValidator, io.StringIO(FEED), processes=None)
+
+    def test_0004_max_errors(self):
+        with open(self.path) as fp:
+            serial = CSVValidatorFinal(fp, max_errors=3).validate()
+        parallel = validate_file(CSVValidatorFinal, self.path, processes=2, chunk_size=100, max_errors=3)
+        self.assertTrue(parallel.truncated)
+        self.assertEqual(3, parallel.error_count)
+        self.assertEqual(serial.record_count, parallel.record_count)
+        self.assertEqual(_summary(serial), _summary(parallel))
+
+    def test_0005_invalid_processes(self):
+        for processes in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                validate_file(CSVValidatorFinal, self.path, processes=processes)
+
+    def test_0006_compact_chunks(self):
+        records, ranges = _validate_chunk(CSVValidatorFinal, self.path, 0, os.path.getsize(self.path), False, "utf-8")
+        # Only records with findings, not the comment, the empty line and the records without findings
+        self.assertEqual([4, 5, 6, 9], sorted(records)[:4])
+        self.assertEqual(28, len(records))
+        # One range per network of the chunk, of its first record
+        self.assertEqual(
+            [(4, 0x08080400, -0x080804FF, 2, "8.8.4.0/24"), (4, 0x08080800, -0x080808FF, 1, "8.8.8.0/24")],
+            [r for r in ranges if r[0] == 4 and r[4].startswith("8.")],
+        )
+        self.assertEqual(sorted(ranges), ranges)
+
+    def test_0007_networks_not_parsed_again(self):
+        result = validate_file(CSVValidatorFinal, self.path, processes=1, chunk_size=100)
+        network_results = [record.get_field_result("ip_prefix") for record in result.records]
+        network_results = [fr for fr in network_results if fr is not None and fr.raw is not None]
+        self.assertTrue(network_results)
+        self.assertTrue(all(fr._value is _UNRESOLVED for fr in network_results))
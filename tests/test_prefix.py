@@ -0,0 +1,167 @@
+# test/test_prefix.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+
+
+import pickle
+import random
+import unittest
+from ipaddress import IPv4Address, IPv6Address, ip_network
+
+from geofeed_validator.prefix import IPPrefix, get_address_range, parse_prefix
+
+__all__ = ["IPPrefixTestCase", "ParsePrefixTestCase"]
+
+VALUES = [
+    "0.0.0.0/0",
+    "8.8.8.0/24",
+    "8.8.8.8/32",
+    "8.8.8.0/024",
+    "255.255.255.255/32",
+    "::/0",
+    "::/128",
+    "::1/128",
+    "1::/16",
+    "2001:db8::/32",
+    "2001:DB8:0:0:1:0:0:0/80",
+    "2001:0db8:0000:0000:0000:0000:0000:0000/32",
+    "1:0:0:2:0:0:0:0/64",
+    "0:0:1:0:0:1:0:0/96",
+    "1:2:3:4:5:6:7::/128",
+    "::2:3:4:5:6:7:8/128",
+    "a:b:c:d:e:f:a:b/128",
+    "::ffff:0:0/96",
+    "::ffff:102:304/128",
+    # Left to ipaddress
+    "8.8.8.8",
+    "8.8.8.0/255.255.255.0",
+    "8.8.8.0/0.0.0.255",
+    "::ffff:1.2.3.4/128",
+    "fe80::1%eth0/128",
+]
+
+INVALID_VALUES = [
+    "",
+    "/",
+    "8.8.8.0/",
+    "8.8.8.0/33",
+    "8.8.8.0/-1",
+    "8.8.8.0/2²",
+    "8.8.8/24",
+    "8.8.8.0.0/24",
+    "08.8.8.0/24",
+    "8.8.8.256/32",
+    " 8.8.8.0/24",
+    "8.8.8.0/24 ",
+    "8.8.8.0/24/1",
+    "٨.8.8.0/24",
+    "8.8.8.1/24",
+    ":::/0",
+    ":1::/64",
+    "1::2::3/64",
+    "1:2:3:4:5:6:7:8:9/128",
+    "1:2:3:4:5:6:7:8::/128",
+    "12345::/16",
+    "g::/16",
+    "1::/0x10",
+    "2001:db8::1/32",
+]
+
+
+class ParsePrefixTestCase(unittest.TestCase):
+    def assert_same_as_ipaddress(self, value):
+        network = ip_network(value)
+        prefix = parse_prefix(value)
+        self.assertEqual(
+            (network.version, int(network.network_address), network.prefixlen),
+            (prefix.version, prefix.network, prefix.prefixlen),
+        )
+        self.assertEqual(str(network), str(prefix))
+
+    def test_0000_valid(self):
+        for value in VALUES:
+            with self.subTest(value=value):
+                self.assert_same_as_ipaddress(value)
+
+    def test_0001_invalid(self):
+        for value in INVALID_VALUES:
+            with self.subTest(value=value):
+                self.assertRaises(ValueError, ip_network, value)
+                self.assertRaises(ValueError, parse_prefix, value)
+
+    def test_0002_random(self):
+        rnd = random.Random(0)
+        for _ in range(2000):
+            prefixlen = rnd.randint(0, 32)
+            address = str(IPv4Address(rnd.getrandbits(32) >> (32 - prefixlen) << (32 - prefixlen)))
+            self.assert_same_as_ipaddress(f"{address}/{prefixlen}")
+
+            prefixlen = rnd.randint(0, 128)
+            # Mostly zero hextets, which are elided in the canonical string
+            hextets = [rnd.choice((0, 0, 0, rnd.getrandbits(16))) for _ in range(8)]
+            network = int("".join(f"{h:04x}" for h in hextets), 16) >> (128 - prefixlen) << (128 - prefixlen)
+            address = rnd.choice((str, lambda a: a.exploded))(IPv6Address(network))
+            self.assert_same_as_ipaddress(f"{address}/{prefixlen}")
+
+
+class IPPrefixTestCase(unittest.TestCase):
+    def test_0000_attributes(self):
+        prefix = parse_prefix("10.0.0.0/8")
+        self.assertEqual((4, 0x0A000000, 8), (prefix.version, prefix.network, prefix.prefixlen))
+        self.assertEqual((32, 1 << 24, 0x0AFFFFFF), (prefix.max_prefixlen, prefix.num_addresses, prefix.last))
+        self.assertEqual((4, 0x0A000000, 0x0AFFFFFF), get_address_range(prefix))
+        self.assertEqual((4, 0x0A000000, 0x0AFFFFFF), get_address_range(ip_network("10.0.0.0/8")))
+        self.assertEqual("IPPrefix('10.0.0.0/8')", repr(prefix))
+
+    def test_0001_to_network(self):
+        prefix = parse_prefix("2001:db8::/32")
+        self.assertIsNone(prefix._network_object)
+        # Attributes of ipaddress networks are looked up on the network, which is built once
+        self.assertEqual(IPv6Address("2001:db8::"), prefix.network_address)
+        self.assertTrue(prefix.subnet_of(ip_network("2001::/16")))
+        self.assertIs(prefix.to_network(), prefix.to_network())
+        self.assertEqual(ip_network("2001:db8::/32"), prefix.to_network())
+        self.assertRaises(AttributeError, getattr, prefix, "no_such_attribute")
+
+    def test_0002_comparison(self):
+        for value in ("8.8.8.0/24", "2001:db8::/32"):
+            with self.subTest(value=value):
+                prefix = parse_prefix(value)
+                network = ip_network(value)
+                self.assertEqual(network, prefix)
+                self.assertEqual(prefix, network)
+                self.assertEqual(hash(network), hash(prefix))
+                self.assertEqual(IPPrefix(prefix.version, prefix.network, prefix.prefixlen), prefix)
+                self.assertNotEqual(parse_prefix("8.8.0.0/16"), prefix)
+                self.assertNotEqual(value, prefix)
+
+        prefixes = [parse_prefix("10.0.0.0/16"), parse_prefix("9.0.0.0/8"), parse_prefix("10.0.0.0/8")]
+        self.assertEqual(["9.0.0.0/8", "10.0.0.0/8", "10.0.0.0/16"], [str(p) for p in sorted(prefixes)])
+        self.assertRaises(TypeError, sorted, [parse_prefix("::/0"), parse_prefix("0.0.0.0/0")])
+
+    def test_0003_pickle(self):
+        prefix = parse_prefix("8.8.8.0/24")
+        prefix.to_network()
+        unpickled = pickle.loads(pickle.dumps(prefix))
+        self.assertEqual(prefix, unpickled)
+        self.assertIsNone(unpickled._network_object)
@@ -26,7 +26,7 @@ import unittest
 from ipaddress import ip_network
 
 from geofeed_validator.fields import CityField, NetworkField, SubdivisionField, ZipCodeField
-from geofeed_validator.result import FieldResult, RecordValidationResult, ValidationResult
+from geofeed_validator.result import _UNRESOLVED, FieldResult, RecordValidationResult, ValidationResult
 
 __all__ = ["FieldResultTestCase", "RecordValidationResultTestCase", "ValidationResultTestCase"]
 
@@ -125,6 +125,39 @@ class RecordValidationResultTestCase(unittest.TestCase):
         self.assertEqual(None, res.get_field_result("subdivision"))
         self.assertEqual(None, res.get_field_value("subdivision"))
 
+    def test_0004_compact(self):
+        nw_field = NetworkField()
+        city_field = CityField()
+
+        first = RecordValidationResult(1, (nw_field, city_field), {nw_field: "8.8.8.0/24", city_field: ""}, "")
+        second = RecordValidationResult(2, (nw_field, city_field), {nw_field: "8.8.4.0/24", city_field: ""}, "")
+        first.validate()
+        second.validate()
+
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertFalse(hasattr(first.field_results[0], "__dict__"))
+        self.assertEqual([], first.extra)
+        self.assertIs(first.extra, second.extra)
+        self.assertIs(first.get_field_result(nw_field).errors, second.get_field_result(city_field).warnings)
+        self.assertRaises(TypeError, first.get_field_result(nw_field).errors.append, "test_error")
+
+        first.add_field_errors(nw_field, "test_error")
+        self.assertEqual(["test_error"], first.get_field_result(nw_field).errors)
+        self.assertEqual([], second.get_field_result(nw_field).errors)
+
+    def test_0005_add_field_results_unknown_and_ignored(self):
+        nw_field = NetworkField()
+        city_field = CityField()
+
+        res = RecordValidationResult(1, (nw_field,), {}, "")
+        res.validate()
+        res.add_field_warnings(city_field, "test_warning")
+        res.add_field_errors(nw_field, "test_error")
+
+        self.assertEqual([nw_field, city_field], [fr.field for fr in res.field_results])
+        self.assertEqual(["test_warning"], res.get_field_result("city").warnings)
+        self.assertEqual(["test_error"], res.get_field_result(nw_field).errors)
+
 
 class ValidationResultTestCase(unittest.TestCase):
     def test_0000_no_store_records(self):
@@ -232,3 +265,56 @@ class ValidationResultTestCase(unittest.TestCase):
             self.assertEqual(0, len(subdivision_field_result.errors))
             self.assertEqual(1, len(subdivision_field_result.warnings))
             self.assertEqual(["test_warning3"], subdivision_field_result.warnings)
+
+    def test_0004_counts_by_field_and_message(self):
+        nw_field = NetworkField()
+        city_field = CityField()
+        zipcode_field = ZipCodeField()
+
+        vr = ValidationResult((nw_field, city_field), store_raw_records=False)
+        vr.add_record({nw_field: "8.8.8.0/24", city_field: "Vienna"}, None)
+        vr.add_record({nw_field: "invalid"}, None)
+        vr.add_record({}, None)
+        self.assertEqual({"network": 1, "city": 1}, vr.error_counts_by_field)
+        self.assertEqual({"Not a valid IP network": 1, "Field is missing.": 1}, vr.error_counts_by_message)
+
+        vr.records[0].add_field_errors(nw_field, "test_error")
+        vr.records[2].add_field_warnings(zipcode_field, ["test_warning", "test_warning"])
+        self.assertEqual(3, vr.error_count)
+        self.assertEqual(2, vr.warning_count)
+        self.assertEqual({"network": 2, "city": 1}, vr.error_counts_by_field)
+        self.assertEqual({"zipcode": 2}, vr.warning_counts_by_field)
+        self.assertEqual({"test_warning": 2}, vr.warning_counts_by_message)
+        self.assertEqual(sum(r.error_count for r in vr.records), vr.error_count)
+
+        merged = ValidationResult((nw_field, city_field), store_raw_records=False)
+        for record in vr.records:
+            merged.add_record_result(record)
+        self.assertEqual(vr.error_counts_by_message, merged.error_counts_by_message)
+        self.assertEqual(vr.warning_counts_by_field, merged.warning_counts_by_field)
+
+    def test_0005_problems_only(self):
+        nw_field = NetworkField()
+
+        vr = ValidationResult((nw_field,), store_raw_records=True, problems_only=True)
+        for raw in ("8.8.8.0/24", "invalid", "8.8.4.0/24", "8.8.2.0/24"):
+            vr.add_record({nw_field: raw}, raw)
+        self.assertEqual(4, vr.record_count)
+        self.assertEqual(["invalid"], vr.records_raw)
+
+        first = vr.add_record({nw_field: "1.1.1.0/24"}, "1.1.1.0/24")
+        first.add_field_warnings(nw_field, "test_warning")
+        self.assertEqual(["invalid", "1.1.1.0/24"], vr.records_raw)
+        self.assertEqual(1, vr.warning_count)
+
+    def test_0006_problems_only_keeps_values_of_retained_records(self):
+        nw_field = NetworkField()
+
+        vr = ValidationResult((nw_field,), problems_only=True)
+        for raw in ("10.0.0.0/8", "192.168.0.0/16", "8.8.8.0/24"):
+            vr.add_record({nw_field: raw}, raw)
+        self.assertEqual([0, 1], [record.record_no for record in vr.records])
+        for record in vr.records:
+            field_result = record.get_field_result(nw_field)
+            self.assertIsNot(_UNRESOLVED, field_result._value)
+            self.assertEqual(ip_network(field_result.raw), field_result.value)
@@ -0,0 +1,81 @@
+# test/test_special_networks.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+#
+
+import unittest
+from ipaddress import IPV4LENGTH, IPV6LENGTH, IPv4Network, IPv6Network, ip_network
+
+from geofeed_validator.prefix import IPPrefix
+from geofeed_validator.special_networks import _UNKNOWN, _table, classify_network, warmup
+
+__all__ = ["ClassifyNetworkTestCase"]
+
+
+def _classify_ipaddress(network):
+    for error, check in (
+        ("ERROR_LINKLOCAL", "is_link_local"),
+        ("ERROR_LOOPBACK", "is_loopback"),
+        ("ERROR_MULTICAST", "is_multicast"),
+        ("ERROR_RESERVED", "is_reserved"),
+        ("ERROR_PRIVATE", "is_private"),
+    ):
+        if getattr(network, check):
+            return error
+    return None
+
+
+class ClassifyNetworkTestCase(unittest.TestCase):
+    def test_0000_examples(self):
+        self.assertEqual("ERROR_LINKLOCAL", classify_network(ip_network("169.254.0.0/24")))
+        self.assertEqual("ERROR_LOOPBACK", classify_network(ip_network("127.0.0.1/32")))
+        self.assertEqual("ERROR_LOOPBACK", classify_network(ip_network("::1/128")))
+        self.assertEqual("ERROR_MULTICAST", classify_network(ip_network("ff02::/16")))
+        self.assertEqual("ERROR_RESERVED", classify_network(ip_network("240.0.2.0/24")))
+        self.assertEqual("ERROR_PRIVATE", classify_network(ip_network("fd00::/8")))
+        self.assertEqual(None, classify_network(ip_network("8.8.8.0/24")))
+        self.assertEqual(None, classify_network(ip_network("2001:4860::/32")))
+
+    def test_0001_same_as_ipaddress(self):
+        # Networks starting or ending right at, before and after every interval boundary.
+        for network_class, bits in ((IPv4Network, IPV4LENGTH), (IPv6Network, IPV6LENGTH)):
+            starts = _table(4 if network_class is IPv4Network else 6)[0]
+            addresses = {a for s in starts for a in (s - 1, s, s + 1) if 0 <= a < 1 << bits}
+            for address in addresses:
+                for prefixlen in range(0, bits + 1, 4 if bits == IPV4LENGTH else 8):
+                    network = network_class((address >> (bits - prefixlen) << (bits - prefixlen), prefixlen))
+                    with self.subTest(network=network):
+                        self.assertEqual(_classify_ipaddress(network), classify_network(network))
+                        prefix = IPPrefix(network.version, int(network.network_address), prefixlen)
+                        self.assertEqual(_classify_ipaddress(network), classify_network(prefix))
+
+    def test_0002_all_intervals_known(self):
+        # The static network list covers all networks the ipaddress checks are based on, so no network needs to
+        # fall back to the ipaddress module just because it lies within an interval.
+        for version in (4, 6):
+            with self.subTest(version=version):
+                self.assertNotIn(_UNKNOWN, _table(version)[1])
+
+    def test_0003_warmup(self):
+        warmup()
+        self.assertEqual(2, _table.cache_info().currsize)
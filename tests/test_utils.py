@@ -23,11 +23,14 @@
 # Stephan Peijnik <speijnik@anexia-it.com>
 
 import io
+import os
+import tempfile
 import unittest
 
 from geofeed_validator import is_file_like_object
+from geofeed_validator.utils import LRUCache, MappedFeed, iter_lines
 
-__all__ = ["IsFileLikeObjectTestCase"]
+__all__ = ["IsFileLikeObjectTestCase", "IterLinesTestCase", "MappedFeedTestCase", "LRUCacheTestCase"]
 
 
 class IsFileLikeObjectTestCase(unittest.TestCase):
@@ -36,3 +39,99 @@ class IsFileLikeObjectTestCase(unittest.TestCase):
 
     def test_0001_is_file_like(self):
         self.assertEqual(True, is_file_like_object(io.StringIO()))
+
+
+class IterLinesTestCase(unittest.TestCase):
+    def test_0000_empty(self):
+        self.assertEqual([], list(iter_lines(io.StringIO())))
+
+    def test_0001_lines(self):
+        self.assertEqual(["a\n", "b\n", "c"], list(iter_lines(io.StringIO("a\nb\nc"))))
+
+    def test_0002_lazy(self):
+        feed = io.StringIO("a\nb\n")
+        lines = iter_lines(feed)
+        self.assertEqual("a\n", next(lines))
+        self.assertEqual(2, feed.tell())
+
+
+class MappedFeedTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as fp:
+            fp.write("a\r\nb\u00e4\nc".encode())
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_0000_lines(self):
+        with MappedFeed(self.path) as feed:
+            self.assertEqual(True, is_file_like_object(feed))
+            self.assertEqual(self.path, feed.name)
+            self.assertEqual(["a\n", "b\u00e4\n", "c"], list(iter_lines(feed)))
+
+    def test_0001_read(self):
+        with MappedFeed(self.path) as feed:
+            self.assertEqual("a\n", feed.readline())
+            self.assertEqual("b\u00e4", feed.read(2))
+            self.assertEqual(6, feed.tell())
+            self.assertEqual("\nc", feed.read())
+            self.assertEqual("", feed.read())
+
+    def test_0002_empty(self):
+        with open(self.path, "wb"):
+            pass
+        with MappedFeed(self.path) as feed:
+            self.assertEqual("", feed.readline())
+            self.assertEqual("", feed.read())
+
+    def test_0003_closed(self):
+        feed = MappedFeed(self.path)
+        feed.close()
+        self.assertEqual(True, feed.closed)
+        self.assertRaises(ValueError, feed.readline)
+
+    def test_0004_line_breaks(self):
+        content = "a\r\nb\rc\n\r\n\r\rd\u00e4\re\r"
+        with open(self.path, "wb") as fp:
+            fp.write(content.encode())
+
+        with open(self.path, encoding="utf-8") as fp:
+            expected = fp.readlines()
+        with MappedFeed(self.path) as feed:
+            self.assertEqual(expected, list(iter_lines(feed)))
+        with MappedFeed(self.path) as feed:
+            self.assertEqual("a\nb\n", feed.read(4))
+            self.assertEqual(5, feed.tell())
+            self.assertEqual("c\n\n", feed.read(3))
+            self.assertEqual(9, feed.tell())
+            self.assertEqual("\n\nd\u00e4\ne\n", feed.read())
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_0000_eviction(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.put("c", 3)
+        self.assertEqual(None, cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+        self.assertEqual(2, len(cache))
+        self.assertEqual((3, 1, 1), (cache.hits, cache.misses, cache.evictions))
+        self.assertEqual(0.75, cache.hit_rate)
+
+    def test_0001_clear(self):
+        cache = LRUCache(2)
+        self.assertEqual(0.0, cache.hit_rate)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual((0, 0, 0), (cache.hits, cache.misses, cache.evictions))
+
+    def test_0002_invalid_size(self):
+        for max_size in (0, -1, None, 1.5):
+            with self.subTest(max_size=max_size):
+                self.assertRaises(ValueError, LRUCache, max_size)
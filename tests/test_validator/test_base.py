@@ -28,6 +28,7 @@ import unittest
 
 from geofeed_validator import BaseValidator, Registry
 from geofeed_validator.fields import CityField, CountryField, NetworkField, SubdivisionField, ZipCodeField
+from geofeed_validator.result import RecordUpdate
 from geofeed_validator.validator import BaseCSVValidator
 
 __all__ = ["BaseCSVValidatorTestCase", "BaseValidatorTestCase", "RegistryTestCase"]
@@ -159,6 +160,46 @@ class BaseValidatorTestCase(unittest.TestCase):
             ["Region not a subdivison of given country."], case4_record.get_field_result(SubdivisionField).errors
         )
 
+    def test_0005_plan(self):
+        c_field = CountryField()
+
+        class TestValidator(BaseValidator):
+            NAME = "test"
+            FIELDS = (NetworkField, c_field, CityField)
+
+        self.assertEqual(
+            {"network": 0, "country": 1, "region": None, "city": 2, "postal_code": None}, TestValidator._get_plan()
+        )
+        self.assertIs(TestValidator._get_plan(), TestValidator._get_plan())
+
+        tv = TestValidator("")
+        self.assertIs(tv._fields[0], tv._role_fields["network"])
+        self.assertIs(c_field, tv._role_fields["country"])
+        self.assertEqual(None, tv._role_fields["region"])
+
+        class SubValidator(TestValidator):
+            FIELDS = (CountryField,)
+
+        self.assertEqual(0, SubValidator._get_plan()["country"])
+        self.assertEqual(1, TestValidator._get_plan()["country"])
+
+    def test_0006_shared_setup(self):
+        class TestValidator(BaseValidator):
+            NAME = "test"
+            FIELDS = (NetworkField, CountryField)
+
+        first, second = TestValidator(""), TestValidator("")
+        self.assertIs(first._fields, second._fields)
+        self.assertIs(first._role_fields, second._role_fields)
+        self.assertEqual({"network": 0, "country": 1}, first._field_index)
+        self.assertIs(first._field_index, first._create_result()._field_index)
+
+        class SubValidator(TestValidator):
+            FIELDS = (CountryField,)
+
+        self.assertEqual(1, len(SubValidator("")._fields))
+        self.assertEqual(2, len(TestValidator("")._fields))
+
 
 class RegistryTestCase(unittest.TestCase):
     def test_0000_register_invalid_class(self):
@@ -211,3 +252,83 @@ class BaseCSVValidatorTestCase(unittest.TestCase):
         self.assertEqual("4,5,6,7", second_raw)
         self.assertEqual({nw_field: "1", c_field: "2", sd_field: "3"}, first_fields)
         self.assertEqual({nw_field: "4", c_field: "5", sd_field: "6", "__extra__": ["7"]}, second_fields)
+
+    def test_001_get_records_lazy(self):
+        fields = (NetworkField(),)
+
+        class TestValidator(BaseCSVValidator):
+            NAME = "TEST"
+            FIELDS = fields
+
+        feed = io.StringIO("8.8.8.0/24\n8.8.4.0/24\n")
+        tv = TestValidator(feed)
+        records = tv.get_records()
+        self.assertEqual(({fields[0]: "8.8.8.0/24"}, "8.8.8.0/24"), next(records))
+        self.assertEqual(len("8.8.8.0/24\n"), feed.tell())
+
+    def test_002_duplicate_network_single_pass(self):
+        class TestValidator(BaseCSVValidator):
+            NAME = "TEST"
+            FIELDS = (NetworkField,)
+
+        tv = TestValidator("8.8.8.0/24\n8.8.4.0/24\n8.8.8.0/24\n")
+        res = tv.validate()
+        self.assertEqual(["Duplicate of line #2"], res.records[0].get_field_result(NetworkField).errors)
+        self.assertEqual([], res.records[1].get_field_result(NetworkField).errors)
+        self.assertEqual(["Duplicate of line #0"], res.records[2].get_field_result(NetworkField).errors)
+
+    def test_003_contained_network(self):
+        class TestValidator(BaseCSVValidator):
+            NAME = "TEST"
+            FIELDS = (NetworkField, CountryField, SubdivisionField, CityField)
+
+        tv = TestValidator(
+            "8.8.8.128/25,US,,\n"
+            "8.8.8.0/24,US,,\n"
+            "8.8.8.0/26,AT,,\n"
+            "8.8.8.0/28,AT,,\n"
+            "8.8.8.0/28,AT,,\n"
+            "8.8.9.0/24,US,,\n"
+            "2001:4860::/32,US,,\n"
+            "2001:4860:1::/48,US,,Mountain View\n"
+        )
+        items = list(tv.iter_results())
+        res = items[-1]
+        warnings = [r.get_field_result(NetworkField).warnings for r in res.records]
+        self.assertEqual(
+            [
+                ["Contained in line #1"],
+                [],
+                ["Contained in line #1 with a different location"],
+                ["Contained in line #2"],
+                ["Contained in line #2"],
+                [],
+                [],
+                ["Contained in line #6 with a different location"],
+            ],
+            warnings,
+        )
+        self.assertEqual(["Duplicate of line #4"], res.records[3].get_field_result(NetworkField).errors)
+
+        updates = [item for item in items if isinstance(item, RecordUpdate) and item.warnings]
+        self.assertEqual([0, 2, 3, 4, 7], sorted(update.record_no for update in updates))
+        self.assertTrue(all(items.index(update) > items.index(res.records[-1]) for update in updates))
+
+    def test_004_duplicate_network_group(self):
+        class TestValidator(BaseCSVValidator):
+            NAME = "TEST"
+            FIELDS = (NetworkField,)
+            MAX_DUPLICATES_LISTED = 3
+
+        tv = TestValidator("8.8.8.0/24\n8.8.4.0/24\n" + "8.8.8.0/24\n" * 5 + "8.8.4.0/24\n" * 2)
+        items = list(tv.iter_results())
+        res = items[-1]
+        errors = [r.get_field_result(NetworkField).errors for r in res.records]
+        self.assertEqual(["Duplicate of lines #2, #3, #4 and 2 more"], errors[0])
+        self.assertEqual(["Duplicate of lines #7, #8"], errors[1])
+        self.assertEqual([["Duplicate of line #0"]] * 5 + [["Duplicate of line #1"]] * 2, errors[2:])
+        self.assertEqual(9, res.error_count)
+
+        updates = [item for item in items if isinstance(item, RecordUpdate)]
+        self.assertEqual([0, 1], [update.record_no for update in updates])
+        self.assertEqual([errors[0], errors[1]], [update.errors for update in updates])
@@ -0,0 +1,192 @@
+# test/test_vectorized.py
+#
+# ANEXIA GeoFeed Validator
+#
+# Copyright (C) 2025 ANEXIA Internetdienstleistungs GmbH
+#
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as
+#  published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#
+# Stephan Peijnik <speijnik@anexia-it.com>
+
+
+import random
+import unittest
+
+from geofeed_validator import GeoFeedValidator
+from geofeed_validator.fields import NetworkField
+from geofeed_validator.prefix import get_address_range, parse_prefix
+from geofeed_validator.result import RecordUpdate, ValidationResult
+from geofeed_validator.validator.base import Registry
+from geofeed_validator.vectorized import HAS_NUMPY, clean_networks, find_parents, supports_field
+
+__all__ = ["EngineTestCase", "VectorizedTestCase"]
+
+NETWORKS = [
+    "0.0.0.0/0",
+    "8.0.0.0/8",
+    "8.8.0.0/16",
+    "8.8.8.0/24",
+    "8.8.8.8/32",
+    "255.255.255.255/32",
+    "10.0.0.0/8",
+    "10.1.0.0/16",
+    "100.64.0.0/10",
+    "127.0.0.0/8",
+    "192.168.0.0/16",
+    "224.0.0.0/4",
+    "192.0.0.0/8",
+    "2001:db8::/32",
+    "2001:db8:1::/48",
+    "2a00::/16",
+    "2a00:1::/32",
+    "::ffff:1.2.3.0/120",
+    "::/0",
+    "::1/128",
+    "fe80::/10",
+    "2001:db8:0:1:2:3:4:5/128",
+    "2001:db8::1:0:0:1/128",
+    "ff00::/8",
+    "ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff/128",
+    # Left to NetworkField
+    "8.8.8.1/24",
+    "8.8.8.0/024",
+    "08.8.8.0/24",
+    "8.8.8.0/33",
+    "8.8.8.256/32",
+    "8.8.8/24",
+    "8.8.8.0.0/24",
+    "8.8.8.0/24/",
+    "8.8.8.0/",
+    "/24",
+    "8.8.8.8",
+    "8.8.8.0/255.255.255.0",
+    "8.8.8.0 /24",
+    "8.8.8.0/24\x00",
+    "2001:db8::1/32",
+    "2001:DB8::/32",
+    "2001:0db8::/32",
+    "2001:db8:0:0:0:0:0:0/32",
+    "2001:db8::0:1/128",
+    "2001:0:0:1::1/128",
+    "2001:db8:::/32",
+    "2001:db8::/129",
+    "2001:db8::/032",
+    "1:2:3:4:5:6:7:8:9/128",
+    "2001:db8::/32/",
+    ":/0",
+    "٨.8.8.0/24",
+    "invalid",
+    "",
+]
+
+
+def _iter_findings(feed, validator, engine, batch_size=None):
+    validator = Registry.find(validator)(feed, engine=engine)
+    if batch_size is not None:
+        validator.ENGINE_BATCH_SIZE = batch_size
+    for item in validator.iter_results():
+        if isinstance(item, RecordUpdate):
+            yield item.record.record_no, item.field.name, item.errors, item.warnings
+        elif not isinstance(item, ValidationResult):
+            yield (
+                item.record_no,
+                [(fr.field.name, fr.errors, fr.warnings, str(fr.value), fr.value_string) for fr in item.field_results],
+            )
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy not installed")
+class VectorizedTestCase(unittest.TestCase):
+    def test_0000_clean_networks(self):
+        field = NetworkField()
+        expected = [field.clean(value) for value in NETWORKS]
+        cleaned = clean_networks(field, NETWORKS)
+        self.assertEqual(
+            [(errors, warnings, str(value), value_string) for errors, warnings, value, value_string in expected],
+            [(errors, warnings, str(value), value_string) for errors, warnings, value, value_string in cleaned],
+        )
+        self.assertEqual([], clean_networks(field, []))
+
+    def test_0001_find_parents(self):
+        networks = [parse_prefix(value) for value in dict.fromkeys(NETWORKS[:18])]
+        ranges = []
+        for record_no, network in enumerate(networks):
+            version, first, last = get_address_range(network)
+            ranges.append((version, first, -last, record_no, [network]))
+
+        sorted_ranges, parents = find_parents(list(ranges))
+        self.assertEqual(sorted(ranges), sorted_ranges)
+        self.assertEqual(
+            {
+                "8.0.0.0/8": "0.0.0.0/0",
+                "8.8.0.0/16": "8.0.0.0/8",
+                "8.8.8.0/24": "8.8.0.0/16",
+                "8.8.8.8/32": "8.8.8.0/24",
+                "255.255.255.255/32": "0.0.0.0/0",
+                "10.0.0.0/8": "0.0.0.0/0",
+                "10.1.0.0/16": "10.0.0.0/8",
+                "100.64.0.0/10": "0.0.0.0/0",
+                "127.0.0.0/8": "0.0.0.0/0",
+                "192.168.0.0/16": "192.0.0.0/8",
+                "224.0.0.0/4": "0.0.0.0/0",
+                "192.0.0.0/8": "0.0.0.0/0",
+                "2001:db8:1::/48": "2001:db8::/32",
+                "2a00:1::/32": "2a00::/16",
+            },
+            {
+                str(network_range[4][0]): str(sorted_ranges[parent][4][0])
+                for network_range, parent in zip(sorted_ranges, parents, strict=True)
+                if parent >= 0
+            },
+        )
+
+    def test_0002_same_results(self):
+        rnd = random.Random(0)
+        lines = ["# comment", ""]
+        for _ in range(500):
+            network = rnd.choice(NETWORKS)
+            lines.append(f"{network},{rnd.choice(['AT', 'DE', ''])},{rnd.choice(['AT-9', ''])},Vienna,")
+        lines.append("8.8.8.0/24")
+        feed = "\n".join(lines) + "\n"
+
+        for validator in ("final", "draft02"):
+            expected = list(_iter_findings(feed, validator, "python"))
+            for batch_size in (7, None):
+                with self.subTest(validator=validator, batch_size=batch_size):
+                    self.assertEqual(expected, list(_iter_findings(feed, validator, "numpy", batch_size)))
+
+    def test_0003_supports_field(self):
+        class LowerNetworkField(NetworkField):
+            def to_python(self, value):
+                return super().to_python(value.lower())
+
+        self.assertTrue(supports_field(NetworkField()))
+        self.assertFalse(supports_field(LowerNetworkField()))
+
+
+class EngineTestCase(unittest.TestCase):
+    def test_0000_engine(self):
+        self.assertEqual("python", GeoFeedValidator("").engine)
+        self.assertEqual("numpy" if HAS_NUMPY else "python", GeoFeedValidator("", engine="numpy").engine)
+
+        result = GeoFeedValidator("8.8.8.0/24,US,,,\n8.8.8.0/24,US,,,\n", engine="numpy").validate()
+        self.assertEqual(2, result.error_count)
+
+    def test_0001_invalid(self):
+        with self.assertRaises(ValueError):
+            GeoFeedValidator("", engine="fortran")
+        with self.assertRaises(ValueError):
+            GeoFeedValidator("", engine="numpy", cache=object())